@@ -0,0 +1,364 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+"""
+Asynchronous access to the database for asyncio code. Driver calls run on a
+bounded pool of worker threads per database alias; each worker thread holds
+its own Django connection, so up to that many queries run at the same time
+and none of them blocks the event loop.
+
+    async with aio.cursor( 'default' ) as cursor:
+        await cursor.execute( "SELECT ID, NAME FROM ITEM WHERE KIND = %s", [kind] )
+        async for row in cursor:
+            ...
+
+When OPTIONS['ASYNC_WORKERS'] is set, base.py also routes the read methods of
+Django's async ORM (aiterator(), aget(), acount(), ...) through the pool.
+"""
+
+import asyncio
+import contextvars
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connections, DEFAULT_DB_ALIAS, InterfaceError
+
+# Number of worker threads of an alias without OPTIONS['ASYNC_WORKERS'].
+DEFAULT_ASYNC_WORKERS = 4
+
+class Worker( object ):
+    """
+    A single thread, and so a single Django connection, of a WorkerPool.
+    Calls submitted to a worker run one after the other in submission order.
+    """
+
+    def __init__( self, alias, name ):
+        self.alias = alias
+        self.executor = ThreadPoolExecutor( max_workers = 1, thread_name_prefix = name )
+        self.check_connection = False
+
+    def submit( self, func, *args, **kwargs ):
+        return self.executor.submit( self._call, func, args, kwargs )
+
+    def _call( self, func, args, kwargs ):
+        # First call after a checkout, drop the connection of the thread if it
+        # broke or outlived CONN_MAX_AGE while the worker was idle.
+        if self.check_connection:
+            self.check_connection = False
+            connections[self.alias].close_if_unusable_or_obsolete()
+        return func( *args, **kwargs )
+
+class WorkerPool( object ):
+    """
+    Bounded set of Workers of a database alias. acquire() hands out an idle
+    worker or waits, without blocking the event loop, until one is released.
+    A worker is only released once the driver call it runs has returned, also
+    when the awaiting task has been cancelled.
+    """
+
+    def __init__( self, alias, size ):
+        self.alias = alias
+        self.size = size
+        self._workers = [Worker( alias, 'ibm_db_django-%s-%d' % ( alias, index ) ) for index in range( size )]
+        self._idle = deque( self._workers )
+        self._waiters = deque()
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.waits = 0
+        self.cancellations = 0
+
+    async def acquire( self ):
+        with self._lock:
+            if self._idle:
+                worker = self._idle.pop()
+                worker.check_connection = True
+                self.checkouts += 1
+                return worker
+            loop = asyncio.get_running_loop()
+            waiter = loop.create_future()
+            self._waiters.append( ( loop, waiter ) )
+            self.waits += 1
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            # The worker may have been handed over just before the cancellation.
+            if waiter.done() and not waiter.cancelled():
+                self.release( waiter.result() )
+            raise
+
+    # Can be called from any thread, waiters are woken up on their own loop.
+    def release( self, worker ):
+        with self._lock:
+            while self._waiters:
+                loop, waiter = self._waiters.popleft()
+                if not waiter.done():
+                    break
+            else:
+                self._idle.append( worker )
+                return
+        try:
+            loop.call_soon_threadsafe( self._hand_over, waiter, worker )
+        except RuntimeError:
+            # The loop of the waiter has been closed.
+            self.release( worker )
+
+    def _hand_over( self, waiter, worker ):
+        if waiter.done():
+            self.release( worker )
+            return
+        with self._lock:
+            worker.check_connection = True
+            self.checkouts += 1
+        waiter.set_result( worker )
+
+    # Runs func( *args, **kwargs ) on a worker of the pool.
+    async def run( self, func, *args, **kwargs ):
+        worker = await self.acquire()
+        future = worker.submit( func, *args, **kwargs )
+        future.add_done_callback( lambda future: self.release( worker ) )
+        try:
+            return await asyncio.wrap_future( future )
+        except asyncio.CancelledError:
+            self.cancellations += 1
+            raise
+
+    # Iterates the synchronous iterator on a single worker, chunk_size items at
+    # a time, as the cursor behind it belongs to the connection of that worker.
+    async def iterate( self, iterator, chunk_size ):
+        def next_chunk():
+            chunk = []
+            for item in iterator:
+                chunk.append( item )
+                if len( chunk ) >= chunk_size:
+                    break
+            return chunk
+
+        worker = await self.acquire()
+        future = None
+        try:
+            while True:
+                # A chunk is fetched only when the consumer asks for more.
+                future = worker.submit( next_chunk )
+                chunk = await asyncio.wrap_future( future )
+                if not chunk:
+                    break
+                for item in chunk:
+                    yield item
+        except asyncio.CancelledError:
+            self.cancellations += 1
+            raise
+        finally:
+            # Closing the iterator closes its cursor. It runs on the worker
+            # after a chunk still being fetched, then the worker is free again.
+            close = getattr( iterator, 'close', None )
+            if close is not None:
+                future = worker.submit( close )
+            if future is None:
+                self.release( worker )
+            else:
+                future.add_done_callback( lambda future: self.release( worker ) )
+
+    def stats( self ):
+        with self._lock:
+            return {
+                'size': self.size,
+                'idle': len( self._idle ),
+                'waiting': len( self._waiters ),
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'cancellations': self.cancellations,
+            }
+
+    # Closes the connections of the worker threads and stops the threads.
+    def close( self ):
+        for worker in self._workers:
+            worker.executor.submit( connections.close_all ).result()
+            worker.executor.shutdown()
+
+class AsyncCursor( object ):
+    """
+    Cursor whose driver calls run on one worker of the pool of the alias. The
+    worker is taken on first use and given back by close(). Iterating the
+    cursor fetches arraysize rows (OPTIONS['FETCH_BLOCK_SIZE']) per call to
+    the worker. If a call is cancelled the cursor is closed, and its worker
+    released, as soon as the driver call in progress returns.
+    """
+
+    def __init__( self, alias = DEFAULT_DB_ALIAS ):
+        self.alias = alias
+        self.pool = get_pool( alias )
+        self.worker = None
+        self.cursor = None
+        self.arraysize = None
+        self.closed = False
+        self._rows = deque()
+
+    @property
+    def description( self ):
+        return self.cursor.description if self.cursor is not None else None
+
+    @property
+    def rowcount( self ):
+        return self.cursor.rowcount if self.cursor is not None else -1
+
+    async def _open( self ):
+        self.worker = await self.pool.acquire()
+        try:
+            self.cursor = await asyncio.wrap_future( self.worker.submit( _open_cursor, self.alias ) )
+        except BaseException:
+            self.pool.release( self.worker )
+            self.worker = None
+            raise
+        self.arraysize = self.cursor.arraysize
+
+    async def _call( self, func, *args ):
+        if self.closed:
+            raise InterfaceError( "Cursor is closed." )
+        if self.cursor is None:
+            await self._open()
+        future = self.worker.submit( getattr( self.cursor, func ), *args )
+        try:
+            return await asyncio.wrap_future( future )
+        except asyncio.CancelledError:
+            self.pool.cancellations += 1
+            self._detach()
+            raise
+
+    # Closes the cursor on its worker after the call in progress and releases
+    # the worker, without waiting for either.
+    def _detach( self ):
+        self.closed = True
+        self._rows.clear()
+        worker = self.worker
+        future = worker.submit( self.cursor.close )
+        future.add_done_callback( lambda future: self.pool.release( worker ) )
+
+    async def execute( self, sql, params = None ):
+        self._rows.clear()
+        await self._call( 'execute', sql, params )
+        return self
+
+    async def executemany( self, sql, param_list ):
+        self._rows.clear()
+        await self._call( 'executemany', sql, param_list )
+        return self
+
+    async def fetchone( self ):
+        if self._rows:
+            return self._rows.popleft()
+        return await self._call( 'fetchone' )
+
+    async def fetchmany( self, size = None ):
+        if size is None:
+            size = self.arraysize or 1
+        rows = []
+        while self._rows and len( rows ) < size:
+            rows.append( self._rows.popleft() )
+        if len( rows ) < size:
+            rows.extend( await self._call( 'fetchmany', size - len( rows ) ) )
+        return rows
+
+    async def fetchall( self ):
+        rows = list( self._rows )
+        self._rows.clear()
+        rows.extend( await self._call( 'fetchall' ) )
+        return rows
+
+    async def close( self ):
+        if self.closed:
+            return
+        self.closed = True
+        self._rows.clear()
+        if self.worker is None:
+            return
+        try:
+            await asyncio.wrap_future( self.worker.submit( self.cursor.close ) )
+        finally:
+            self.pool.release( self.worker )
+            self.worker = None
+
+    def __aiter__( self ):
+        return self
+
+    async def __anext__( self ):
+        if not self._rows:
+            rows = await self._call( 'fetchmany', self.arraysize )
+            if not rows:
+                raise StopAsyncIteration
+            self._rows.extend( rows )
+        return self._rows.popleft()
+
+    async def __aenter__( self ):
+        return self
+
+    async def __aexit__( self, exc_type, exc_value, traceback ):
+        await self.close()
+
+def _open_cursor( alias ):
+    return connections[alias].cursor()
+
+# Process wide worker pools, keyed by database alias.
+pools = {}
+_lock = threading.Lock()
+
+def get_pool( alias = DEFAULT_DB_ALIAS ):
+    pool = pools.get( alias )
+    if pool is None:
+        with _lock:
+            pool = pools.get( alias )
+            if pool is None:
+                options = connections.settings[alias].get( 'OPTIONS' ) or {}
+                size = max( int( options.get( 'ASYNC_WORKERS' ) or DEFAULT_ASYNC_WORKERS ), 1 )
+                pool = pools[alias] = WorkerPool( alias, size )
+    return pool
+
+# The pool of the alias if its async ORM calls go through worker threads,
+# that is if OPTIONS['ASYNC_WORKERS'] is set, otherwise None.
+def orm_pool( alias ):
+    options = connections.settings[alias].get( 'OPTIONS' ) or {}
+    if not options.get( 'ASYNC_WORKERS' ):
+        return None
+    return get_pool( alias )
+
+# Aliases whose connection holds a transaction (autocommit off, as inside
+# transaction.atomic() or a TestCase) in the calling context. DatabaseWrapper
+# keeps it up to date when autocommit changes, and asgiref carries it across
+# sync_to_async() and async_to_sync(), so an async ORM read can tell whether
+# it must run on the caller's connection without a call to that thread.
+_transactions = contextvars.ContextVar( 'ibm_db_django_transactions', default = frozenset() )
+
+def set_in_transaction( alias, in_transaction ):
+    aliases = _transactions.get()
+    if in_transaction and alias not in aliases:
+        _transactions.set( aliases | { alias } )
+    elif not in_transaction and alias in aliases:
+        _transactions.set( aliases - { alias } )
+
+def in_transaction( alias ):
+    return alias in _transactions.get()
+
+def cursor( alias = DEFAULT_DB_ALIAS ):
+    return AsyncCursor( alias )
+
+# Closes the connections and threads of all worker pools.
+def close_pools():
+    with _lock:
+        closing = list( pools.values() )
+        pools.clear()
+    for pool in closing:
+        pool.close()
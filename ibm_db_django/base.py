@@ -44,14 +44,22 @@ except ImportError:
 
 from django.db.backends.signals import connection_created
 
+# With IBM_DB_DJANGO_STANDIN set, ibm_db_dbi runs on the SQLite stand-in
+# driver; it has to be in place before the modules below import ibm_db_dbi.
+if not _IS_JYTHON:
+    from ibm_db_django import standin
+    standin.install_from_settings()
+
 # Importing internal classes from ibm_db_django package.
 from ibm_db_django.client import DatabaseClient
 from ibm_db_django.creation import DatabaseCreation
 from ibm_db_django.introspection import DatabaseIntrospection
 from ibm_db_django.operations import DatabaseOperations
+from ibm_db_django import dialect, instrumentation
 if not _IS_JYTHON:
     import ibm_db_django.pybase as Base
     import ibm_db_dbi as Database
+    from ibm_db_django import aio
 else:
     import ibm_db_django.jybase as Base
     from com.ziclix.python.sql import zxJDBC as Database
@@ -90,6 +98,8 @@ from django.db.models.expressions import DurationExpression
 
 from django.db.models.constraints import CheckConstraint
 from django.db.models.sql.query import Query
+from django.db.models.query import QuerySet
+from django.db import connections, transaction
 from django.core.exceptions import SynchronousOnlyOperation
 
 def db2_safe_get_check_sql(self, model, schema_editor):
@@ -225,6 +235,144 @@ def db2_safe_combine(self, other, connector, reversed):
 
 Combinable._combine = db2_safe_combine
 
+# Save the original bulk_update
+original_bulk_update = QuerySet.bulk_update
+
+# On Db2 every batch of bulk_update() is a single MERGE of the primary keys and
+# new values, given as a VALUES table, instead of an UPDATE with a CASE WHEN
+# per field and object. Expression values, parent model fields, filtered
+# querysets and Db2 for z/OS (no multi-row VALUES) use Django's implementation.
+def db2_bulk_update(self, objs, fields, batch_size=None):
+    self._for_write = True
+    connection = connections[self.db]
+    if connection.vendor != "DB2":
+        return original_bulk_update(self, objs, fields, batch_size)
+
+    objs = tuple(objs)
+    # Django's checks of the arguments, without any objects nothing is updated.
+    original_bulk_update(self, (), fields, batch_size)
+    if not objs:
+        return 0
+    if not all(obj._is_pk_set() for obj in objs):
+        raise ValueError("All bulk_update() objects must have a primary key set.")
+    opts = self.model._meta
+    fields = [opts.get_field(name) for name in fields]
+    for obj in objs:
+        obj._prepare_related_fields_for_save(operation_name="bulk_update", fields=fields)
+    if (not connection.features.has_bulk_insert or self.query.where or len(opts.pk_fields) != 1 or
+            any(field not in opts.local_concrete_fields for field in fields) or
+            any(hasattr(getattr(obj, field.attname), 'resolve_expression') for obj in objs for field in fields)):
+        return original_bulk_update(self, objs, [field.name for field in fields], batch_size)
+
+    ops = connection.ops
+    merge_fields = [opts.pk] + fields
+    max_batch_size = ops.bulk_batch_size(merge_fields, objs)
+    batch_size = min(batch_size, max_batch_size) if batch_size else max_batch_size
+    columns = [field.column for field in merge_fields]
+    cast_types = [ops.merge_cast_type(field) for field in merge_fields]
+    update_columns = [field.column for field in fields]
+    rows_updated = 0
+    with transaction.atomic(using=self.db, savepoint=False):
+        with connection.cursor() as cursor:
+            for start in range(0, len(objs), batch_size):
+                batch = _first_per_pk(objs[start:start + batch_size])
+                params = [
+                    ops.merge_param(field.get_db_prep_save(getattr(obj, field.attname), connection))
+                    for obj in batch for field in merge_fields
+                ]
+                sql = ops.merge_sql(opts.db_table, columns, cast_types, [["%s"] * len(merge_fields)] * len(batch),
+                                    [[opts.pk.column]], update_columns, insert=False)
+                cursor.execute(sql, params)
+                rows_updated += cursor.rowcount
+    return rows_updated
+
+db2_bulk_update.alters_data = True
+
+# A MERGE fails with SQL0788N when two source rows match the same target row.
+# As with the CASE WHEN of Django's UPDATE, the first occurrence of an object
+# in a batch wins.
+def _first_per_pk(batch):
+    seen = set()
+    unique = []
+    for obj in batch:
+        if obj.pk not in seen:
+            seen.add(obj.pk)
+            unique.append(obj)
+    return unique
+QuerySet.bulk_update = db2_bulk_update
+
+# With OPTIONS['ASYNC_WORKERS'] the async ORM reads of a Db2 alias run on the
+# worker threads of ibm_db_django.aio, each with its own connection, instead
+# of all of them on the one thread of sync_to_async( thread_sensitive=True ).
+if ( djangoVersion[0:2] >= ( 4, 1 ) ) and not _IS_JYTHON:
+    from django.db.models.query import BaseIterable
+
+    def _db2_orm_pool(alias):
+        if connections[alias].vendor != "DB2":
+            return None
+        return aio.orm_pool(alias)
+
+    # The worker pool for a read of the alias, or None when the read has to run
+    # the way Django runs it: without ASYNC_WORKERS, or when the caller's own
+    # connection (the one of the thread sync_to_async( thread_sensitive=True )
+    # runs on, e.g. inside transaction.atomic() or a TestCase) is in a
+    # transaction, so that the read sees the caller's uncommitted writes.
+    async def _db2_read_pool(alias):
+        pool = _db2_orm_pool(alias)
+        if pool is None or aio.in_transaction(alias):
+            return None
+        return pool
+
+    original_async_generator = BaseIterable._async_generator
+
+    async def db2_async_generator(self):
+        pool = await _db2_read_pool(self.queryset.db)
+        if pool is None:
+            async for item in original_async_generator(self):
+                yield item
+            return
+        async for item in pool.iterate(self.__iter__(), self.chunk_size):
+            yield item
+
+    BaseIterable._async_generator = db2_async_generator
+
+    original_queryset_aiter = QuerySet.__aiter__
+
+    def db2_queryset_aiter(self):
+        if _db2_orm_pool(self.db) is None:
+            return original_queryset_aiter(self)
+
+        async def generator():
+            pool = await _db2_read_pool(self.db)
+            if pool is None:
+                async for item in original_queryset_aiter(self):
+                    yield item
+                return
+            await pool.run(self._fetch_all)
+            for item in self._result_cache:
+                yield item
+
+        return generator()
+
+    QuerySet.__aiter__ = db2_queryset_aiter
+
+    def _db2_async_read(name):
+        original = getattr(QuerySet, name)
+
+        async def method(self, *args, **kwargs):
+            pool = await _db2_read_pool(self.db)
+            if pool is None:
+                return await original(self, *args, **kwargs)
+            return await pool.run(getattr(self, name[1:]), *args, **kwargs)
+
+        method.__name__ = method.__qualname__ = name
+        method.__doc__ = original.__doc__
+        return method
+
+    for _name in ('aget', 'acount', 'aexists', 'acontains', 'aaggregate', 'ain_bulk',
+                  'afirst', 'alast', 'aearliest', 'alatest'):
+        setattr(QuerySet, _name, _db2_async_read(_name))
+
 class DatabaseFeatures( BaseDatabaseFeatures ):
     can_use_chunked_reads = True
 
@@ -250,7 +398,6 @@ class DatabaseFeatures( BaseDatabaseFeatures ):
     requires_rollback_on_dirty_transaction = True
     supports_regex_backreferencing = True
     supports_timezones = False
-    has_bulk_insert = False
     has_select_for_update = True
     supports_long_model_names = False
     can_distinct_on_fields = False
@@ -271,7 +418,13 @@ class DatabaseFeatures( BaseDatabaseFeatures ):
     bare_select_suffix = " FROM SYSIBM.DUAL"
     # What kind of error does the backend throw when accessing closed cursor?
     closed_cursor_error_class = dbuError
-    supports_ignore_conflicts = False
+    #bulk_create( ignore_conflicts / update_conflicts ) run as a MERGE
+    supports_ignore_conflicts = True
+    supports_update_conflicts = True
+    supports_update_conflicts_with_target = True
+    #QuerySet.explain() reads the plan back from the explain tables
+    supports_explaining_query_execution = True
+    supported_explain_formats = {'TEXT', 'JSON'}
     # Does the database have a copy of the zoneinfo database?
     has_zoneinfo_database = False
     #DB2 does not support partial indexes
@@ -309,6 +462,37 @@ class DatabaseFeatures( BaseDatabaseFeatures ):
     # Does the backend support non-deterministic collations?
     supports_non_deterministic_collations = False
 
+    # The capabilities which differ between Db2 LUW, z/OS and IBM i are read
+    # from the dialect profile of the alias, so the connection object of a new
+    # thread has them right before it connects. Only the first connection of
+    # the alias in the process has to connect to learn the server flavour.
+    def _profile( self ):
+        profile = getattr( self.connection, 'dialect', None ) or dialect.get_profile( self.connection.alias )
+        if profile is None:
+            try:
+                self.connection.ensure_connection()
+            except SynchronousOnlyOperation:
+                return None
+            profile = self.connection.dialect
+        return profile
+
+    # z/OS has no multi-row VALUES insert, Db2 LUW and IBM i use bulk insert.
+    @property
+    def has_bulk_insert( self ):
+        profile = self._profile()
+        return profile is not None and profile.supports_multirow_insert
+
+    #Generated columns are returned by selecting from the FINAL TABLE of the INSERT
+    @property
+    def can_return_columns_from_insert( self ):
+        profile = self._profile()
+        return profile is not None and profile.supports_final_table
+
+    @property
+    def can_return_rows_from_bulk_insert( self ):
+        profile = self._profile()
+        return profile is not None and profile.supports_multirow_insert and profile.supports_final_table
+
     @cached_property
     def introspected_field_types(self):
         return {
@@ -402,7 +586,16 @@ class DatabaseWrapper( BaseDatabaseWrapper ):
         else:
             self.validation = DatabaseValidation( self )
         self.databaseWrapper = Base.DatabaseWrapper()
-        
+
+        # The SQL rewrite cache is process wide, OPTIONS['REWRITE_CACHE_SIZE'] resizes it.
+        options = self.settings_dict.get( 'OPTIONS' ) or {}
+        if not _IS_JYTHON and options.get( 'REWRITE_CACHE_SIZE' ) is not None:
+            Base.rewrite_cache.resize( options['REWRITE_CACHE_SIZE'] )
+
+        # Server flavour and capabilities, shared by all connections of the
+        # alias once the first of them has connected.
+        self.dialect = dialect.get_profile( self.alias )
+
         # IBM DB2 version 11.1 suports natively LIMIT/OFFSET - see #112
         self._supports_limit_offset = None
 
@@ -412,6 +605,9 @@ class DatabaseWrapper( BaseDatabaseWrapper ):
         Check if server supports LIMIT/OFFSET
         Lazily initialized to avoid sync operations in async contexts
         """
+        profile = self.dialect or dialect.get_profile( self.alias )
+        if profile is not None:
+            return profile.supports_limit_offset
         if self._supports_limit_offset is None:
             try:
                 version = self.get_server_version()
@@ -525,10 +721,15 @@ class DatabaseWrapper( BaseDatabaseWrapper ):
     # To get new connection from Database
     def get_new_connection(self, conn_params):
         connection = self.databaseWrapper.get_new_connection(conn_params)
-        if getattr(connection, dbms_name) == 'DB2':
-            self.features.has_bulk_insert = False
-        else:
-            self.features.has_bulk_insert = True
+        profile = dialect.get_profile( self.alias )
+        if profile is None:
+            profile = dialect.register( self.alias, getattr( connection, dbms_name ),
+                                        self.databaseWrapper.get_server_version( connection ) )
+        self.dialect = profile
+        if not _IS_JYTHON:
+            connection.dialect = profile
+            options = self.settings_dict.get( 'OPTIONS' ) or {}
+            connection.collector = instrumentation.connection_collector( self.alias, options )
         return connection
 
     # Over-riding _cursor method to return DB2 cursor.
@@ -556,6 +757,8 @@ class DatabaseWrapper( BaseDatabaseWrapper ):
             pass
 
         def is_usable(self):
+            if not _IS_JYTHON:
+                return self.databaseWrapper.is_usable( self.connection )
             try:
                 self.databaseWrapper.is_active( self.connection )
             except Exception as e:
@@ -565,11 +768,15 @@ class DatabaseWrapper( BaseDatabaseWrapper ):
 
     def _set_autocommit(self, autocommit):
         self.connection.set_autocommit( autocommit )
+        if not _IS_JYTHON:
+            aio.set_in_transaction( self.alias, not autocommit )
 
     def _close(self):
         if self.connection is not None:
             self.databaseWrapper.close( self.connection )
             self.connection = None
+            if not _IS_JYTHON:
+                aio.set_in_transaction( self.alias, False )
 
     def close( self ):
         if( djangoVersion[0:2] >= ( 1, 5 ) ):
@@ -592,6 +799,8 @@ class DatabaseWrapper( BaseDatabaseWrapper ):
                 self.connection = None
 
     def get_server_version( self ):
+        if self.dialect is not None:
+            return self.dialect.version
         if not self.connection:
             self.cursor()
         return self.databaseWrapper.get_server_version( self.connection )
@@ -0,0 +1,449 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+"""
+Microbenchmarks of the pure Python hot paths of the backend: the format to
+qmark rewrite of DB2CursorWrapper, the row conversion of ConversionPlan, the
+pagination of SQLCompiler.as_sql, SQLCompiler.handle_tuple_in and
+DatabaseOperations.quote_name, and the throughput of bulk_create() against
+one INSERT per row. They are run by python manage.py db2_benchmark on a
+database of the backend; the stand-in driver is enough, as no statement is
+sent to the server except the inserts into the scratch table of the
+bulk_create benchmarks and, with --explain, the statements explained.
+Results are saved as a baseline per release and compared with the baseline
+of an earlier release, each timing taken relative to a fixed pure Python
+loop so baselines from different machines can be compared.
+"""
+
+import contextlib
+import datetime
+import gc
+import json
+import os
+import platform
+import re
+import statistics
+import time
+from decimal import Decimal
+
+from django import VERSION as djangoVersion
+
+import ibm_db_django
+
+# Registered benchmarks, ( name, setup ) in the order they run. setup is a
+# generator function taking the Django connection: it prepares its data,
+# yields the callable to time (or None to skip the benchmark) and undoes
+# its changes when it is resumed.
+_benchmarks = []
+
+# Rows written by one call of a benchmark, by benchmark name, for the
+# benchmarks whose throughput is reported in rows per second.
+_rows = {}
+
+def benchmark( name, rows = None ):
+    def register( setup ):
+        _benchmarks.append( ( name, setup ) )
+        if rows is not None:
+            _rows[name] = rows
+        return setup
+    return register
+
+def names():
+    return [name for name, setup in _benchmarks]
+
+# Statements of the benchmarks whose estimated cost is worth comparing, by
+# benchmark name: functions of the connection returning the SQL and the
+# parameters of the statement, or None when it cannot be built.
+_plans = {}
+
+# Estimated total cost of each statement in _plans, from the explain tables
+# in schema (see explain.explain), or the error raised explaining it. Needs
+# a Db2 server holding the tables of the statements.
+def plan_costs( connection, schema = None ):
+    from ibm_db_django import explain
+    costs = {}
+    with connection.cursor() as cursor:
+        for name, statement in _plans.items():
+            built = statement( connection )
+            if built is None:
+                continue
+            sql, params = cursor.cursor.rewrite( *built )
+            try:
+                plan = explain.explain( cursor, sql, schema )
+                costs[name] = plan.total_cost if plan is not None else None
+            except Exception as e:
+                costs[name] = str( e )
+    return costs
+
+# Loop the timings are taken relative to. It does the same kind of work as
+# the benchmarks (string building, tuple and list handling), so it moves
+# with the speed of the interpreter and of the machine.
+def _calibration():
+    parts = []
+    for index in range( 200 ):
+        parts.append( '"C%d" = ?' % index )
+    return tuple( ' AND '.join( parts ).split( ' AND ' ) )
+
+# Seconds per call of func: rounds of loops calls, loops being doubled until
+# a round takes at least min_time. The best and the median round are kept.
+def measure( func, rounds = 5, min_time = 0.05 ):
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range( loops ):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1 << 24:
+            break
+        loops *= 2 if elapsed <= 0 else max( 2, min( 10, int( min_time / elapsed ) + 1 ) )
+    timings = [elapsed / loops]
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range( rounds - 1 ):
+            start = time.perf_counter()
+            for _ in range( loops ):
+                func()
+            timings.append( ( time.perf_counter() - start ) / loops )
+    finally:
+        if enabled:
+            gc.enable()
+    return {
+        'best': min( timings ),
+        'median': statistics.median( timings ),
+        'loops': loops,
+        'rounds': len( timings ),
+    }
+
+# Runs the benchmarks whose name matches pattern (a regular expression, all
+# when None) and returns the run: the environment, the calibration time and
+# the results by benchmark name. progress, when given, is called with the
+# name and result of each benchmark as it completes.
+def run( connection, pattern = None, rounds = 5, min_time = 0.05, progress = None ):
+    calibration = measure( _calibration, rounds, min_time )['best']
+    results = {}
+    for name, setup in _benchmarks:
+        if pattern is not None and not re.search( pattern, name ):
+            continue
+        steps = setup( connection )
+        try:
+            func = next( steps )
+            if func is None:
+                result = None
+            else:
+                result = measure( func, rounds, min_time )
+                result['relative'] = result['best'] / calibration
+                if name in _rows:
+                    result['rows_per_second'] = _rows[name] / result['best']
+        finally:
+            steps.close()
+        if result is not None:
+            results[name] = result
+        if progress is not None:
+            progress( name, result )
+    return {
+        'version': ibm_db_django.__version__,
+        'django': '.'.join( str( part ) for part in djangoVersion[:3] ),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'created': datetime.datetime.now().isoformat( timespec = 'seconds' ),
+        'calibration': calibration,
+        'results': results,
+    }
+
+def baseline_path( directory, version = None ):
+    return os.path.join( directory, 'ibm_db_django-%s.json' % ( version or ibm_db_django.__version__ ) )
+
+def save( results, directory, version = None ):
+    if not os.path.isdir( directory ):
+        os.makedirs( directory )
+    path = baseline_path( directory, version or results['version'] )
+    with open( path, 'w' ) as target:
+        json.dump( results, target, indent = 2, sort_keys = True )
+    return path
+
+def load( path ):
+    with open( path ) as source:
+        return json.load( source )
+
+def _version_key( version ):
+    return tuple( int( part ) if part.isdigit() else 0 for part in re.split( r'[.\-]', version ) )
+
+# Path of the baseline of the latest release before version in directory,
+# None when there is none.
+def previous_baseline( directory, version = None ):
+    current = _version_key( version or ibm_db_django.__version__ )
+    found = []
+    if os.path.isdir( directory ):
+        for entry in os.listdir( directory ):
+            match = re.match( r'^ibm_db_django-(.+)\.json$', entry )
+            if match and _version_key( match.group( 1 ) ) < current:
+                found.append( ( _version_key( match.group( 1 ) ), os.path.join( directory, entry ) ) )
+    return max( found )[1] if found else None
+
+# Compares two runs on the timings relative to the calibration loop. Returns
+# ( name, baseline relative, current relative, ratio, regressed ) for the
+# benchmarks in both runs; regressed when current is slower by more than
+# tolerance (0.25 for 25%).
+def compare( current, baseline, tolerance = 0.25 ):
+    rows = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get( name )
+        if base is None:
+            continue
+        ratio = result['relative'] / base['relative']
+        rows.append( ( name, base['relative'], result['relative'], ratio, ratio > 1 + tolerance ) )
+    return rows
+
+#
+# Format to qmark rewrite, DB2CursorWrapper.rewrite(), with the plan in the
+# rewrite cache ("rewrite.") and built from scratch ("rewrite_uncached.").
+#
+
+_TABLE = '"BENCH_ORDER"'
+
+def _markers( count ):
+    return ', '.join( ['%s'] * count )
+
+# SQL shapes of the ORM and their parameters.
+_SQL_SHAPES = {
+    'aggregate': (
+        'SELECT "BENCH_ORDER"."CUSTOMER_ID", SUM(("BENCH_ORDER"."QTY" * %s)) AS "TOTAL", '
+        'COALESCE(MAX("BENCH_ORDER"."PRICE"), %s) AS "TOP", COUNT(DISTINCT "BENCH_ORDER"."SKU") AS "SKUS" '
+        'FROM ' + _TABLE + ' WHERE ("BENCH_ORDER"."STATUS" = %s AND "BENCH_ORDER"."CREATED" >= %s) '
+        'GROUP BY "BENCH_ORDER"."CUSTOMER_ID" HAVING SUM(("BENCH_ORDER"."QTY" * %s)) > %s',
+        ( 2, Decimal( '0.00' ), 'open', "TIMESTAMP('2024-01-01 00:00:00.000000')", 2, 100 ) ),
+    'case_coalesce': (
+        'UPDATE ' + _TABLE + ' SET "STATUS" = CASE WHEN ("BENCH_ORDER"."QTY" > %s) THEN %s '
+        'WHEN ("BENCH_ORDER"."QTY" = %s) THEN %s ELSE COALESCE("BENCH_ORDER"."STATUS", %s) END, '
+        '"PRICE" = ("BENCH_ORDER"."PRICE" + %s) WHERE "BENCH_ORDER"."ID" IN (%s, %s, %s)',
+        ( 10, 'bulk', 0, 'empty', 'open', Decimal( '1.50' ), 1, 2, 3 ) ),
+    'in_1000': (
+        'SELECT "BENCH_ORDER"."ID", "BENCH_ORDER"."STATUS" FROM ' + _TABLE +
+        ' WHERE "BENCH_ORDER"."ID" IN (' + _markers( 1000 ) + ')',
+        tuple( range( 1000 ) ) ),
+    'insert_default': (
+        'INSERT INTO ' + _TABLE + ' ("CUSTOMER_ID", "STATUS", "QTY", "PRICE", "CREATED", "NOTE") '
+        'VALUES (%s, %s, %s, %s, %s, %s)',
+        ( 7, 'DEFAULT', 3, Decimal( '9.99' ), "TIMESTAMP('2024-01-01 10:00:00.000000')", 'DEFAULT' ) ),
+}
+
+def _register_rewrite( shape ):
+    operation, parameters = _SQL_SHAPES[shape]
+
+    @benchmark( 'rewrite.%s' % shape )
+    def cached( connection ):
+        with connection.cursor() as cursor:
+            rewrite = cursor.cursor.rewrite
+            yield lambda: rewrite( operation, parameters )
+
+    @benchmark( 'rewrite_uncached.%s' % shape )
+    def uncached( connection ):
+        from ibm_db_django import pybase, sqltokenizer
+        with connection.cursor() as cursor:
+            adapt = cursor.cursor._adapt_parameters
+            def rewrite():
+                plan = pybase.RewritePlan( sqltokenizer.tokenize( operation ), pybase._param_signature( parameters ) )
+                return plan.apply( adapt( parameters ) )
+            yield rewrite
+
+for _shape in _SQL_SHAPES:
+    _register_rewrite( _shape )
+
+# Uncached rewrite of an IN list of 10 to 10000 markers, which should take
+# time linear in the number of markers.
+def _register_marker_series( count ):
+    operation = ( 'SELECT "BENCH_ORDER"."ID" FROM ' + _TABLE + ' WHERE "BENCH_ORDER"."ID" IN (' +
+                  _markers( count ) + ')' )
+    parameters = tuple( range( count ) )
+
+    @benchmark( 'rewrite_uncached.markers_%d' % count )
+    def markers( connection ):
+        from ibm_db_django import pybase, sqltokenizer
+        def rewrite():
+            plan = pybase.RewritePlan( sqltokenizer.tokenize( operation ), pybase._param_signature( parameters ) )
+            return plan.apply( parameters )
+        yield rewrite
+
+for _count in ( 10, 100, 1000, 10000 ):
+    _register_marker_series( _count )
+
+#
+# Row conversion, ConversionPlan.apply() over a wide result set.
+#
+
+@benchmark( 'convert.wide_1000x40' )
+def convert_wide( connection ):
+    from ibm_db_django import pybase
+    Database = pybase.Database
+    types = ( Database.NUMBER, Database.STRING, Database.DATETIME, Database.DATE, Database.STRING )
+    description = [( 'C%d' % index, types[index % len( types )], 20, 20, 10, 0, True ) for index in range( 40 )]
+    values = ( 42, 'value', datetime.datetime( 2024, 5, 1, 12, 30 ), datetime.date( 2024, 5, 1 ), 'with\x00nul' )
+    rows = [tuple( values[index % len( values )] for index in range( 40 ) ) for _ in range( 1000 )]
+    plan = pybase.ConversionPlan( description, True )
+    yield lambda: plan.apply( rows )
+
+#
+# Inserts through the whole stack, QuerySet.bulk_create() ("bulk_create.")
+# against one Model.save() per row ("insert_per_row."), into a BENCH_BULK_ROW
+# table created for the benchmark and dropped after it.
+#
+
+_BULK_ROWS = 1000
+
+_bulk_row_model = None
+
+def _bulk_model():
+    global _bulk_row_model
+    if _bulk_row_model is None:
+        from django.db import models
+
+        class BenchBulkRow( models.Model ):
+            customer_id = models.IntegerField()
+            status = models.CharField( max_length = 20 )
+            price = models.DecimalField( max_digits = 10, decimal_places = 2 )
+            day = models.DateField()
+
+            class Meta:
+                app_label = 'ibm_db_django'
+                db_table = 'BENCH_BULK_ROW'
+
+        _bulk_row_model = BenchBulkRow
+    return _bulk_row_model
+
+def _bulk_insert( connection, per_row ):
+    model = _bulk_model()
+    with connection.schema_editor() as editor:
+        editor.create_model( model )
+    try:
+        day = datetime.date( 2024, 5, 1 )
+        def objects():
+            return [model( customer_id = index % 50, status = 'open', price = Decimal( '9.99' ), day = day )
+                    for index in range( _BULK_ROWS )]
+        if per_row:
+            def insert():
+                for obj in objects():
+                    obj.save( using = connection.alias, force_insert = True )
+        else:
+            manager = model._default_manager.db_manager( connection.alias )
+            def insert():
+                manager.bulk_create( objects() )
+        yield insert
+    finally:
+        with connection.schema_editor() as editor:
+            editor.delete_model( model )
+
+@benchmark( 'bulk_create.%d' % _BULK_ROWS, rows = _BULK_ROWS )
+def bulk_create( connection ):
+    return _bulk_insert( connection, False )
+
+@benchmark( 'insert_per_row.%d' % _BULK_ROWS, rows = _BULK_ROWS )
+def insert_per_row( connection ):
+    return _bulk_insert( connection, True )
+
+#
+# Pagination, SQLCompiler.as_sql() with an OFFSET: the ROW_NUMBER() rewrite
+# for servers before 11.1 and LIMIT/OFFSET for later ones.
+#
+
+def _user_queryset():
+    from django.apps import apps
+    if not apps.is_installed( 'django.contrib.auth' ):
+        return None
+    from django.contrib.auth.models import User
+    return User.objects.filter( is_active = True, username__startswith = 'a' ).order_by( 'last_name', 'id' )
+
+# Compiles as if the server were of the given version.
+@contextlib.contextmanager
+def _server_version( connection, version ):
+    from ibm_db_django import dialect
+    connection.ensure_connection()
+    saved = connection.dialect
+    connection.dialect = dialect.DialectProfile.build( 'DB2/LINUXX8664', version )
+    try:
+        yield
+    finally:
+        connection.dialect = saved
+
+def _page_query():
+    queryset = _user_queryset()
+    return queryset[1000:1025].query if queryset is not None else None
+
+def _paginate( connection, version ):
+    query = _page_query()
+    if query is None:
+        yield None
+        return
+    with _server_version( connection, version ):
+        yield lambda: query.get_compiler( connection = connection ).as_sql()
+
+def _paginate_plan( version ):
+    def statement( connection ):
+        query = _page_query()
+        if query is None:
+            return None
+        with _server_version( connection, version ):
+            return query.get_compiler( connection = connection ).as_sql()
+    return statement
+
+@benchmark( 'paginate.row_number' )
+def paginate_row_number( connection ):
+    return _paginate( connection, ( 10, 5, 0 ) )
+
+@benchmark( 'paginate.limit_offset' )
+def paginate_limit_offset( connection ):
+    return _paginate( connection, ( 11, 5, 0 ) )
+
+_plans['paginate.row_number'] = _paginate_plan( ( 10, 5, 0 ) )
+_plans['paginate.limit_offset'] = _paginate_plan( ( 11, 5, 0 ) )
+
+#
+# SQLCompiler.handle_tuple_in() on a two column key.
+#
+
+def _tuple_in( connection, count ):
+    from django.db.models.expressions import Col
+    from django.db.models.fields.tuple_lookups import Tuple, TupleIn
+    queryset = _user_queryset()
+    if queryset is None:
+        yield None
+        return
+    meta = queryset.model._meta
+    table = meta.db_table
+    node = TupleIn( Tuple( Col( table, meta.get_field( 'id' ) ), Col( table, meta.get_field( 'username' ) ) ),
+                    [( index, 'user%d' % index ) for index in range( count )] )
+    compiler = queryset.query.get_compiler( connection = connection )
+    yield lambda: compiler.handle_tuple_in( node )
+
+@benchmark( 'tuple_in.100' )
+def tuple_in_100( connection ):
+    return _tuple_in( connection, 100 )
+
+@benchmark( 'tuple_in.2000' )
+def tuple_in_2000( connection ):
+    return _tuple_in( connection, 2000 )
+
+#
+# DatabaseOperations.quote_name() over the names of a model.
+#
+
+@benchmark( 'quote_name' )
+def quote_name( connection ):
+    names = ['customer_id', 'Status', '"CREATED"', 'bench_order', 'price', '"Mixed"', 'note', 'u0'] * 8
+    quote = connection.ops.quote_name
+    yield lambda: [quote( name ) for name in names]
@@ -18,6 +18,7 @@
 
 from django.db.models.sql import compiler
 import sys
+import json
 from django.db.models.functions.json import JSONObject
 
 if sys.version_info >= (3, ):
@@ -29,6 +30,7 @@ if sys.version_info >= (3, ):
 from django import VERSION as djangoVersion
 
 import datetime
+import functools
 import math
 from django.db.models.sql.query import get_order_dir
 from django.db.models.sql.constants import ORDER_DIR
@@ -46,8 +48,45 @@ from django.db.models.functions import Log, Ln
 from django.db.models.expressions import ExpressionWrapper, F
 from django.db.models import FloatField
 from django.db.models.functions import MD5
+from django.db.models.constants import OnConflict
+from django.db.models.lookups import In
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.datastructures import OrderedSet
+from ibm_db_django import instrumentation
+from ibm_db_django.instrumentation import timed_conversion
+from ibm_db_django import explain
+from ibm_db_django.pybase import StagedRows
 FORCE = object()
 
+_ROWNUM = '__ROWNUM'
+
+# IN lists of more values than OPTIONS['IN_LIST_THRESHOLD'] (default below)
+# are written as OPTIONS['IN_LIST_STRATEGY'] says, see SQLCompiler.handle_large_in.
+IN_LIST_STRATEGIES = ( 'temp_table', 'array' )
+DEFAULT_IN_LIST_THRESHOLD = 1000
+_FOR_UPDATE = ' WITH RS USE AND KEEP UPDATE LOCKS'
+
+# SQL around the query of a page (see SQLCompiler._row_number_sql), for
+# the quoted aliases of the result columns, the window of a second numbering level (None
+# when the query numbers its own rows) and the bounds of the page, which
+# are bound as parameters so all the pages of a query share a statement.
+# The rows of a subquery are not ordered.
+@functools.lru_cache(maxsize=512)
+def _pagination_template(quoted_columns, window, low, high, ordered):
+    rownum = 'Z."%s"' % _ROWNUM
+    prefix = 'SELECT %s FROM ( ' % ', '.join('Z.%s' % column for column in quoted_columns)
+    if window is not None:
+        prefix += 'SELECT Z0.*, ROW_NUMBER() OVER (%s) AS "%s" FROM ( ' % (window, _ROWNUM)
+        suffix = ' ) AS Z0 ) AS Z'
+    else:
+        suffix = ' ) AS Z'
+    bounds = (['%s > %%s' % rownum] if low else []) + (['%s <= %%s' % rownum] if high else [])
+    if bounds:
+        suffix += ' WHERE %s' % ' AND '.join(bounds)
+    if ordered:
+        suffix += ' ORDER BY %s' % rownum
+    return prefix, suffix
+
 class PiDB2(Pi):
     def as_sql(self, compiler, connection, **extra_context):
         return super().as_sql(
@@ -86,7 +125,6 @@ class FuncDB2(Func):
         return sql % tuple(params), []
 
 class SQLCompiler( compiler.SQLCompiler ):
-    __rownum = 'Z.__ROWNUM'
 
     def handle_tuple_in(self, node):
         """
@@ -152,25 +190,137 @@ class SQLCompiler( compiler.SQLCompiler ):
     
             lhs_parts_sql, lhs_parts_params = compile_lhs_parts()
             arity = len(lhs_parts_sql)
-    
-            # Build OR-of-AND comparisons
-            conditions = []
-            params = []
+            rows = []
             for val_tuple in valid_values:
                 if not isinstance(val_tuple, (list, tuple)):
                     val_tuple = (val_tuple,)
                 if len(val_tuple) != arity:
                     return "1=0", []
-                sub_cond = " AND ".join(f"{lhs_parts_sql[i]} = %s" for i in range(arity))
-                conditions.append("(" + sub_cond + ")")
-                params.extend(val_tuple)
-    
-            sql = "(" + " OR ".join(conditions) + ")"
-            return sql, lhs_parts_params + params
+                rows.append(tuple(val_tuple))
+
+            ops = self.connection.ops
+            cast_types = self._tuple_in_cast_types(node, fields, arity)
+            if len(rows) <= ops.tuple_in_or_rows or cast_types is None:
+                strategy = 'or'
+            elif len(rows) * arity <= ops.tuple_in_max_markers or not self._can_stage_rows():
+                strategy = 'values'
+            else:
+                strategy = 'staged'
+            instrumentation.note('tuple_in', strategy)
+
+            if strategy == 'or':
+                # Build OR-of-AND comparisons
+                conditions = []
+                params = []
+                for val_tuple in rows:
+                    sub_cond = " AND ".join(f"{lhs_parts_sql[i]} = %s" for i in range(arity))
+                    conditions.append("(" + sub_cond + ")")
+                    params.extend(val_tuple)
+                sql = "(" + " OR ".join(conditions) + ")"
+                return sql, lhs_parts_params + params
+
+            lhs_sql = "(" + ", ".join(lhs_parts_sql) + ")"
+            if strategy == 'staged':
+                # One parameter whatever the number of rows, see StagedRows.
+                staged = StagedRows(cast_types, [tuple(ops.merge_param(value) for value in val_tuple)
+                                                 for val_tuple in rows])
+                columns = ", ".join("V%d" % (position + 1) for position in range(arity))
+                return f"{lhs_sql} IN (SELECT {columns} FROM %s)", list(lhs_parts_params) + [staged]
+
+            # (a, b) IN (VALUES ...), matched by Db2 as a join with the VALUES
+            # table. Markers in a VALUES table have no type, so each is cast.
+            row_sql = "(" + ", ".join("CAST(%%s AS %s)" % cast_type for cast_type in cast_types) + ")"
+            params = [ops.merge_param(value) for val_tuple in rows for value in val_tuple]
+            sql = f"{lhs_sql} IN (VALUES {', '.join([row_sql] * len(rows))})"
+            return sql, list(lhs_parts_params) + params
     
         # 4) Unsupported RHS
         return "1=0", []
 
+    # Column types the values of a TupleIn list are cast to in a VALUES table,
+    # or None when some of them are unknown.
+    def _tuple_in_cast_types(self, node, fields, arity):
+        if not fields:
+            fields = [getattr(expr, 'output_field', None)
+                      for expr in getattr(node.lhs, 'source_expressions', None) or [node.lhs]]
+        if len(fields) != arity:
+            return None
+        cast_types = []
+        for field in fields:
+            try:
+                db_type = field.db_type(self.connection)
+            except Exception:
+                return None
+            if not db_type:
+                return None
+            cast_types.append(self.connection.ops.merge_cast_type(field))
+        return cast_types
+
+    # Long IN lists of direct values, with OPTIONS['IN_LIST_STRATEGY'] set, become
+    # a subquery on the values instead of a marker per value: with 'temp_table'
+    # they are bound as one StagedRows parameter, which the cursor executing
+    # the statement inserts into a declared global temporary table with one
+    # array insert just before running it; with 'array' they are bound as one
+    # JSON array which JSON_TABLE unnests (Db2 LUW 11.5 and later, other servers
+    # use the temporary table). Returns None for the usual IN ( %s, ... ) list.
+    def handle_large_in(self, node):
+        options = self.connection.settings_dict.get('OPTIONS') or {}
+        strategy = options.get('IN_LIST_STRATEGY')
+        if not strategy or not node.rhs_is_direct_value() or node.bilateral_transforms:
+            return None
+        if strategy not in IN_LIST_STRATEGIES:
+            raise ImproperlyConfigured("OPTIONS['IN_LIST_STRATEGY'] must be one of %s, not %r."
+                                       % (', '.join(IN_LIST_STRATEGIES), strategy))
+        # A list no longer than the threshold keeps its markers without being
+        # copied; one longer is only so once deduplicated.
+        threshold = int(options.get('IN_LIST_THRESHOLD') or DEFAULT_IN_LIST_THRESHOLD)
+        if len(node.rhs) <= threshold:
+            return None
+        try:
+            values = OrderedSet(node.rhs)
+        except TypeError:  # Unhashable items in the list
+            return None
+        values.discard(None)
+        if len(values) <= threshold:
+            return None
+        sqls, params = node.batch_process_rhs(self, self.connection, values)
+        if any(sql != '%s' for sql in sqls):
+            return None
+        try:
+            cast_type = self.connection.ops.merge_cast_type(node.lhs.output_field)
+        except Exception:
+            return None
+        if not cast_type:
+            return None
+        params = [self.connection.ops.merge_param(param) for param in params]
+
+        if not self._can_stage_rows():
+            return None
+        dialect = self.connection.dialect
+        if strategy == 'array' and not (dialect.is_luw and dialect.version[:2] >= (11, 5)
+                                        and all(type(param) in (int, str) for param in params)):
+            strategy = 'temp_table'
+
+        lhs_sql, lhs_params = node.process_lhs(self, self.connection)
+        if strategy == 'array':
+            # Without ERROR ON ERROR a document JSON_TABLE cannot read gives
+            # no rows, and the lookup silently matches nothing.
+            subquery = ("SELECT T.V FROM JSON_TABLE(CAST(%%s AS CLOB) FORMAT JSON, '$[*]' "
+                        "COLUMNS (V %s PATH '$') ERROR ON ERROR) AS T" % cast_type)
+            sql, params = "%s IN (%s)" % (lhs_sql, subquery), tuple(lhs_params) + (json.dumps(params),)
+        else:
+            staged = StagedRows((cast_type,), [(param,) for param in params])
+            sql, params = "%s IN (SELECT V1 FROM %%s)" % lhs_sql, tuple(lhs_params) + (staged,)
+        instrumentation.note('in_list', strategy)
+        return sql, params
+
+    # Whether the server can take a StagedRows parameter: Db2 for z/OS has no
+    # DECLARE GLOBAL TEMPORARY TABLE ... WITH REPLACE.
+    def _can_stage_rows(self):
+        if self.connection.dialect is None:
+            self.connection.ensure_connection()
+        return not self.connection.dialect.is_zos
+
     def handle_tuple_exact_subquery(self, node):
         alias = node.lhs.alias
         fields = node.lhs.targets
@@ -194,34 +344,30 @@ class SQLCompiler( compiler.SQLCompiler ):
                 f"but {len(fields)} fields are being compared."
             )
     
-        conditions = []
+        # One subquery for all the columns: (a, b) = (SELECT c1, c2 ... FETCH FIRST 1 ROW ONLY),
+        # which keeps the first row semantics of a scalar subquery per column. As
+        # all the columns come from the same row, the ordering of the subquery is kept.
+        lhs_parts = []
         params = []
-    
-        for field, rhs_field in zip(fields, rhs_expressions):
-            # LHS: compile the local field
-            lhs_expr = Col(alias, field)
-            lhs_sql, lhs_params = self.compile(lhs_expr)
-        
-            # RHS: build a Col pointing to the subquery's alias and field
-            rhs_alias = q.alias_map.keys().__iter__().__next__()  # usually 'U0'
-            rhs_col_expr = Col(rhs_alias, rhs_field)
-        
-            # Create a new subquery selecting only the right column
-            q_clone = q.clone()
-            q_clone.select = (rhs_col_expr,)
-            q_clone.select_related = False
-            q_clone.group_by = None
-            q_clone.order_by = ()
-            q_clone.low_mark = 0
-            q_clone.high_mark = 1
-        
-            subq_sql, subq_params = self.compile(q_clone)
-        
-            conditions.append(f"{lhs_sql} = ({subq_sql})")
+        for field in fields:
+            lhs_sql, lhs_params = self.compile(Col(alias, field))
+            lhs_parts.append(lhs_sql)
             params.extend(lhs_params)
-            params.extend(subq_params)
-    
-        return " AND ".join(conditions), params
+
+        rhs_alias = getattr(select_list[0], 'alias', None) or next(iter(q.alias_map))  # usually 'U0'
+        q_clone = q.clone()
+        q_clone.select = tuple(Col(rhs_alias, rhs_field) for rhs_field in rhs_expressions)
+        # The values() selection of the subquery takes precedence over select.
+        if getattr(q_clone, 'selected', None) is not None:
+            q_clone.selected = None
+        q_clone.select_related = False
+        q_clone.group_by = None
+        q_clone.high_mark = q_clone.low_mark + 1
+
+        subq_sql, subq_params = self.compile(q_clone)
+        params.extend(subq_params)
+        instrumentation.note('tuple_exact', 'row_value')
+        return f"({', '.join(lhs_parts)}) = {subq_sql}", params
 
 
     def compile(self, node):
@@ -245,6 +391,11 @@ class SQLCompiler( compiler.SQLCompiler ):
     
         if isinstance(node, TupleExact) and isinstance(node.rhs, Query):
             return self.handle_tuple_exact_subquery(node)
+
+        if isinstance(node, In):
+            large_in = self.handle_large_in(node)
+            if large_in is not None:
+                return large_in
     
         vendor_impl = getattr(node, 'as_' + self.connection.vendor, None)
         if vendor_impl:
@@ -296,114 +447,55 @@ class SQLCompiler( compiler.SQLCompiler ):
         elif not ( with_limits and ( self.query.high_mark is not None or self.query.low_mark ) ):
             sql, params = super( SQLCompiler, self ).as_sql( with_limits=False, with_col_aliases=with_col_aliases )
             sql = self._move_for_update_sql_to_end(sql)            
-            return sql, params
+        elif self.query.low_mark == 0:
+            sql, params = super( SQLCompiler, self ).as_sql( with_limits=False, with_col_aliases=with_col_aliases )
+            sql = self._move_for_update_sql_to_end(sql)
+            sql = sql + " FETCH FIRST %s ROWS ONLY" % ( self.query.high_mark )
         else:
-            sql_ori, params = super( SQLCompiler, self ).as_sql( with_limits=False, with_col_aliases=with_col_aliases )
-            sql_ori = self._move_for_update_sql_to_end(sql_ori)            
-            if self.query.low_mark == 0:
-                return sql_ori + " FETCH FIRST %s ROWS ONLY" % ( self.query.high_mark ), params
-            sql_split = sql_ori.split( " FROM " )
-
-            sql_sec = ""
-            if len( sql_split ) > 2:
-                for i in range( 1, len( sql_split ) ):
-                    sql_sec = " %s FROM %s " % ( sql_sec, sql_split[i] )
-            else:
-                sql_sec = " FROM %s " % ( sql_split[1] )
-
-            dummyVal = "Z.__db2_"
-            sql_pri = ""
-
-            sql_sel = "SELECT"
-            if self.query.distinct:
-                sql_sel = "SELECT DISTINCT"
-
-            sql_select_token = sql_split[0].split( "," )
-            
-            # rejoin items that use comma in a db function
-            new_sql_select_token = []
-            paren_count = 0
-            column_fragment = None
-            for column in sql_select_token:
-                paren_count += column.count('(') - column.count(')')
-                if paren_count > 0:
-                    if column_fragment:
-                        column_fragment = ', '.join([column_fragment, column])
-                    else:
-                        column_fragment = column
-                elif paren_count == 0 and column_fragment:
-                    new_sql_select_token.append(', '.join([column_fragment, column]))
-                    column_fragment = None
-                else:
-                    new_sql_select_token.append(column)
-            sql_select_token = new_sql_select_token
-            
-            i = 0
-            first_field_no = 0
-            while ( i < len( sql_select_token ) ):
-                if sql_select_token[i].count( "TIMESTAMP(DATE(SUBSTR(CHAR(" ) == 1:
-                    sql_sel = "%s \"%s%d\"," % ( sql_sel, dummyVal, i + 1 )
-                    sql_pri = '%s %s,%s,%s,%s AS "%s%d",' % (
-                                    sql_pri,
-                                    sql_select_token[i],
-                                    sql_select_token[i + 1],
-                                    sql_select_token[i + 2],
-                                    sql_select_token[i + 3],
-                                    dummyVal, i + 1 )
-                    i = i + 4
-                    continue
-
-                token = sql_select_token[i]
-
-                # 1) Quoted alias first: ... AS "alias"
-                if ' AS "' in token:
-                    expr, alias_part = token.rsplit(' AS "', 1)
-                    alias = alias_part.strip()
-                    if alias.endswith('"'):
-                        alias = alias[:-1].strip()
-                    if alias:
-                        sql_pri = '%s %s,' % (sql_pri, token)
-                        sql_sel = '%s "%s",' % (sql_sel, alias)
-                        i = i + 1
-                        continue
-                
-                # 2) Unquoted alias fallback: ... AS alias                
-                if " AS " in token:
-                    expr, alias = token.rsplit(" AS ", 1)
-                    alias = alias.strip()
-                    if alias and not "(" in alias:
-                        sql_pri = '%s %s,' % (sql_pri, token)
-                        sql_sel = "%s %s," % (sql_sel, alias)
-                        i = i + 1
-                        continue
-
-                sql_pri = '%s %s AS "%s%d",' % ( sql_pri, sql_select_token[i], dummyVal, i + 1 )
-                sql_sel = "%s \"%s%d\"," % ( sql_sel, dummyVal, i + 1 )
-                i = i + 1
-                if first_field_no == 0:
-                    first_field_no = i
-
-            sql_pri = sql_pri[:len( sql_pri ) - 1]
-            sql_pri = "%s%s" % ( sql_pri, sql_sec )
-            sql_sel = sql_sel[:len( sql_sel ) - 1]
-            if sql_pri.endswith("DESC ") or sql_pri.endswith("ASC ") or sql_pri.endswith("WITH RS USE AND KEEP UPDATE LOCKS "):
-                sql = '%s, ( ROW_NUMBER() OVER() ) AS "%s" FROM ( %s ) AS M' % ( sql_sel, self.__rownum, sql_pri )
-            else:
-                sql_field = "\"%s%d\"" % (dummyVal, first_field_no)
-                sql = '%s, ( ROW_NUMBER() OVER() ) AS "%s" FROM ( %s ORDER BY %s ASC ) AS M' % ( sql_sel, self.__rownum, sql_pri, sql_field)
-            sql = '%s FROM ( %s ) Z WHERE' % ( sql_sel, sql )
-
-            if self.query.low_mark != 0:
-                sql = '%s "%s" > %d' % ( sql, self.__rownum, self.query.low_mark )
-
-            if self.query.low_mark != 0 and self.query.high_mark is not None:
-                sql = '%s AND ' % ( sql )
-
-            if self.query.high_mark is not None:
-                sql = '%s "%s" <= %d' % ( sql, self.__rownum, self.query.high_mark )
-
+            sql, params = self._row_number_sql()
+        optimize_for = getattr( self.query, 'db2_optimize_for', None )
+        if optimize_for and not self.query.subquery:
+            sql = self._add_optimize_for( sql, optimize_for )
         return sql, params
 
+    # OPTIMIZE FOR n ROWS of ibm_db_django.pagination.optimize_for(), which
+    # goes before the isolation clause of a SELECT ... FOR UPDATE.
+    def _add_optimize_for( self, sql, rows ):
+        clause = ' OPTIMIZE FOR %d ROWS' % rows
+        if _FOR_UPDATE in sql:
+            head, tail = sql.rsplit( _FOR_UPDATE, 1 )
+            return head + clause + _FOR_UPDATE + tail
+        return sql + clause
+
+    # Pagination for servers before 11.1, which have no LIMIT/OFFSET. The query
+    # is compiled with a ROW_NUMBER() OVER (ORDER BY <its ordering>) column in
+    # place of its ORDER BY (see pre_sql_setup) and wrapped in one subquery
+    # keeping the rows of the page. DISTINCT and combined queries are numbered
+    # in a second level, over the columns of their result.
+    def _row_number_sql( self ):
+        pagination = self._pagination = {}
+        subquery = self.query.subquery
+        # Django would wrap a subquery to drop the extra select columns, the
+        # row number included; the wrapper below selects the columns itself.
+        self.query.subquery = False
+        try:
+            sql, params = super( SQLCompiler, self ).as_sql( with_limits=False, with_col_aliases=True )
+        finally:
+            self.query.subquery = subquery
+            self._pagination = None
+        sql = self._move_for_update_sql_to_end( sql )
+        for_update = ''
+        if sql.endswith( _FOR_UPDATE ):
+            sql = sql[:-len( _FOR_UPDATE )]
+            for_update = _FOR_UPDATE
+        low_mark, high_mark = self.query.low_mark, self.query.high_mark
+        quote_name = self.connection.ops.quote_name
+        prefix, suffix = _pagination_template( tuple( quote_name( column ) for column in pagination['columns'] ),
+                                               pagination.get( 'window' ), low_mark != 0, high_mark is not None,
+                                               not subquery )
+        params = tuple( params ) + ( ( low_mark, ) if low_mark else () ) + ( ( high_mark, ) if high_mark is not None else () )
+        return prefix + sql + suffix + for_update, params
+
     def pre_sql_setup(self, with_col_aliases=False):
         """
         Do any necessary class setup immediately prior to producing SQL. This
@@ -422,6 +514,10 @@ class SQLCompiler( compiler.SQLCompiler ):
         else:
             extra_select, order_by, group_by = super().pre_sql_setup()
 
+        pagination = getattr(self, '_pagination', None)
+        if pagination is not None:
+            extra_select, order_by = self._number_rows(pagination, extra_select, order_by)
+
         if group_by:
             group_by_list = []
             for (sql, params) in group_by:
@@ -458,6 +554,55 @@ class SQLCompiler( compiler.SQLCompiler ):
 
         return extra_select, order_by, group_by
 
+    # Moves the ordering of a paginated query into the ROW_NUMBER() column of
+    # _row_number_sql(): as an extra select column of the query itself, or for
+    # DISTINCT and combined queries as the window of the wrapping level, over
+    # the aliases of the result columns (Django selects the ordering columns
+    # of a DISTINCT query). Without an ordering the rows are numbered in the
+    # order of the first column.
+    def _number_rows(self, pagination, extra_select, order_by):
+        qn = self.connection.ops.quote_name
+        pagination['columns'] = tuple(alias for _, _, alias in self.select)
+        if self.query.distinct or self.query.combinator:
+            extra_select = [(expr, sql_params, alias or '__ORDER%d' % index)
+                            for index, (expr, sql_params, alias) in enumerate(extra_select, start=1)]
+            aliases = {}
+            for _, (s_sql, s_params), alias in self.select + extra_select:
+                aliases.setdefault((s_sql, make_hashable(s_params)), alias)
+            ordering = []
+            for expr, (o_sql, o_params, is_ref) in order_by:
+                expression = self.ordering_parts.search(o_sql)[1]
+                if is_ref:
+                    # A select alias, or the position of a selected expression.
+                    ref = expr.get_source_expressions()[0]
+                    ordinal = getattr(ref, 'ordinal', None)
+                    column = qn(pagination['columns'][ordinal - 1] if ordinal else ref.refs)
+                else:
+                    alias = aliases.get((expression, make_hashable(o_params)))
+                    column = qn(alias) if alias is not None else None
+                if column is not None:
+                    ordering.append('Z0.%s%s' % (column, o_sql[len(expression):]))
+            if not ordering and pagination['columns']:
+                ordering.append('Z0.%s' % qn(pagination['columns'][0]))
+            pagination['window'] = 'ORDER BY %s' % ', '.join(ordering) if ordering else ''
+            return extra_select, []
+
+        ordering = []
+        params = []
+        for expr, (o_sql, o_params, is_ref) in order_by:
+            if is_ref:
+                # ORDER BY a select alias, which the window cannot see.
+                resolved = expr.copy()
+                resolved.set_source_expressions([expr.get_source_expressions()[0].source])
+                o_sql, o_params = self.compile(resolved)
+            ordering.append(o_sql)
+            params.extend(o_params)
+        if not ordering and self.select:
+            ordering.append(self.select[0][1][0])
+            params.extend(self.select[0][1][1])
+        window = 'ROW_NUMBER() OVER (%s)' % ('ORDER BY %s' % ', '.join(ordering) if ordering else '')
+        return extra_select + [(None, (window, params), _ROWNUM)], []
+
     def get_updated_select(self, select):
         """
         Return three values:
@@ -497,6 +642,58 @@ class SQLCompiler( compiler.SQLCompiler ):
         else:
             return map(None, value, field)
 
+    # EXPLAIN PLAN FOR only fills the explain tables: the statement is explained
+    # as the cursor would send it, and the plan read back is formatted as text
+    # or JSON (cost, cardinality, join methods and indexes used).
+    def explain_query( self ):
+        explain_info = self.query.explain_info
+        self.connection.ops.explain_query_prefix( explain_info.format, **explain_info.options )
+        self.query.explain_info = None
+        try:
+            sql, params = self.as_sql()
+        finally:
+            self.query.explain_info = explain_info
+        options = self.connection.settings_dict.get( 'OPTIONS' ) or {}
+        with self.connection.cursor() as cursor:
+            # Rows are staged as execute() stages them, so the statement
+            # explained reads the temporary table the query would read.
+            if any( isinstance( param, StagedRows ) for param in params ):
+                params = cursor.cursor._stage_parameters( params )
+            sql, params = cursor.cursor.rewrite( sql, params )
+            plan = explain.explain( cursor, sql, options.get( 'EXPLAIN_SCHEMA' ) )
+        if plan is None:
+            raise DatabaseError( "The access plan was not found in the explain tables." )
+        if explain_info.format and explain_info.format.upper() == 'JSON':
+            yield json.dumps( plan.as_dict(), indent = 2 )
+        else:
+            for line in plan.text_lines():
+                yield line
+
+    # The StatementRecord of the statement run by execute_sql is taken from the
+    # connection, so that apply_converters reports the conversion time of
+    # exactly that statement, and of none when the query ran no statement.
+    def execute_sql( self, *args, **kwargs ):
+        connection = self.connection.connection
+        if connection is not None:
+            connection.last_record = None
+        self._conversion_record = None
+        result = super( SQLCompiler, self ).execute_sql( *args, **kwargs )
+        connection = self.connection.connection
+        if connection is not None:
+            self._conversion_record = getattr( connection, 'last_record', None )
+            connection.last_record = None
+        return result
+
+    # With an instrumentation collector, the time spent in the converters of the
+    # backend and of the fields is reported for the statement of execute_sql.
+    def apply_converters( self, rows, converters ):
+        record = getattr( self, '_conversion_record', None )
+        if record is None:
+            return super( SQLCompiler, self ).apply_converters( rows, converters )
+        self._conversion_record = None
+        return timed_conversion( super( SQLCompiler, self ).apply_converters, rows, converters,
+                                 self.connection.connection.collector, record )
+
     #This function  convert 0/1 to boolean type for BooleanField/NullBooleanField
     def resolve_columns( self, row, fields = () ):
         values = []
@@ -531,6 +728,94 @@ class SQLInsertCompiler( compiler.SQLInsertCompiler, SQLCompiler ):
             return self.connection.ops.insert_default_sql()
         return super().prepare_value(field, value)
 
+    # Db2 has no RETURNING clause, the returning columns are selected from the
+    # FINAL TABLE of the INSERT instead, in the order the rows were given.
+    def as_sql(self):
+        if self.query.on_conflict is not None and self.query.fields:
+            return self.merge_as_sql()
+        result = super().as_sql()
+        if not ( self.returning_fields and self.connection.features.can_return_columns_from_insert ):
+            return result
+        qn = self.connection.ops.quote_name
+        columns = ", ".join( qn( field.column ) for field in self.returning_fields )
+        return [( "SELECT %s FROM FINAL TABLE (%s) ORDER BY INPUT SEQUENCE" % ( columns, sql ), params )
+                for sql, params in result]
+
+    # A MERGE cannot be selected from, so rows upserted through on_conflict
+    # do not return their columns.
+    def execute_sql(self, returning_fields=None):
+        if self.query.on_conflict is not None:
+            returning_fields = None
+        return super().execute_sql(returning_fields)
+
+    # bulk_create( ignore_conflicts=True ) and bulk_create( update_conflicts=True )
+    # run as a MERGE of the rows into the table. With ignore_conflicts a row
+    # conflicts when it matches an existing row on any unique key it sets,
+    # with update_conflicts when it matches one on the unique_fields. Unique
+    # fields the rows do not set (e.g. the primary key of objects without one)
+    # cannot match an existing row, so rows are matched on the others only.
+    def merge_as_sql(self):
+        ops = self.connection.ops
+        opts = self.query.get_meta()
+        fields = self.query.fields
+        columns = [field.column for field in fields]
+        if self.query.on_conflict == OnConflict.UPDATE:
+            match_groups = [[field.column for field in self.query.unique_fields]]
+            match_groups = [group for group in match_groups if all(column in columns for column in group)]
+            update_columns = [field.column for field in self.query.update_fields]
+        else:
+            match_groups = self._conflict_groups( opts, columns )
+            update_columns = []
+        if not match_groups:
+            # Nothing the rows set can conflict.
+            return super().as_sql()
+
+        value_rows = [
+            [self.prepare_value(field, self.pre_save_val(field, obj)) for field in fields]
+            for obj in self.query.objs
+        ]
+        value_rows = self._merge_source_rows( value_rows, columns, match_groups, bool(update_columns) )
+        placeholder_rows, param_rows = self.assemble_as_sql(fields, value_rows)
+        param_rows = [[ops.merge_param(param) for param in row] for row in param_rows]
+        cast_types = [ops.merge_cast_type(field) for field in fields]
+        if self.connection.features.has_bulk_insert:
+            return [(ops.merge_sql(opts.db_table, columns, cast_types, placeholder_rows, match_groups, update_columns),
+                     tuple(param for row in param_rows for param in row))]
+        # Db2 for z/OS takes a single row VALUES table only.
+        return [(ops.merge_sql(opts.db_table, columns, cast_types, [placeholders], match_groups, update_columns),
+                 tuple(params))
+                for placeholders, params in zip(placeholder_rows, param_rows)]
+
+    # The rows of a MERGE source may not share the values of a match group: two
+    # of them matching the same row fail with SQL0788N, two matching none are
+    # both inserted and fail with SQL0803N. As if the rows were upserted one
+    # after the other, the last of them is kept when updating, the first when
+    # ignoring conflicts. Groups with a NULL never conflict.
+    def _merge_source_rows( self, value_rows, columns, match_groups, update ):
+        indexes = [[columns.index(column) for column in group] for group in match_groups]
+        seen = set()
+        kept = []
+        for row in (reversed(value_rows) if update else value_rows):
+            keys = [(position, make_hashable(tuple(row[index] for index in group)))
+                    for position, group in enumerate(indexes)
+                    if all(row[index] is not None for index in group)]
+            if any(key in seen for key in keys):
+                continue
+            seen.update(keys)
+            kept.append(row)
+        if update:
+            kept.reverse()
+        return kept
+
+    # Column groups of the unique keys of the model which are all set by the insert.
+    def _conflict_groups( self, opts, columns ):
+        groups = [[field.column] for field in opts.local_concrete_fields if field.unique]
+        for together in opts.unique_together:
+            groups.append([opts.get_field(name).column for name in together])
+        for constraint in opts.total_unique_constraints:
+            groups.append([opts.get_field(name).column for name in constraint.fields])
+        return [group for group in groups if group and all(column in columns for column in group)]
+
 class SQLDeleteCompiler( compiler.SQLDeleteCompiler, SQLCompiler ):
     pass
 
@@ -37,11 +37,6 @@ from django import VERSION as djangoVersion
 from django.db.backends.utils import truncate_name
 from django.apps import apps
 
-if _IS_JYTHON:
-    dbms_name = 'dbname'
-else:
-    dbms_name = 'dbms_name'
-
 # The prefix to put on the default database name when creating
 # the test database.
 TEST_DATABASE_PREFIX = "t_"
@@ -117,7 +112,7 @@ class DatabaseCreation ( BaseDatabaseCreation ):
         # ignore tablespace information
         tablespace_sql = ''
         i = 0
-        if( djangoVersion[0:2] >= ( 1, 8 ) and  'DB2' not in getattr(self.connection.connection, dbms_name)) or getattr(self.connection.connection, dbms_name) != 'DB2':
+        if not self.connection.dialect.is_zos:
             if len( model._meta.unique_together_index ) != 0:
                 for unique_together_index in model._meta.unique_together_index:
                     i = i + 1
@@ -322,7 +317,7 @@ class DatabaseCreation ( BaseDatabaseCreation ):
     
     # As DB2 does not allow to insert NULL value in UNIQUE col, hence modifing model.
     def sql_create_model( self, model, style, known_models = set() ):
-        if getattr(self.connection.connection, dbms_name) != 'DB2':
+        if not self.connection.dialect.is_zos:
             model._meta.unique_together_index = []
             temp_changed_uvalues = []
             temp_unique_together = model._meta.unique_together
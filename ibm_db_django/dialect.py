@@ -0,0 +1,114 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+"""
+Server flavour, version and the SQL capabilities derived from them. A profile
+is built once per database alias, on the first connect, and kept for the life
+of the process, so connections opened later (by other threads or after a
+close) read plain attributes instead of asking the server again.
+"""
+
+import re
+import threading
+from collections import namedtuple
+
+LUW = 'LUW'
+ZOS = 'ZOS'
+IBMI = 'IBMI'
+
+_VERSION_PART = re.compile( r'\d+' )
+
+# DBMS version strings are "11.05.0900" on LUW and IBM i, and "DSNvvrrm"
+# (e.g. DSN12015) on z/OS. The JDBC driver reports "SQLvvrrm".
+def parse_version( text ):
+    text = text.strip()
+    if text[:3] in ( 'DSN', 'SQL' ) and text[3:].isdigit():
+        text = text[3:]
+        return ( int( text[:2] ), int( text[2:4] ), int( text[4:] or 0 ) )
+    return tuple( int( part ) for part in _VERSION_PART.findall( text ) )
+
+# dbms_name is exactly 'DB2' for Db2 for z/OS, 'AS' for Db2 for IBM i and
+# 'DB2/<platform>' (e.g. 'DB2/LINUXX8664') for Db2 LUW.
+def flavour_of( dbms_name ):
+    if dbms_name == 'DB2':
+        return ZOS
+    if dbms_name == 'AS':
+        return IBMI
+    return LUW
+
+_Profile = namedtuple( '_Profile', (
+    'flavour', 'dbms_name', 'version',
+    'is_luw', 'is_zos', 'is_ibmi',
+    'supports_limit_offset', 'supports_regexp_like', 'supports_boolean',
+    'supports_merge', 'supports_final_table', 'supports_multirow_insert',
+) )
+
+class DialectProfile( _Profile ):
+    """
+    Immutable description of the server behind a database alias. Build it
+    with DialectProfile.build( dbms_name, version ).
+    """
+    __slots__ = ()
+
+    @classmethod
+    def build( cls, dbms_name, version ):
+        flavour = flavour_of( dbms_name )
+        version = tuple( version )
+        is_luw = flavour == LUW
+        is_zos = flavour == ZOS
+        is_ibmi = flavour == IBMI
+        return cls(
+            flavour = flavour,
+            dbms_name = dbms_name,
+            version = version,
+            is_luw = is_luw,
+            is_zos = is_zos,
+            is_ibmi = is_ibmi,
+            # IBM DB2 version 11.1 suports natively LIMIT/OFFSET - see #112
+            supports_limit_offset = version[:2] >= ( 11, 1 ),
+            supports_regexp_like = ( is_luw and version[:2] >= ( 11, 1 ) ) or ( is_ibmi and version[:2] >= ( 7, 2 ) ),
+            supports_boolean = ( is_luw and version[:2] >= ( 11, 1 ) ) or ( is_ibmi and version[:2] >= ( 7, 5 ) ),
+            supports_merge = True,
+            supports_final_table = not is_ibmi or version[:2] >= ( 7, 1 ),
+            supports_multirow_insert = not is_zos,
+        )
+
+# Process wide profiles, keyed by database alias.
+profiles = {}
+_lock = threading.Lock()
+
+def get_profile( alias ):
+    return profiles.get( alias )
+
+# Returns the profile of the alias, building it with the given server details
+# if this is the first connect. The first profile registered for an alias wins.
+def register( alias, dbms_name, version ):
+    profile = profiles.get( alias )
+    if profile is not None:
+        return profile
+    profile = DialectProfile.build( dbms_name, version )
+    with _lock:
+        return profiles.setdefault( alias, profile )
+
+# Forgets the profile of an alias (or of all aliases), e.g. after the alias
+# has been pointed at a different server.
+def reset( alias = None ):
+    with _lock:
+        if alias is None:
+            profiles.clear()
+        else:
+            profiles.pop( alias, None )
@@ -0,0 +1,191 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+"""
+Access plans from the Db2 explain tables. explain() runs EXPLAIN PLAN FOR a
+statement, tagged so its rows can be found again, and reads the plan back
+from EXPLAIN_STATEMENT, EXPLAIN_OPERATOR and EXPLAIN_STREAM. The explain
+tables have to exist, in the schema given or in the current schema; they are
+created with CALL SYSPROC.SYSINSTALLOBJECTS( 'EXPLAIN', 'C', NULL, CURRENT SCHEMA ).
+"""
+
+import itertools
+import os
+
+_tags = itertools.count( 1 )
+
+# Operators reading a table, reading an index, and joining.
+TABLE_SCANS = frozenset( ( 'TBSCAN', ) )
+INDEX_SCANS = frozenset( ( 'IXSCAN', 'EISCAN', 'IXAND', 'RIDSCN' ) )
+JOINS = frozenset( ( 'NLJOIN', 'HSJOIN', 'MSJOIN', 'ZZJOIN' ) )
+
+class Operator( object ):
+    __slots__ = ( 'id', 'type', 'total_cost', 'io_cost', 'cpu_cost', 'first_row_cost', 'cardinality',
+                  'inputs', 'objects' )
+
+    def __init__( self, id, type, total_cost, io_cost, cpu_cost, first_row_cost ):
+        self.id = id
+        self.type = type
+        self.total_cost = total_cost
+        self.io_cost = io_cost
+        self.cpu_cost = cpu_cost
+        self.first_row_cost = first_row_cost
+        # Estimated rows out of the operator, from the stream leaving it.
+        self.cardinality = None
+        # Operator ids feeding this operator, and ( schema, name ) of the
+        # tables and indexes it reads.
+        self.inputs = []
+        self.objects = []
+
+    def describe( self ):
+        text = '%s (%d)  cost=%s  rows=%s' % ( self.type, self.id, _format_number( self.total_cost ),
+                                             _format_number( self.cardinality ) )
+        if self.objects:
+            text += '  %s %s' % ( 'index' if self.type in INDEX_SCANS else 'on',
+                                  ', '.join( '%s.%s' % obj for obj in self.objects ) )
+        return text
+
+    def as_dict( self, operators ):
+        return {
+            'id': self.id,
+            'operator': self.type,
+            'total_cost': self.total_cost,
+            'io_cost': self.io_cost,
+            'cpu_cost': self.cpu_cost,
+            'first_row_cost': self.first_row_cost,
+            'cardinality': self.cardinality,
+            ( 'indexes' if self.type in INDEX_SCANS else 'tables' ): ['%s.%s' % obj for obj in self.objects],
+            'inputs': [operators[id].as_dict( operators ) for id in self.inputs if id in operators],
+        }
+
+class Plan( object ):
+    """
+    Access plan of one statement: its estimated total cost and its operators
+    by id, the root (RETURN) operator being the one no stream leaves from.
+    """
+
+    def __init__( self, statement_type, total_cost, operators ):
+        self.statement_type = statement_type
+        self.total_cost = total_cost
+        self.operators = operators
+
+    @property
+    def root( self ):
+        targets = set( itertools.chain.from_iterable( operator.inputs for operator in self.operators.values() ) )
+        for id in sorted( self.operators ):
+            if id not in targets:
+                return self.operators[id]
+        return None
+
+    @property
+    def indexes( self ):
+        return sorted( set( '%s.%s' % obj for operator in self.operators.values() if operator.type in INDEX_SCANS
+                            for obj in operator.objects ) )
+
+    @property
+    def join_methods( self ):
+        return [operator.type for id, operator in sorted( self.operators.items() ) if operator.type in JOINS]
+
+    def summary( self ):
+        types = [operator.type for operator in self.operators.values()]
+        return {
+            'total_cost': self.total_cost,
+            'table_scans': sum( 1 for type in types if type in TABLE_SCANS ),
+            'index_scans': sum( 1 for type in types if type in INDEX_SCANS ),
+            'indexes': self.indexes,
+        }
+
+    def as_dict( self ):
+        root = self.root
+        return {
+            'statement_type': self.statement_type,
+            'total_cost': self.total_cost,
+            'join_methods': self.join_methods,
+            'indexes': self.indexes,
+            'plan': root.as_dict( self.operators ) if root is not None else None,
+        }
+
+    # The operator tree, one operator per line indented under the operator it
+    # feeds, followed by the join methods and indexes used.
+    def text_lines( self ):
+        lines = ['Total cost: %s' % _format_number( self.total_cost )]
+        root = self.root
+        if root is not None:
+            stack = [( root, 0 )]
+            while stack:
+                operator, depth = stack.pop()
+                lines.append( '  ' * depth + operator.describe() )
+                for id in reversed( operator.inputs ):
+                    if id in self.operators:
+                        stack.append( ( self.operators[id], depth + 1 ) )
+        lines.append( 'Join methods: %s' % ( ', '.join( self.join_methods ) or 'none' ) )
+        lines.append( 'Indexes used: %s' % ( ', '.join( self.indexes ) or 'none' ) )
+        return lines
+
+def _format_number( value ):
+    if value is None:
+        return '?'
+    return '%.2f' % value if value != int( value ) else '%d' % value
+
+def _table( schema, name ):
+    return '%s.%s' % ( schema, name ) if schema else name
+
+def _number( value ):
+    return float( value ) if value is not None else None
+
+# Explains sql, the final qmark SQL of a statement (see DB2CursorWrapper.rewrite),
+# with a cursor of the backend and returns its Plan. The markers of sql are
+# left unbound, as in the statement the driver prepares.
+def explain( cursor, sql, schema = None ):
+    tag = 'DJ%d_%d' % ( os.getpid() % 100000, next( _tags ) )
+    cursor.execute( "EXPLAIN PLAN SET QUERYTAG = '%s' FOR %s" % ( tag, sql ) )
+    cursor.execute( "SELECT EXPLAIN_REQUESTER, EXPLAIN_TIME, SOURCE_NAME, SOURCE_SCHEMA, SOURCE_VERSION, "
+                    "STMTNO, SECTNO, STATEMENT_TYPE, TOTAL_COST FROM %s WHERE QUERYTAG = %%s AND EXPLAIN_LEVEL = 'P' "
+                    "ORDER BY EXPLAIN_TIME DESC FETCH FIRST 1 ROW ONLY" % _table( schema, 'EXPLAIN_STATEMENT' ), [tag] )
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    key = tuple( row[:7] )
+    where = ( "EXPLAIN_REQUESTER = %s AND EXPLAIN_TIME = %s AND SOURCE_NAME = %s AND SOURCE_SCHEMA = %s "
+              "AND SOURCE_VERSION = %s AND STMTNO = %s AND SECTNO = %s" )
+
+    operators = {}
+    cursor.execute( "SELECT OPERATOR_ID, OPERATOR_TYPE, TOTAL_COST, IO_COST, CPU_COST, FIRST_ROW_COST FROM %s "
+                    "WHERE %s ORDER BY OPERATOR_ID" % ( _table( schema, 'EXPLAIN_OPERATOR' ), where ), key )
+    for id, type, total_cost, io_cost, cpu_cost, first_row_cost in cursor.fetchall():
+        operators[id] = Operator( id, type.strip(), _number( total_cost ), _number( io_cost ),
+                                  _number( cpu_cost ), _number( first_row_cost ) )
+
+    # Streams go from an operator or a data object (table, index) into an
+    # operator; the stream leaving an operator carries its estimated rows.
+    cursor.execute( "SELECT SOURCE_TYPE, SOURCE_ID, TARGET_TYPE, TARGET_ID, OBJECT_SCHEMA, OBJECT_NAME, STREAM_COUNT "
+                    "FROM %s WHERE %s ORDER BY STREAM_ID" % ( _table( schema, 'EXPLAIN_STREAM' ), where ), key )
+    for source_type, source_id, target_type, target_id, object_schema, object_name, stream_count in cursor.fetchall():
+        target = operators.get( target_id ) if target_type == 'O' else None
+        if source_type == 'O':
+            source = operators.get( source_id )
+            if source is not None:
+                source.cardinality = _number( stream_count )
+                if target is not None:
+                    target.inputs.append( source_id )
+        elif source_type == 'D' and target is not None and object_name:
+            target.objects.append( ( object_schema.strip(), object_name.strip() ) )
+    # No stream leaves the RETURN operator, it returns the rows of its input.
+    for operator in operators.values():
+        if operator.cardinality is None and operator.inputs and operator.inputs[0] in operators:
+            operator.cardinality = operators[operator.inputs[0]].cardinality
+    return Plan( row[7], _number( row[8] ), operators )
@@ -0,0 +1,416 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+"""
+Per statement instrumentation of DB2CursorWrapper. OPTIONS['INSTRUMENTATION']
+names a collector: an object, a class or the dotted path of either. Every
+statement executed through a cursor is handed to collector.record() as a
+StatementRecord once the cursor is done with it (next execute or close), with
+the time spent in each phase:
+
+    rewrite   format to qmark rewrite of the SQL and its parameters
+    execute   prepare and execute in the driver
+    fetch     fetch calls of the driver
+    convert   conversion of the fetched rows by the cursor
+
+The time the ORM spends in the converters of the backend and of the fields
+(operations.get_db_converters) is reported afterwards, as it happens after
+the cursor has been closed, through collector.record_conversion().
+
+Where the compiler picks between several ways of writing the same lookup
+(see note()), its choices are attached to the record of the next statement
+of the thread as ( kind, choice ) pairs.
+"""
+
+import json
+import re
+import threading
+import time
+
+from django.utils.module_loading import import_string
+
+PHASES = ( 'rewrite', 'execute', 'fetch', 'convert' )
+
+# Driver column types whose values are counted as LOB data.
+LOB_TYPES = frozenset( ( 'blob', 'clob', 'dbclob', 'xml' ) )
+
+class StatementRecord( object ):
+    """
+    Measurements of one statement. sql is the final (qmark) SQL sent to the
+    driver, fingerprint the normalized form of it (see fingerprint()). rows
+    is the number of rows fetched, or the update count of statements without
+    a result set. Phase timings are in seconds. stack is the caller stack
+    taken by Collector.capture(), if the collector asked for it.
+    """
+    __slots__ = ( 'sql', 'fingerprint', 'many', 'parameters', 'rewrite', 'execute', 'fetch', 'convert',
+                  'rows', 'lob_bytes', 'error', 'started', 'lob_columns', 'strategies', 'stack' )
+
+    def __init__( self, sql, many = False, parameters = None ):
+        self.sql = sql
+        self.fingerprint = fingerprint( sql )
+        self.many = many
+        # Parameters bound to the markers of sql (None for executemany).
+        self.parameters = parameters
+        self.rewrite = 0.0
+        self.execute = 0.0
+        self.fetch = 0.0
+        self.convert = 0.0
+        self.rows = 0
+        self.lob_bytes = 0
+        self.error = None
+        self.started = time.time()
+        self.lob_columns = None
+        self.strategies = take_notes()
+        self.stack = None
+
+    @property
+    def elapsed( self ):
+        return self.rewrite + self.execute + self.fetch + self.convert
+
+    # Counts the fetched rows and the bytes of their LOB columns, found from
+    # the driver column types of the statement handle on the first call.
+    def add_rows( self, rows, stmt_handler ):
+        self.rows += len( rows )
+        lob_columns = self.lob_columns
+        if lob_columns is None:
+            lob_columns = self.lob_columns = _lob_columns( stmt_handler, len( rows[0] ) )
+        for index in lob_columns:
+            for row in rows:
+                value = row[index]
+                if value is not None:
+                    self.lob_bytes += len( value )
+
+    def as_dict( self ):
+        return {
+            'sql': self.sql,
+            'fingerprint': self.fingerprint,
+            'many': self.many,
+            'rewrite': self.rewrite,
+            'execute': self.execute,
+            'fetch': self.fetch,
+            'convert': self.convert,
+            'rows': self.rows,
+            'lob_bytes': self.lob_bytes,
+            'error': self.error,
+            'strategies': [list( strategy ) for strategy in self.strategies],
+        }
+
+# Choices of the compiler not yet taken by a StatementRecord, per thread. The
+# list is bounded since nothing takes them when no collector is configured.
+_notes = threading.local()
+_MAX_NOTES = 32
+
+# Records that the compiler wrote a lookup of the given kind (e.g. 'tuple_in')
+# in the form choice (e.g. 'values') for the statement being compiled.
+def note( kind, choice ):
+    notes = getattr( _notes, 'pending', None )
+    if notes is None:
+        notes = _notes.pending = []
+    elif len( notes ) >= _MAX_NOTES:
+        del notes[0]
+    notes.append( ( kind, choice ) )
+
+def take_notes():
+    notes = getattr( _notes, 'pending', None )
+    if not notes:
+        return ()
+    _notes.pending = []
+    return tuple( notes )
+
+def _lob_columns( stmt_handler, width ):
+    try:
+        import ibm_db
+        return tuple( index for index in range( width )
+                      if str( ibm_db.field_type( stmt_handler, index ) ).lower() in LOB_TYPES )
+    except Exception:
+        return ()
+
+_LITERAL = re.compile( r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b" )
+_MARKER_LIST = re.compile( r"\?(?:\s*,\s*\?)+" )
+_ROW_LIST = re.compile( r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+" )
+_SPACES = re.compile( r"\s+" )
+
+_fingerprints = {}
+_FINGERPRINT_CACHE_SIZE = 4096
+
+# Normalized statement text: literals become markers, lists of markers and
+# of rows of markers collapse to one entry, so that statements differing only
+# in their values or in the length of an IN list share a fingerprint.
+def fingerprint( sql ):
+    result = _fingerprints.get( sql )
+    if result is None:
+        result = _LITERAL.sub( '?', sql )
+        result = _MARKER_LIST.sub( '...', result )
+        result = result.replace( '(?)', '(...)' )
+        result = _ROW_LIST.sub( '(...)', result )
+        result = _SPACES.sub( ' ', result ).strip()
+        if len( _fingerprints ) >= _FINGERPRINT_CACHE_SIZE:
+            _fingerprints.clear()
+        _fingerprints[sql] = result
+    return result
+
+class Collector( object ):
+    """
+    Base class of collectors. record() is called once for every statement,
+    from the thread which executed it, so implementations have to be thread
+    safe.
+    """
+
+    def record( self, record ):
+        raise NotImplementedError( 'subclasses of Collector must provide a record() method' )
+
+    # Called after the execute and after every fetch of the statement, from
+    # the code running it, where record() is only called once the cursor is
+    # done with the statement. This is the place to look at the caller.
+    def capture( self, record ):
+        pass
+
+    def record_conversion( self, record, seconds, rows ):
+        pass
+
+class MultiCollector( Collector ):
+    """
+    Hands every record to each of several collectors.
+    """
+
+    def __init__( self, collectors ):
+        self.collectors = tuple( collectors )
+
+    def record( self, record ):
+        for collector in self.collectors:
+            collector.record( record )
+
+    def capture( self, record ):
+        for collector in self.collectors:
+            collector.capture( record )
+
+    def record_conversion( self, record, seconds, rows ):
+        for collector in self.collectors:
+            collector.record_conversion( record, seconds, rows )
+
+# Upper bounds, in seconds, of the latency histogram buckets: 100us doubling
+# up to about 52s, and a last bucket for anything slower.
+BUCKET_BOUNDS = tuple( 0.0001 * 2 ** index for index in range( 20 ) )
+
+class StatementStats( object ):
+    __slots__ = ( 'fingerprint', 'count', 'errors', 'rows', 'lob_bytes', 'phases', 'buckets', 'max',
+                  'conversions', 'conversion_rows', 'strategies' )
+
+    def __init__( self, fingerprint ):
+        self.fingerprint = fingerprint
+        self.count = 0
+        self.errors = 0
+        self.rows = 0
+        self.lob_bytes = 0
+        self.phases = dict.fromkeys( PHASES, 0.0 )
+        self.buckets = [0] * ( len( BUCKET_BOUNDS ) + 1 )
+        self.max = 0.0
+        self.conversions = 0
+        self.conversion_rows = 0
+        # Executions per compiler choice, keyed 'kind:choice'.
+        self.strategies = {}
+
+    def add( self, record ):
+        self.count += 1
+        if record.error is not None:
+            self.errors += 1
+        self.rows += record.rows
+        self.lob_bytes += record.lob_bytes
+        phases = self.phases
+        phases['rewrite'] += record.rewrite
+        phases['execute'] += record.execute
+        phases['fetch'] += record.fetch
+        phases['convert'] += record.convert
+        elapsed = record.elapsed
+        self.buckets[_bucket( elapsed )] += 1
+        if elapsed > self.max:
+            self.max = elapsed
+        for kind, choice in record.strategies:
+            key = '%s:%s' % ( kind, choice )
+            self.strategies[key] = self.strategies.get( key, 0 ) + 1
+
+    def percentile( self, fraction ):
+        if not self.count:
+            return 0.0
+        wanted = fraction * self.count
+        seen = 0
+        for index, count in enumerate( self.buckets ):
+            seen += count
+            if seen >= wanted:
+                return min( BUCKET_BOUNDS[index], self.max ) if index < len( BUCKET_BOUNDS ) else self.max
+        return self.max
+
+    def as_dict( self ):
+        return {
+            'fingerprint': self.fingerprint,
+            'count': self.count,
+            'errors': self.errors,
+            'rows': self.rows,
+            'lob_bytes': self.lob_bytes,
+            'total': sum( self.phases.values() ),
+            'phases': dict( self.phases ),
+            'p50': self.percentile( 0.5 ),
+            'p99': self.percentile( 0.99 ),
+            'max': self.max,
+            'buckets': list( self.buckets ),
+            'conversions': self.conversions,
+            'conversion_rows': self.conversion_rows,
+            'strategies': dict( self.strategies ),
+        }
+
+def _bucket( seconds ):
+    for index, bound in enumerate( BUCKET_BOUNDS ):
+        if seconds <= bound:
+            return index
+    return len( BUCKET_BOUNDS )
+
+class HistogramCollector( Collector ):
+    """
+    In-memory collector keeping, per statement fingerprint, the number of
+    executions, the total time of every phase and a latency histogram.
+    Fingerprints beyond max_statements are counted together under OTHER.
+    With a path, the statistics are written there as JSON by save() and at
+    interpreter exit, for the db2_statement_stats command of another process.
+    """
+    OTHER = '<other>'
+
+    def __init__( self, path = None, max_statements = 1000 ):
+        self.path = path
+        self.max_statements = max_statements
+        self._statements = {}
+        self._lock = threading.Lock()
+        if path is not None:
+            import atexit
+            atexit.register( self.save )
+
+    def _stats( self, fingerprint ):
+        stats = self._statements.get( fingerprint )
+        if stats is None:
+            if len( self._statements ) >= self.max_statements:
+                fingerprint = self.OTHER
+                stats = self._statements.get( fingerprint )
+            if stats is None:
+                stats = self._statements[fingerprint] = StatementStats( fingerprint )
+        return stats
+
+    def record( self, record ):
+        with self._lock:
+            self._stats( record.fingerprint ).add( record )
+
+    def record_conversion( self, record, seconds, rows ):
+        with self._lock:
+            stats = self._stats( record.fingerprint )
+            stats.phases['convert'] += seconds
+            stats.conversions += 1
+            stats.conversion_rows += rows
+
+    # Statistics of all fingerprints, the most time consuming first.
+    def snapshot( self ):
+        with self._lock:
+            statements = [stats.as_dict() for stats in self._statements.values()]
+        statements.sort( key = lambda stats: stats['total'], reverse = True )
+        return statements
+
+    def reset( self ):
+        with self._lock:
+            self._statements.clear()
+
+    def save( self, path = None ):
+        path = path or self.path
+        with open( path, 'w' ) as out:
+            json.dump( { 'saved': time.time(), 'bucket_bounds': BUCKET_BOUNDS, 'statements': self.snapshot() }, out )
+
+# Process wide collectors, keyed by database alias.
+collectors = {}
+_connection_collectors = {}
+_lock = threading.Lock()
+
+# Returns the collector the cursors of the alias report to: the collector of
+# OPTIONS['INSTRUMENTATION'], the slow query log of OPTIONS['SLOW_QUERY_LOG'],
+# both of them or None.
+def connection_collector( alias, options ):
+    try:
+        return _connection_collectors[alias]
+    except KeyError:
+        pass
+    parts = []
+    if options.get( 'INSTRUMENTATION' ):
+        parts.append( collector_for( alias, options['INSTRUMENTATION'] ) )
+    if options.get( 'SLOW_QUERY_LOG' ):
+        from ibm_db_django import slowlog
+        parts.append( slowlog.log_for( alias, options['SLOW_QUERY_LOG'], options.get( 'EXPLAIN_SCHEMA' ) ) )
+    if not parts:
+        collector = None
+    elif len( parts ) == 1:
+        collector = parts[0]
+    else:
+        collector = MultiCollector( parts )
+    with _lock:
+        return _connection_collectors.setdefault( alias, collector )
+
+# Returns the collector of the alias, creating it from OPTIONS['INSTRUMENTATION']
+# (an object, a class or a dotted path to either) on the first connect.
+def collector_for( alias, spec ):
+    if not spec:
+        return None
+    collector = collectors.get( alias )
+    if collector is None:
+        if isinstance( spec, str ):
+            spec = import_string( spec )
+        if isinstance( spec, type ):
+            spec = spec()
+        with _lock:
+            collector = collectors.setdefault( alias, spec )
+    return collector
+
+class _TimedIterator( object ):
+    __slots__ = ( 'iterator', 'elapsed' )
+
+    def __init__( self, iterable ):
+        self.iterator = iter( iterable )
+        self.elapsed = 0.0
+
+    def __iter__( self ):
+        return self
+
+    def __next__( self ):
+        start = time.perf_counter()
+        try:
+            return next( self.iterator )
+        finally:
+            self.elapsed += time.perf_counter() - start
+
+# Runs apply( rows, converters ) and reports the time spent converting, less
+# the time spent reading the rows (which may still be fetched from the cursor).
+def timed_conversion( apply, rows, converters, collector, record ):
+    source = _TimedIterator( rows )
+    converted = apply( source, converters )
+    elapsed = 0.0
+    count = 0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                row = next( converted )
+            except StopIteration:
+                elapsed += time.perf_counter() - start
+                break
+            elapsed += time.perf_counter() - start
+            count += 1
+            yield row
+    finally:
+        collector.record_conversion( record, max( elapsed - source.elapsed, 0.0 ), count )
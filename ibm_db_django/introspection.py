@@ -251,12 +251,11 @@ class DatabaseIntrospection( BaseDatabaseIntrospection ):
         table_type = 'T'
 
         if not _IS_JYTHON:
-            dbms_name='dbms_name'
             schema = cursor.connection.get_current_schema()
 
-            if (getattr(cursor.connection, dbms_name) == 'AS'):
+            if self.connection.dialect.is_ibmi:
                  sql = "SELECT TYPE FROM QSYS2.SYSTABLES WHERE TABLE_SCHEMA='%(schema)s' AND TABLE_NAME='%(table)s'" % {'schema': schema.upper(), 'table': table_name.upper()}
-            elif ( getattr(cursor.connection, dbms_name) != 'DB2'):
+            elif not self.connection.dialect.is_zos:
                  sql = "SELECT TYPE FROM SYSCAT.TABLES WHERE TABSCHEMA='%(schema)s' AND TABNAME='%(table)s'" % {'schema': schema.upper(), 'table': table_name.upper()}
             else:
                 sql = "SELECT TYPE FROM SYSIBM.SYSTABLES WHERE CREATOR='%(schema)s' AND NAME='%(table)s'" % {'schema': schema.upper(), 'table': table_name.upper()}
@@ -320,11 +319,10 @@ class DatabaseIntrospection( BaseDatabaseIntrospection ):
         if not _IS_JYTHON:
             schema = cursor.connection.get_current_schema().upper()   
             table_name = table_name.upper()         
-            dbms_name='dbms_name'
 
-            if (getattr(cursor.connection, dbms_name) == 'AS'):
+            if self.connection.dialect.is_ibmi:
                 sql = "SELECT CONSTRAINT_NAME, COLUMN_NAME FROM QSYS2.SYSCSTCOL WHERE TABLE_SCHEMA='%(schema)s' AND TABLE_NAME='%(table)s'" % {'schema': schema, 'table': table_name}
-            elif ( getattr(cursor.connection, dbms_name) != 'DB2'):
+            elif not self.connection.dialect.is_zos:
                 sql = "SELECT CONSTNAME, COLNAME FROM SYSCAT.COLCHECKS WHERE TABSCHEMA='%(schema)s' AND TABNAME='%(table)s'" % {'schema': schema, 'table': table_name}
             else:
                 sql = "SELECT CHECKNAME, COLNAME FROM SYSIBM.SYSCHECKDEP WHERE TBOWNER='%(schema)s' AND TBNAME='%(table)s'" % {'schema': schema, 'table': table_name}
@@ -342,9 +340,9 @@ class DatabaseIntrospection( BaseDatabaseIntrospection ):
                     }
                 constraints[constname]['columns'].append(colname.lower())
                 
-            if getattr(cursor.connection, dbms_name) == 'AS':
+            if self.connection.dialect.is_ibmi:
                 sql = "SELECT KEYCOL.CONSTRAINT_NAME, KEYCOL.COLUMN_NAME FROM QSYS2.SYSKEYCST KEYCOL INNER JOIN QSYS2.SYSCST TABCONST ON KEYCOL.CONSTRAINT_NAME=TABCONST.CONSTRAINT_NAME WHERE TABCONST.TABLE_SCHEMA='%(schema)s' and TABCONST.TABLE_NAME='%(table)s' and TABCONST.TYPE='U'" % {'schema': schema, 'table': table_name}
-            elif ( getattr(cursor.connection, dbms_name) != 'DB2'):
+            elif not self.connection.dialect.is_zos:
                 sql = "SELECT KEYCOL.CONSTNAME, KEYCOL.COLNAME FROM SYSCAT.KEYCOLUSE KEYCOL INNER JOIN SYSCAT.TABCONST TABCONST ON KEYCOL.CONSTNAME=TABCONST.CONSTNAME WHERE TABCONST.TABSCHEMA='%(schema)s' and TABCONST.TABNAME='%(table)s' and TABCONST.TYPE='U'" % {'schema': schema, 'table': table_name}
             else:
                 sql = "SELECT KEYCOL.CONSTNAME, KEYCOL.COLNAME FROM SYSIBM.SYSKEYCOLUSE KEYCOL INNER JOIN SYSIBM.SYSTABCONST TABCONST ON KEYCOL.CONSTNAME=TABCONST.CONSTNAME WHERE TABCONST.TBCREATOR='%(schema)s' AND TABCONST.TBNAME='%(table)s' AND TABCONST.TYPE='U'" % {'schema': schema, 'table': table_name}
@@ -0,0 +1,120 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from ibm_db_django import benchmarks
+
+class Command( BaseCommand ):
+    help = ( "Runs the microbenchmarks of the backend's SQL rewrite, row conversion, pagination, "
+             "tuple IN, name quoting and bulk insert code, saves them as the baseline of this release and "
+             "compares them with the baseline of an earlier one." )
+
+    def add_arguments( self, parser ):
+        parser.add_argument( '--database', default = DEFAULT_DB_ALIAS,
+                             help = 'Database alias of the backend to run on. Defaults to the "default" database.' )
+        parser.add_argument( '--filter', help = 'Regular expression selecting the benchmarks to run.' )
+        parser.add_argument( '--list', action = 'store_true', help = 'List the benchmarks and exit.' )
+        parser.add_argument( '--rounds', type = int, default = 5 )
+        parser.add_argument( '--min-time', type = float, default = 0.05, help = 'Minimum seconds of one round.' )
+        parser.add_argument( '--baseline-dir', default = 'db2_benchmarks',
+                             help = 'Directory of the baselines, one ibm_db_django-<version>.json file per release.' )
+        parser.add_argument( '--save', action = 'store_true', help = 'Save the results as the baseline of this release.' )
+        parser.add_argument( '--compare', nargs = '?', const = 'previous',
+                             help = 'Baseline file to compare with, by default the one of the latest earlier release.' )
+        parser.add_argument( '--tolerance', type = float, default = 0.25,
+                             help = 'Slowdown above which a benchmark is reported as a regression (0.25 for 25%%).' )
+        parser.add_argument( '--explain', action = 'store_true',
+                             help = 'Also report the estimated Db2 cost of the statements built by the benchmarks, '
+                                    'which needs the explain tables and the tables of the statements.' )
+        parser.add_argument( '--format', choices = ( 'text', 'json' ), default = 'text' )
+
+    def handle( self, *args, **options ):
+        if options['list']:
+            for name in benchmarks.names():
+                self.stdout.write( name )
+            return
+
+        connection = connections[options['database']]
+        if connection.vendor != 'DB2':
+            raise CommandError( "Database '%s' does not use the ibm_db_django backend." % options['database'] )
+
+        baseline = None
+        if options['compare']:
+            path = options['compare']
+            if path == 'previous':
+                path = benchmarks.previous_baseline( options['baseline_dir'] )
+                if path is None:
+                    raise CommandError( "No baseline of an earlier release in '%s'." % options['baseline_dir'] )
+            baseline = benchmarks.load( path )
+
+        text = options['format'] == 'text'
+        def progress( name, result ):
+            if not text:
+                return
+            if result is None:
+                self.stdout.write( '%-36s  skipped' % name )
+            else:
+                throughput = result.get( 'rows_per_second' )
+                self.stdout.write( '%-36s %12.2f %12.2f %10.1f%s' % ( name, result['best'] * 1e6, result['median'] * 1e6,
+                                                                    result['relative'],
+                                                                    '  %10.0f rows/s' % throughput if throughput else '' ) )
+        if text:
+            self.stdout.write( '%-36s %12s %12s %10s' % ( 'benchmark', 'best us', 'median us', 'relative' ) )
+        results = benchmarks.run( connection, options['filter'], options['rounds'], options['min_time'], progress )
+
+        if options['explain']:
+            schema = ( connection.settings_dict.get( 'OPTIONS' ) or {} ).get( 'EXPLAIN_SCHEMA' )
+            results['plan_costs'] = benchmarks.plan_costs( connection, schema )
+            if text:
+                self.stdout.write( '\nEstimated cost:' )
+                for name, cost in sorted( results['plan_costs'].items() ):
+                    self.stdout.write( '%-36s %s' % ( name, cost if isinstance( cost, str ) else '%.2f' % cost
+                                                      if cost is not None else 'no plan' ) )
+
+        if options['save']:
+            path = benchmarks.save( results, options['baseline_dir'] )
+            if text:
+                self.stdout.write( 'Saved %s' % path )
+
+        regressions = []
+        rows = []
+        if baseline is not None:
+            rows = benchmarks.compare( results, baseline, options['tolerance'] )
+            regressions = [row[0] for row in rows if row[4]]
+
+        if not text:
+            if baseline is not None:
+                results['comparison'] = {
+                    'baseline': baseline['version'],
+                    'ratios': dict( ( row[0], row[3] ) for row in rows ),
+                    'regressions': regressions,
+                }
+            self.stdout.write( json.dumps( results, indent = 2 ) )
+        elif baseline is not None:
+            self.stdout.write( '\nCompared with %s:' % baseline['version'] )
+            for name, before, after, ratio, regressed in rows:
+                self.stdout.write( '%-36s %10.1f %10.1f %+8.1f%%%s' % ( name, before, after, ( ratio - 1 ) * 100,
+                                                                       '  REGRESSION' if regressed else '' ) )
+
+        if regressions:
+            raise CommandError( '%d benchmark(s) slower than the %s baseline by more than %d%%: %s'
+                                % ( len( regressions ), baseline['version'], options['tolerance'] * 100,
+                                    ', '.join( regressions ) ) )
@@ -0,0 +1,71 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from ibm_db_django import instrumentation
+
+class Command( BaseCommand ):
+    help = ( "Prints the per statement statistics of the HistogramCollector set in "
+             "OPTIONS['INSTRUMENTATION'], of this process or saved to a file by another one." )
+
+    def add_arguments( self, parser ):
+        parser.add_argument( '--database', default = DEFAULT_DB_ALIAS,
+                             help = 'Database alias whose collector is dumped. Defaults to the "default" database.' )
+        parser.add_argument( '--file', help = 'Read the statistics saved by HistogramCollector( path = ... ).' )
+        parser.add_argument( '--format', choices = ( 'text', 'json' ), default = 'text' )
+        parser.add_argument( '--limit', type = int, default = 20, help = 'Number of statements printed, the most time consuming first.' )
+        parser.add_argument( '--reset', action = 'store_true', help = 'Clear the statistics of the collector after printing them.' )
+
+    def handle( self, *args, **options ):
+        collector = None
+        if options['file']:
+            with open( options['file'] ) as source:
+                statements = json.load( source )['statements']
+        else:
+            collector = instrumentation.collectors.get( options['database'] )
+            if collector is None or not hasattr( collector, 'snapshot' ):
+                raise CommandError( "No histogram collector is set in OPTIONS['INSTRUMENTATION'] of database '%s', "
+                                    "or no statement has been executed by this process. Use --file to read the "
+                                    "statistics saved by another process." % options['database'] )
+            statements = collector.snapshot()
+
+        statements = statements[:options['limit']]
+        if options['format'] == 'json':
+            self.stdout.write( json.dumps( statements, indent = 2 ) )
+        else:
+            self.write_table( statements )
+
+        if options['reset'] and collector is not None:
+            collector.reset()
+
+    def write_table( self, statements ):
+        columns = ( 'count', 'total ms', 'p50 ms', 'p99 ms', 'rewrite', 'execute', 'fetch', 'convert', 'rows', 'lob bytes' )
+        self.stdout.write( ''.join( '%10s' % column for column in columns ) + '  statement' )
+        for stats in statements:
+            phases = stats['phases']
+            values = ( stats['count'], stats['total'] * 1000, stats['p50'] * 1000, stats['p99'] * 1000,
+                       phases['rewrite'] * 1000, phases['execute'] * 1000, phases['fetch'] * 1000,
+                       phases['convert'] * 1000, stats['rows'], stats['lob_bytes'] )
+            line = ''.join( '%10d' % value if isinstance( value, int ) else '%10.2f' % value for value in values )
+            self.stdout.write( '%s  %s' % ( line, stats['fingerprint'][:120] ) )
+            if stats.get( 'strategies' ):
+                self.stdout.write( '%s  compiled as %s' % ( ' ' * len( line ), ', '.join(
+                    '%s (%d)' % item for item in sorted( stats['strategies'].items() ) ) ) )
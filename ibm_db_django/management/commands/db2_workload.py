@@ -0,0 +1,74 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from ibm_db_django import workload
+
+class Command( BaseCommand ):
+    help = ( "Runs an ORM workload (CRUD, joins, prefetches, changelists, bulk operations, exports and "
+             "migrations) through the backend on tables it creates and drops, and reports the throughput, "
+             "latency, CPU and memory of each scenario and its overhead over plain ibm_db_dbi." )
+
+    def add_arguments( self, parser ):
+        parser.add_argument( '--database', default = DEFAULT_DB_ALIAS,
+                             help = 'Database alias to run on. Defaults to the "default" database.' )
+        parser.add_argument( '--scenario', action = 'append', choices = [scenario.name for scenario in workload.SCENARIOS],
+                             help = 'Scenario to run, can be repeated. Defaults to all of them.' )
+        parser.add_argument( '--scale', type = int, default = 40, help = 'Number of authors loaded, with 25 books each.' )
+        parser.add_argument( '--iterations', type = int, default = 50, help = 'Timed operations per scenario.' )
+        parser.add_argument( '--warmup', type = int, default = 5, help = 'Untimed operations before them.' )
+        parser.add_argument( '--seed', type = int, default = 1 )
+        parser.add_argument( '--no-replay', action = 'store_true', help = 'Do not replay the statements through ibm_db_dbi.' )
+        parser.add_argument( '--keep', action = 'store_true', help = 'Keep the BENCH_* tables afterwards.' )
+        parser.add_argument( '--format', choices = ( 'text', 'json' ), default = 'text' )
+        parser.add_argument( '--output', help = 'Also write the results as JSON to this file.' )
+
+    def handle( self, *args, **options ):
+        connection = connections[options['database']]
+        if connection.vendor != 'DB2':
+            raise CommandError( "Database '%s' does not use the ibm_db_django backend." % options['database'] )
+
+        text = options['format'] == 'text'
+        columns = ( 'ops/s', 'p50 ms', 'p99 ms', 'stmts', 'cpu/stmt us', 'dbi ms', 'overhead', 'peak MB' )
+        if text:
+            self.stdout.write( '%-18s' % 'scenario' + ''.join( '%12s' % column for column in columns ) )
+
+        def progress( name, result ):
+            if not text:
+                return
+            orm, raw = result['orm'], result['raw']
+            values = ( '%.1f' % orm['ops_per_sec'], '%.2f' % orm['p50_ms'], '%.2f' % orm['p99_ms'],
+                       '%d' % orm['statements'],
+                       '%.1f' % orm['cpu_per_statement_us'] if orm['cpu_per_statement_us'] is not None else '-',
+                       '%.2f' % raw['mean_ms'] if raw else '-',
+                       '%.0f%%' % ( result['overhead'] * 100 ) if result['overhead'] is not None else '-',
+                       '%.1f' % ( result['peak_rss'] / 1048576.0 ) if result['peak_rss'] else '-' )
+            self.stdout.write( '%-18s' % name + ''.join( '%12s' % value for value in values ) )
+
+        results = workload.run( connection, scale = options['scale'], iterations = options['iterations'],
+                                warmup = options['warmup'], names = options['scenario'],
+                                replay = not options['no_replay'], seed = options['seed'], keep = options['keep'],
+                                progress = progress )
+        if not text:
+            self.stdout.write( json.dumps( results, indent = 2 ) )
+        if options['output']:
+            with open( options['output'], 'w' ) as target:
+                json.dump( results, target, indent = 2 )
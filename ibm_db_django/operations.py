@@ -504,7 +504,7 @@ class DatabaseOperations ( BaseDatabaseOperations ):
         return "%s"
         
     def deferrable_sql( self ):
-        if getattr(self.connection.connection, dbms_name) == 'DB2':
+        if self.connection.dialect.is_zos:
             return "ON DELETE NO ACTION NOT ENFORCED"
         else:
             return ""
@@ -534,6 +534,14 @@ class DatabaseOperations ( BaseDatabaseOperations ):
                 last_identity_val = int( row[0] )
             return last_identity_val
     
+    # The returning columns are selected from the FINAL TABLE of the INSERT by
+    # SQLInsertCompiler, nothing is appended to the statement.
+    def return_insert_columns( self, fields ):
+        return "", ()
+
+    def fetch_returned_insert_rows( self, cursor ):
+        return cursor.fetchall()
+    
     # In case of WHERE clause, if the search is required to be case insensitive then converting 
     # left hand side field to upper.
     def lookup_cast( self, lookup_type, internal_type=None ):
@@ -611,7 +619,7 @@ class DatabaseOperations ( BaseDatabaseOperations ):
         sqls = []
         if tables:
             #check for zOS DB2 server
-            if getattr(self.connection.connection, dbms_name) != 'DB2':
+            if not self.connection.dialect.is_zos:
                 fk_tab = 'TABNAME'
                 fk_tabschema = 'TABSCHEMA'
                 fk_const = 'CONSTNAME'
@@ -673,7 +681,7 @@ class DatabaseOperations ( BaseDatabaseOperations ):
                         END IF;
                     END P1''' % {'fk_tab':fk_tab, 'fk_tabschema':fk_tabschema, 'fk_const':fk_const, 'fk_systab':fk_systab, 'type_check_string':type_check_string} )  
             
-            if getattr(self.connection.connection, dbms_name) != 'DB2':
+            if not self.connection.dialect.is_zos:
                 for table in tables:
                     sqls.append( "CALL FKEY_ALT_CONST( '%s', '%s' );" % ( table.upper(), curr_schema ) )
             else:
@@ -684,7 +692,7 @@ class DatabaseOperations ( BaseDatabaseOperations ):
                            style.SQL_KEYWORD( "FROM" ) + " " + 
                            style.SQL_TABLE( "%s" % self.quote_name( table ) ) )
                 
-            if getattr(self.connection.connection, dbms_name) != 'DB2':    
+            if not self.connection.dialect.is_zos:    
                 sqls.append( "CALL FKEY_ALT_CONST( '' , '%s' );" % ( curr_schema, ) )
                 sqls.append( "DROP PROCEDURE FKEY_ALT_CONST;" )  
                 
@@ -805,6 +813,74 @@ class DatabaseOperations ( BaseDatabaseOperations ):
             else:
                 return value
     
+    # The EXPLAIN statement only fills the explain tables, SQLCompiler.explain_query
+    # reads the plan from them.
+    explain_prefix = "EXPLAIN PLAN FOR"
+
+    # Db2 limits for a single statement: the number of parameter markers and
+    # the length of the statement text. Values which end up written into the
+    # text (e.g. THEN operands in bulk_update) are counted at 64 bytes each.
+    max_parameter_markers = 32767
+    max_statement_length = 2097152
+    bulk_value_length = 64
+
+    # Lists of a composite key IN lookup (TupleIn) with up to tuple_in_or_rows
+    # rows are written as ORed equalities, longer ones as a VALUES table.
+    # Lists needing more than tuple_in_max_markers markers are bound as one
+    # table of rows staged by the cursor (pybase.StagedRows), which leaves the
+    # rest of max_parameter_markers to the rest of the statement.
+    tuple_in_or_rows = 4
+    tuple_in_max_markers = 16384
+
+    def bulk_batch_size(self, fields, objs):
+        if not fields:
+            return len(objs)
+        by_markers = self.max_parameter_markers // len(fields)
+        by_length = (self.max_statement_length - 1024) // (len(fields) * self.bulk_value_length)
+        return max(min(by_markers, by_length), 1)
+
+    # MERGE of rows given as a VALUES table into table. A source row matches a
+    # target row when all the columns of any of the match_groups are equal.
+    # The update_columns of the matching rows are set from the source row, and
+    # the rows without a match are inserted when insert is True. Markers in a
+    # VALUES table have no type, so every one is cast to the type of its column.
+    def merge_sql(self, table, columns, cast_types, placeholder_rows, match_groups, update_columns=(), insert=True):
+        qn = self.quote_name
+        values_sql = ", ".join(
+            "(%s)" % ", ".join("CAST(%s AS %s)" % (placeholder, cast_type)
+                               for placeholder, cast_type in zip(row, cast_types))
+            for row in placeholder_rows
+        )
+        on_sql = " OR ".join(
+            "(%s)" % " AND ".join("T.%s = S.%s" % (qn(column), qn(column)) for column in group)
+            for group in match_groups
+        )
+        sql = ["MERGE INTO %s AS T USING (VALUES %s) AS S (%s) ON %s" % (
+            qn(table), values_sql, ", ".join(qn(column) for column in columns), on_sql)]
+        if update_columns:
+            sql.append("WHEN MATCHED THEN UPDATE SET %s" % ", ".join(
+                "%s = S.%s" % (qn(column), qn(column)) for column in update_columns))
+        if insert:
+            sql.append("WHEN NOT MATCHED THEN INSERT (%s) VALUES (%s)" % (
+                ", ".join(qn(column) for column in columns),
+                ", ".join("S.%s" % qn(column) for column in columns)))
+        return " ".join(sql)
+
+    # Column type for the CAST of a MERGE source marker, without the check
+    # constraints some of the data_types carry.
+    def merge_cast_type(self, field):
+        return field.db_type(self.connection).split(' CHECK')[0]
+
+    # adapt_datefield_value and adapt_datetimefield_value return DATE('...') and
+    # TIMESTAMP('...') expressions, a value bound to a CAST marker is the bare literal.
+    def merge_param(self, value):
+        if isinstance(value, str) and value.endswith("')"):
+            if value.startswith("DATE('"):
+                return value[6:-2]
+            if value.startswith("TIMESTAMP('"):
+                return value[11:-2]
+        return value
+
     def bulk_insert_sql(self, fields, num_values):
         placeholder_rows_sql = (", ".join(row) for row in num_values)
         values_sql = ", ".join("(%s)" % sql for sql in placeholder_rows_sql)
@@ -0,0 +1,197 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+"""
+Keyset (seek) pagination. Instead of skipping the rows of the earlier pages
+with OFFSET or ROW_NUMBER(), a page starts after the ordering values of the
+last row of the previous page:
+
+    paginator = KeysetPaginator( Book.objects.order_by( '-published' ), 100 )
+    page = paginator.page()
+    page = paginator.page( after = page.next_cursor )
+
+The ordering is made unique by adding the primary key to it. "After this
+ordering tuple" becomes a range predicate on the leading ordering column
+followed by the OR of the equalities and the strict comparison on each
+following column, which Db2 matches to an index on the ordering columns as
+a start key, so a page costs the same wherever it is. Pages are read with
+FETCH FIRST n ROWS ONLY and OPTIMIZE FOR n ROWS, on every server version.
+"""
+
+import base64
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.db.models.constants import LOOKUP_SEP
+
+# Returns a clone of queryset whose SELECT ends with OPTIMIZE FOR rows ROWS
+# on Db2, telling the optimizer that only the first rows are going to be read.
+def optimize_for( queryset, rows ):
+    queryset = queryset.all()
+    queryset.query.db2_optimize_for = rows
+    return queryset
+
+# The ordering of queryset as ( path, descending ) pairs, made unique with the
+# primary key. Only field names (with their '-' prefix) can be paged on.
+def key_ordering( queryset, ordering = None ):
+    if ordering is None:
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+    if not ordering:
+        raise ValueError( "Keyset pagination needs an ordered queryset." )
+    pk = queryset.model._meta.pk.name
+    pairs = []
+    for item in ordering:
+        if not isinstance( item, str ) or item == '?':
+            raise ValueError( "Keyset pagination can only order by field names, not %r." % ( item, ) )
+        descending = item.startswith( '-' )
+        path = item.lstrip( '-+' )
+        pairs.append( ( pk if path == 'pk' else path, descending ) )
+    if not any( path == pk for path, _ in pairs ):
+        pairs.append( ( pk, pairs[-1][1] ) )
+    return pairs
+
+# The predicate of the rows which come after key (a tuple with a value per
+# ordering column) in ordering, or before it when backwards.
+def seek_filter( ordering, key, backwards = False ):
+    if len( key ) != len( ordering ):
+        raise ValueError( "The key has %d values, the ordering %d columns." % ( len( key ), len( ordering ) ) )
+    if any( value is None for value in key ):
+        raise ValueError( "Keyset pagination needs ordering values which are not NULL." )
+    condition = Q()
+    equal = {}
+    for ( path, descending ), value in zip( ordering, key ):
+        lookup = 'lt' if descending != backwards else 'gt'
+        condition |= Q( **dict( equal, **{ '%s__%s' % ( path, lookup ): value } ) )
+        equal[path] = value
+    path, descending = ordering[0]
+    leading = Q( **{ '%s__%s' % ( path, 'lte' if descending != backwards else 'gte' ): key[0] } )
+    return leading & condition
+
+# Returns queryset ordered by ordering and restricted to the rows after key.
+def seek( queryset, key, ordering = None, backwards = False ):
+    pairs = key_ordering( queryset, ordering )
+    if backwards:
+        order_by = [( path if descending else '-' + path ) for path, descending in pairs]
+    else:
+        order_by = [( '-' + path if descending else path ) for path, descending in pairs]
+    if key is not None:
+        queryset = queryset.filter( seek_filter( pairs, key, backwards ) )
+    return queryset.order_by( *order_by )
+
+def key_of( row, ordering ):
+    """
+    Ordering values of a row of the queryset: a model instance, or a dict of
+    a values() queryset holding the ordering fields.
+    """
+    if isinstance( row, dict ):
+        return tuple( row[path] for path, _ in ordering )
+    key = []
+    for path, _ in ordering:
+        obj = row
+        parts = path.split( LOOKUP_SEP )
+        for part in parts[:-1]:
+            obj = getattr( obj, part )
+        key.append( getattr( obj, obj._meta.get_field( parts[-1] ).attname ) )
+    return tuple( key )
+
+def encode_cursor( key ):
+    return base64.urlsafe_b64encode( json.dumps( key, cls = DjangoJSONEncoder ).encode( 'utf-8' ) ).decode( 'ascii' )
+
+# Turns a cursor made by encode_cursor() back into a key, converting the
+# JSON values with the fields of the ordering.
+def decode_cursor( cursor, model, ordering ):
+    try:
+        values = json.loads( base64.urlsafe_b64decode( cursor.encode( 'ascii' ) ).decode( 'utf-8' ) )
+    except ( ValueError, TypeError ):
+        raise ValueError( "Invalid pagination cursor %r." % cursor )
+    if not isinstance( values, list ) or len( values ) != len( ordering ):
+        raise ValueError( "Invalid pagination cursor %r." % cursor )
+    key = []
+    for ( path, _ ), value in zip( ordering, values ):
+        opts = model._meta
+        field = None
+        for part in path.split( LOOKUP_SEP ):
+            field = opts.get_field( part )
+            if field.is_relation and field.related_model is not None:
+                opts = field.related_model._meta
+        if field.is_relation:
+            field = field.target_field
+        key.append( field.to_python( value ) )
+    return tuple( key )
+
+class KeysetPage( object ):
+
+    def __init__( self, object_list, ordering, has_next, has_previous ):
+        self.object_list = object_list
+        self.ordering = ordering
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __len__( self ):
+        return len( self.object_list )
+
+    def __iter__( self ):
+        return iter( self.object_list )
+
+    def has_next( self ):
+        return self._has_next
+
+    def has_previous( self ):
+        return self._has_previous
+
+    @property
+    def next_cursor( self ):
+        if not self._has_next or not self.object_list:
+            return None
+        return encode_cursor( key_of( self.object_list[-1], self.ordering ) )
+
+    @property
+    def previous_cursor( self ):
+        if not self._has_previous or not self.object_list:
+            return None
+        return encode_cursor( key_of( self.object_list[0], self.ordering ) )
+
+class KeysetPaginator( object ):
+    """
+    Pages through a queryset per_page rows at a time, in the order of its
+    order_by() (or of the ordering given). page( after = cursor ) returns the
+    rows following a page's next_cursor, page( before = cursor ) the rows
+    preceding a page's previous_cursor, and page() the first page.
+    """
+
+    def __init__( self, queryset, per_page, ordering = None ):
+        self.queryset = queryset
+        self.per_page = int( per_page )
+        self.ordering = key_ordering( queryset, ordering )
+
+    def page( self, after = None, before = None ):
+        if after is not None and before is not None:
+            raise ValueError( "A page is either after or before a cursor, not both." )
+        backwards = before is not None
+        cursor = before if backwards else after
+        key = decode_cursor( cursor, self.queryset.model, self.ordering ) if cursor is not None else None
+        queryset = seek( self.queryset, key, [( '-' if descending else '' ) + path for path, descending in self.ordering],
+                         backwards )
+        # One row more than a page tells whether there is another one.
+        rows = list( optimize_for( queryset, self.per_page + 1 )[:self.per_page + 1] )
+        more = len( rows ) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+            return KeysetPage( rows, self.ordering, has_next = True, has_previous = more )
+        return KeysetPage( rows, self.ordering, has_next = more, has_previous = key is not None )
@@ -25,9 +25,14 @@ except ImportError as e:
     raise ImportError( "ibm_db module not found. Install ibm_db module from http://code.google.com/p/ibm-db/. Error: %s" % e )
 
 from decimal import Decimal
-import regex
+from ibm_db_django import sqltokenizer, dialect
+from ibm_db_django.instrumentation import StatementRecord, note, take_notes
 
 import datetime
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
 # For checking django's version
 from django import VERSION as djangoVersion
 
@@ -61,7 +66,658 @@ if ( djangoVersion[0:2] >= ( 1, 6 )):
     InternalError = Database.InternalError
     ProgrammingError = Database.ProgrammingError
     NotSupportedError = Database.NotSupportedError
-    
+
+# Keys of settings OPTIONS which are consumed by the backend itself and
+# must not be passed on to ibm_db_dbi.connect.
+BACKEND_OPTIONS = ( 'REWRITE_CACHE_SIZE', 'STATEMENT_CACHE_SIZE', 'TYPED_PARAMETER_MARKERS', 'FETCH_BLOCK_SIZE',
+                    'EXECUTEMANY_CHUNK_SIZE', 'EXECUTEMANY_COMMIT_PER_CHUNK', 'POOL',
+                    'USABLE_WINDOW', 'ASYNC_WORKERS', 'INSTRUMENTATION', 'SLOW_QUERY_LOG',
+                    'EXPLAIN_SCHEMA', 'IN_LIST_STRATEGY', 'IN_LIST_THRESHOLD' )
+
+# Default bound of the characters of the statements kept by the rewrite cache.
+DEFAULT_REWRITE_CACHE_CHARS = 4 * 1024 * 1024
+
+# Default number of rows a cursor fetches at a time while it is iterated.
+DEFAULT_FETCH_BLOCK_SIZE = 100
+
+# Default number of parameter sets executemany binds to a statement at a time.
+DEFAULT_EXECUTEMANY_CHUNK_SIZE = 1000
+
+# Default number of seconds after a successful statement during which
+# is_usable() takes the connection as usable without asking the driver.
+DEFAULT_USABLE_WINDOW = 10
+
+# Prefix of the declared global temporary tables the rows of StagedRows
+# parameters are staged into, SESSION.DJANGO_STAGED_0, _1, ... A table belongs
+# to the cursor which staged it until that cursor runs another statement or
+# is closed, so its rows stay put while the result set is read.
+STAGED_TABLE_PREFIX = 'SESSION.DJANGO_STAGED'
+# The DECLARE of a staged table, which only drops the statements on that
+# table from the statement cache (see DB2CursorWrapper._stage_rows).
+_STAGED_DECLARE = 'DECLARE GLOBAL TEMPORARY TABLE ' + STAGED_TABLE_PREFIX
+
+# Errors after which the connection cannot be used anymore: communication
+# errors, a terminated agent or a connection which does not exist.
+BROKEN_CONNECTION_ERRORS = ( 'SQL30081N', 'SQL30080N', 'SQL1224N', 'SQLSTATE=08001',
+                             'SQLSTATE=08003', 'SQLSTATE=08S01', 'SQLSTATE=40003' )
+
+# Statements which are never served from the statement cache. DDL also
+# invalidates all the statements cached for the connection, including the
+# DECLARE of a temporary table which replaces the one they were prepared on.
+# EXPLAIN statements carry a new query tag each time, so caching them would
+# only evict the statements worth keeping; they change nothing prepared.
+# Neither does the DECLARE of a staged table for the statements on other tables.
+_UNCACHED_STATEMENTS = ( 'CREATE', 'ALTER', 'DROP', 'RENAME', 'COMMENT', 'TRUNCATE', 'GRANT', 'REVOKE', 'CALL',
+                         'DECLARE', 'EXPLAIN' )
+_CACHE_NEUTRAL_STATEMENTS = ( 'EXPLAIN', )
+
+class SQLRewriteCache( object ):
+    """
+    Bounded LRU cache of the format-to-qmark rewrites done by DB2CursorWrapper.execute.
+    Entries are keyed on the operation text plus a parameter signature (see
+    _param_signature) and hold the RewritePlan built for them. Besides the
+    number of entries, the cache bounds the characters of the statements it
+    keeps to max_chars: a statement longer than a 64th of it is not cached
+    (counted as oversized), and the least recently used entries are evicted
+    until the rest fits.
+    """
+    def __init__( self, maxsize = 512, max_chars = DEFAULT_REWRITE_CACHE_CHARS ):
+        self.maxsize = maxsize
+        self.max_chars = max_chars
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.oversized = 0
+        self._chars = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get( self, key ):
+        with self._lock:
+            plan = self._entries.get( key )
+            if plan is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end( key )
+                self.hits += 1
+            return plan
+
+    def put( self, key, plan ):
+        if self.maxsize <= 0:
+            return
+        length = len( key[0] )
+        with self._lock:
+            if length > self.max_chars // 64:
+                self.oversized += 1
+                return
+            if key in self._entries:
+                self._entries.move_to_end( key )
+                return
+            self._entries[key] = plan
+            self._chars += length
+            self._evict()
+
+    def _evict( self ):
+        while self._entries and ( len( self._entries ) > max( self.maxsize, 0 ) or self._chars > self.max_chars ):
+            key, _ = self._entries.popitem( last = False )
+            self._chars -= len( key[0] )
+            self.evictions += 1
+
+    def resize( self, maxsize ):
+        with self._lock:
+            self.maxsize = int( maxsize )
+            self._evict()
+
+    def clear( self ):
+        with self._lock:
+            self._entries.clear()
+            self._chars = 0
+            self.hits = self.misses = self.evictions = self.oversized = 0
+
+    def stats( self ):
+        return {
+            'size': len( self._entries ),
+            'maxsize': self.maxsize,
+            'chars': self._chars,
+            'max_chars': self.max_chars,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'oversized': self.oversized,
+        }
+
+# Process wide, shared by all cursors. Sized through OPTIONS['REWRITE_CACHE_SIZE'].
+rewrite_cache = SQLRewriteCache()
+
+class StatementTextCounter( object ):
+    """
+    Counts the distinct statement texts sent to the server, which is what the
+    Db2 package cache sees. Up to `limit` distinct texts are tracked. Only the
+    cursors of instrumented connections (OPTIONS['INSTRUMENTATION'] or
+    OPTIONS['SLOW_QUERY_LOG']) count their statements.
+    """
+    def __init__( self, limit = 100000 ):
+        self.limit = limit
+        self.executions = 0
+        self._texts = set()
+
+    def add( self, sql ):
+        self.executions += 1
+        if len( self._texts ) < self.limit:
+            self._texts.add( hash( sql ) )
+
+    def clear( self ):
+        self.executions = 0
+        self._texts = set()
+
+    def stats( self ):
+        return {
+            'distinct': len( self._texts ),
+            'executions': self.executions,
+            'saturated': len( self._texts ) >= self.limit,
+        }
+
+statement_texts = StatementTextCounter()
+
+# Parameter signature used as part of the rewrite cache key. The 'DEFAULT'
+# string and the DATE(...)/TIMESTAMP(...) expressions made by DatabaseOperations
+# are told apart from other strings, everything else is keyed on its type.
+def _param_signature( parameters ):
+    signature = []
+    for param in parameters:
+        if isinstance( param, str ) and len( param ) == 7 and param.upper() == 'DEFAULT':
+            signature.append( 'DEFAULT' )
+        elif isinstance( param, StagedTable ):
+            signature.append( 'STAGED' )
+        elif isinstance( param, str ) and param.startswith( ( "DATE('", "TIMESTAMP('" ) ):
+            signature.append( 'TEMPORAL' )
+        else:
+            signature.append( type( param ) )
+    return tuple( signature )
+
+# Renders a parameter value as an SQL literal, for the places where Db2 cannot
+# take an untyped parameter marker.
+def _sql_literal( value ):
+    if value is None:
+        return 'NULL'
+    if isinstance( value, StagedTable ):
+        return value.name
+    if isinstance( value, memoryview ):
+        return "BX'%s'" % value.hex()
+    if isinstance( value, str ):
+        # Values already adapted into DATE(...)/TIMESTAMP(...) expressions by
+        # DatabaseOperations are inlined as they are.
+        if value.startswith( ( 'DATE', 'TIMESTAMP' ) ):
+            return value
+        return "'%s'" % value.replace( "'", "''" )
+    if isinstance( value, ( datetime.date, datetime.time ) ):
+        return "'%s'" % value
+    return str( value )
+
+# Splits a DATE('...')/TIMESTAMP('...') value made by DatabaseOperations.adapt_*
+# into the function and its literal. Any other string, even one starting with
+# DATE or TIMESTAMP, gives None.
+def _temporal_literal( value ):
+    for function in ( 'DATE', 'TIMESTAMP' ):
+        if value.startswith( function + "('" ) and value.endswith( "')" ):
+            literal = value[len( function ) + 2:-2]
+            if "'" not in literal:
+                return function, literal
+    return None
+
+# No value is bound for a typed marker rendered as a constant.
+_UNBOUND = object()
+
+# Renders a parameter value as a parameter marker with an explicit type, for
+# the places where Db2 cannot infer the type of an untyped marker. Used in
+# place of _sql_literal when OPTIONS['TYPED_PARAMETER_MARKERS'] is set, so the
+# statement text does not change with the value. Returns the SQL and the value
+# to bind.
+def _typed_marker( value ):
+    if value is None:
+        return 'NULL', _UNBOUND
+    if isinstance( value, StagedTable ):
+        return value.name, _UNBOUND
+    if isinstance( value, bool ):
+        return 'CAST(? AS SMALLINT)', int( value )
+    if isinstance( value, int ):
+        return 'CAST(? AS BIGINT)', value
+    if isinstance( value, float ):
+        return 'CAST(? AS DOUBLE)', value
+    if isinstance( value, Decimal ):
+        exponent = value.as_tuple().exponent
+        if not isinstance( exponent, int ):
+            return 'CAST(? AS DECFLOAT(34))', str( value )
+        return 'CAST(? AS DECIMAL(31, %d))' % min( max( -exponent, 0 ), 31 ), value
+    if isinstance( value, str ):
+        temporal = _temporal_literal( value )
+        if temporal is not None:
+            return 'CAST(? AS %s)' % temporal[0], temporal[1]
+        return 'CAST(? AS VARCHAR(32672))', value
+    if isinstance( value, datetime.datetime ):
+        return 'CAST(? AS TIMESTAMP)', value
+    if isinstance( value, datetime.date ):
+        return 'CAST(? AS DATE)', value
+    if isinstance( value, datetime.time ):
+        return 'CAST(? AS TIME)', value
+    if isinstance( value, ( memoryview, bytes ) ):
+        return 'CAST(? AS VARBINARY(32672))', value
+    return _sql_literal( value ), _UNBOUND
+
+class StagedRows( object ):
+    """
+    Parameter standing for a table of rows, used by the compiler where a list
+    would need too many parameter markers. Its %s marker is replaced by the
+    name of a declared global temporary table with columns V1, V2, ... of
+    column_types, which the cursor executing the statement fills with rows
+    just before running it (see DB2CursorWrapper._stage_parameters).
+    """
+    __slots__ = ( 'column_types', 'rows' )
+
+    def __init__( self, column_types, rows ):
+        self.column_types = tuple( column_types )
+        self.rows = rows
+
+    def __str__( self ):
+        return '%s /* %d rows */' % ( STAGED_TABLE_PREFIX, len( self.rows ) )
+
+    __repr__ = __str__
+
+# The table a cursor staged the rows of a StagedRows parameter into.
+class StagedTable( object ):
+    __slots__ = ( 'name', )
+
+    def __init__( self, name ):
+        self.name = name
+
+class RewritePlan( object ):
+    """
+    Format-to-qmark rewrite of one statement for one parameter signature.
+    Each parameter is either bound to a ? marker, inlined as a literal (inside
+    aggregate and COALESCE calls, as an operand of +/-, after THEN/ELSE, when
+    aliased with AS, Decimals in SELECT/UPDATE and DATE(...)/TIMESTAMP(...)
+    expressions cast with CAST) or, for the 'DEFAULT' string, replaced by the
+    DEFAULT keyword. A StagedTable is replaced by its table name. The operand of a CAST( ... AS <type>) is otherwise bound,
+    the CAST already gives the marker its type. With typed markers, the values
+    which would be inlined are bound to a CAST(? AS <type>) marker instead.
+    """
+    __slots__ = ( 'sql', 'parts', 'bound', 'inlined', 'ordered' )
+
+    def __init__( self, tokens, signature ):
+        select_update = tokens.segments[0].startswith( ( 'SELECT ', 'UPDATE ' ) )
+        inline_flags = sqltokenizer.IN_AGGREGATE | sqltokenizer.IN_COALESCE | sqltokenizer.IN_EXPRESSION
+        parts = [ tokens.segments[0] ]
+        bound = []
+        inlined = []
+        for index in range( len( tokens ) ):
+            kind = signature[index] if index < len( signature ) else None
+            if kind is None:
+                # More markers than parameters, the driver reports the mismatch.
+                parts.append( '?' )
+            elif ( ( tokens.flags[index] & inline_flags ) or ( select_update and kind is Decimal ) or
+                   ( kind == 'TEMPORAL' and tokens.flags[index] & sqltokenizer.IN_CAST ) ):
+                parts.append( None )
+                inlined.append( index )
+            elif kind == 'STAGED':
+                parts.append( None )
+                inlined.append( index )
+            elif kind == 'DEFAULT':
+                parts.append( 'DEFAULT' )
+            else:
+                parts.append( '?' )
+                bound.append( index )
+            parts.append( tokens.segments[index + 1] )
+        # Parameters without a marker are passed on as well.
+        bound.extend( range( len( tokens ), len( signature ) ) )
+        self.bound = tuple( bound )
+        self.inlined = tuple( inlined )
+        if inlined:
+            self.sql = None
+            self.parts = parts
+            self.ordered = tuple( sorted( bound + inlined ) )
+        else:
+            self.sql = ''.join( parts )
+            self.parts = None
+            self.ordered = None
+
+    def apply( self, parameters, typed = False ):
+        if not self.inlined:
+            return self.sql, tuple( parameters[index] for index in self.bound )
+        parts = list( self.parts )
+        if not typed:
+            for index in self.inlined:
+                parts[2 * index + 1] = _sql_literal( parameters[index] )
+            return ''.join( parts ), tuple( parameters[index] for index in self.bound )
+
+        values = {}
+        for index in self.inlined:
+            parts[2 * index + 1], values[index] = _typed_marker( parameters[index] )
+        bind = []
+        for index in self.ordered:
+            value = values[index] if index in values else parameters[index]
+            if value is not _UNBOUND:
+                bind.append( value )
+        return ''.join( parts ), tuple( bind )
+
+class StatementCache( object ):
+    """
+    Per-connection LRU cache of prepared ibm_db statement handles, keyed on the
+    final qmark SQL. A cursor checks a handle out for as long as it works with
+    its result set and checks it back in when it moves on to another statement
+    or is closed, so a handle never serves two open result sets at once.
+    Enabled through OPTIONS['STATEMENT_CACHE_SIZE'].
+    """
+    def __init__( self, maxsize ):
+        self.maxsize = maxsize
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._handles = OrderedDict()
+
+    def checkout( self, sql ):
+        handle = self._handles.pop( sql, None )
+        if handle is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return handle
+
+    def checkin( self, sql, handle, generation ):
+        # Handles prepared before the last invalidation, or duplicates of a
+        # statement which is already cached, are not kept.
+        if generation != self.generation or sql in self._handles:
+            self._free( handle )
+            return
+        self._handles[sql] = handle
+        while len( self._handles ) > self.maxsize:
+            self._free( self._handles.popitem( last = False )[1] )
+            self.evictions += 1
+
+    def invalidate( self ):
+        self.generation += 1
+        for handle in self._handles.values():
+            self._free( handle )
+        self._handles.clear()
+
+    # Drops the cached statements whose SQL contains text, e.g. the name of a
+    # table which has been declared again.
+    def invalidate_matching( self, text ):
+        for sql in [sql for sql in self._handles if text in sql]:
+            self._free( self._handles.pop( sql ) )
+
+    def _free( self, handle ):
+        try:
+            Database.ibm_db.free_stmt( handle )
+        except Exception:
+            pass
+
+    def stats( self ):
+        return {
+            'size': len( self._handles ),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+if ( djangoVersion[0:2] >= ( 5, 0 ) ):
+    _UTC = datetime.timezone.utc
+else:
+    _UTC = timezone.utc
+
+# Column types the driver never returns as strings, so they need no NUL stripping.
+_NON_STRING_TYPES = ( Database.BINARY, Database.NUMBER, Database.BIGINT, Database.DATE,
+                      Database.TIME, Database.DATETIME, Database.BOOLEAN )
+
+class ConversionPlan( object ):
+    """
+    Fix-ups applied to the rows of one result set, worked out once from the
+    cursor description: the TIMESTAMP columns which are made aware in UTC when
+    time zone support is active, and the columns which may hold strings with
+    NUL characters to strip. When there is neither, rows are returned as is.
+    """
+    __slots__ = ( 'datetimes', 'strings', 'noop' )
+
+    def __init__( self, description, use_tz ):
+        datetimes = []
+        strings = []
+        for index, desc in enumerate( description or () ):
+            column_type = desc[1]
+            if column_type is Database.DATETIME:
+                if use_tz:
+                    datetimes.append( index )
+            elif not any( column_type is non_string for non_string in _NON_STRING_TYPES ):
+                strings.append( index )
+        self.datetimes = tuple( datetimes )
+        self.strings = tuple( strings )
+        self.noop = not ( datetimes or strings )
+
+    def apply_row( self, row ):
+        fixed = None
+        for index in self.strings:
+            value = row[index]
+            if isinstance( value, str ) and '\x00' in value:
+                if fixed is None:
+                    fixed = list( row )
+                fixed[index] = value.replace( '\x00', '' )
+        for index in self.datetimes:
+            value = row[index]
+            if value is not None and value.tzinfo is None:
+                if fixed is None:
+                    fixed = list( row )
+                fixed[index] = value.replace( tzinfo=_UTC )
+        if fixed is None:
+            return row
+        return tuple( fixed )
+
+    def apply( self, rows ):
+        if self.noop:
+            return rows
+        apply_row = self.apply_row
+        return [ apply_row( row ) for row in rows ]
+
+class ConnectionPool( object ):
+    """
+    Process wide pool of ibm_db_dbi connections opened with the same arguments,
+    enabled through OPTIONS['POOL']. Idle connections are handed out most
+    recently used first, threads waiting for one are served in arrival order
+    for at most `timeout` seconds. Idle connections above min_size are closed
+    after max_idle seconds and any connection after max_lifetime seconds. A
+    connection which was idle for validate_after seconds or more is checked
+    with ibm_db.active before it is handed out.
+    """
+    def __init__( self, connect, min_size = 0, max_size = 10, timeout = 30, max_idle = 300,
+                  max_lifetime = 3600, validate_after = 30 ):
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max( max_size, 1 )
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.validate_after = validate_after
+        # ( connection, time it was released ), oldest first
+        self._idle = deque()
+        self._size = 0
+        self._condition = threading.Condition()
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.timeouts = 0
+        self.created = 0
+        self.discarded = 0
+
+    def fill( self ):
+        while True:
+            with self._condition:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            connection = self._open()
+            self.release( connection )
+
+    def acquire( self ):
+        start = time.monotonic()
+        deadline = start + self.timeout
+        waited = False
+        while True:
+            entry = None
+            timed_out = False
+            expired = []
+            with self._condition:
+                while True:
+                    now = time.monotonic()
+                    expired.extend( self._expire( now ) )
+                    if self._idle:
+                        entry = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        timed_out = True
+                        break
+                    waited = True
+                    self._condition.wait( remaining )
+            for connection in expired:
+                self._close( connection )
+
+            if timed_out:
+                raise OperationalError( "Timed out after %s seconds waiting for a pooled connection" % self.timeout )
+            if entry is None:
+                connection = self._open()
+            else:
+                connection, released = entry
+                if now - released >= self.validate_after and not self._is_active( connection ):
+                    self._discard( connection )
+                    continue
+            self._checked_out( time.monotonic() - start if waited else 0.0, waited )
+            return connection
+
+    def release( self, connection ):
+        now = time.monotonic()
+        discard = getattr( connection, 'broken', False ) or now - connection.pool_created >= self.max_lifetime
+        if not discard:
+            try:
+                connection.rollback()
+            except Exception:
+                discard = True
+        if discard:
+            self._discard( connection )
+            return
+        with self._condition:
+            self._idle.append( ( connection, now ) )
+            self._condition.notify()
+
+    def _open( self ):
+        try:
+            connection = self._connect()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        connection.pool = self
+        connection.pool_created = time.monotonic()
+        with self._condition:
+            self.created += 1
+        return connection
+
+    def _checked_out( self, wait_time, waited ):
+        with self._condition:
+            self.checkouts += 1
+            if waited:
+                self.waits += 1
+                self.wait_time += wait_time
+                self.max_wait_time = max( self.max_wait_time, wait_time )
+
+    # Takes the idle connections past their lifetime, or idle for too long
+    # while the pool is above min_size, out of the pool. Called with the lock held.
+    def _expire( self, now ):
+        expired = []
+        for entry in list( self._idle ):
+            connection, released = entry
+            if ( now - connection.pool_created >= self.max_lifetime or
+                 ( now - released >= self.max_idle and self._size > self.min_size ) ):
+                self._idle.remove( entry )
+                self._size -= 1
+                self.discarded += 1
+                expired.append( connection )
+        return expired
+
+    def _discard( self, connection ):
+        with self._condition:
+            self._size -= 1
+            self.discarded += 1
+            self._condition.notify()
+        self._close( connection )
+
+    def _close( self, connection ):
+        statement_cache = getattr( connection, 'statement_cache', None )
+        if statement_cache is not None:
+            statement_cache.invalidate()
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _is_active( self, connection ):
+        try:
+            return bool( Database.ibm_db.active( connection.conn_handler ) )
+        except Exception:
+            return False
+
+    def stats( self ):
+        with self._condition:
+            return {
+                'size': self._size,
+                'idle': len( self._idle ),
+                'in_use': self._size - len( self._idle ),
+                'max_size': self.max_size,
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'wait_time': self.wait_time,
+                'max_wait_time': self.max_wait_time,
+                'timeouts': self.timeouts,
+                'created': self.created,
+                'discarded': self.discarded,
+            }
+
+# Keys of OPTIONS['POOL'] and the ConnectionPool argument each one sets.
+POOL_OPTIONS = {
+    'MIN_SIZE': 'min_size',
+    'MAX_SIZE': 'max_size',
+    'TIMEOUT': 'timeout',
+    'MAX_IDLE': 'max_idle',
+    'MAX_LIFETIME': 'max_lifetime',
+    'VALIDATE_AFTER': 'validate_after',
+}
+
+# Connection pools of the process, keyed on the connection arguments.
+pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool( kwargs, pconnect, pool_options ):
+    key = ( pconnect, repr( sorted( kwargs.items() ) ) )
+    with _pools_lock:
+        pool = pools.get( key )
+        created = pool is None
+        if created:
+            arguments = {}
+            if isinstance( pool_options, dict ):
+                for option, argument in POOL_OPTIONS.items():
+                    if pool_options.get( option ) is not None:
+                        arguments[argument] = pool_options[option]
+            connect = Database.pconnect if pconnect else Database.connect
+            pool = ConnectionPool( lambda: connect( **kwargs ), **arguments )
+            pools[key] = pool
+    if created:
+        pool.fill()
+    return pool
+
 class DatabaseWrapper( object ):
     # Get new database connection for non persistance connection 
     def get_new_connection(self, kwargs):
@@ -106,8 +762,26 @@ class DatabaseWrapper( object ):
         else:
             conn_options = {Database.SQL_ATTR_AUTOCOMMIT : Database.SQL_AUTOCOMMIT_OFF}
         kwargs['conn_options'] = conn_options
+        statement_cache_size = 0
+        typed_parameter_markers = False
+        pool_options = None
+        usable_window = DEFAULT_USABLE_WINDOW
+        fetch_block_size = DEFAULT_FETCH_BLOCK_SIZE
+        executemany_chunk_size = DEFAULT_EXECUTEMANY_CHUNK_SIZE
+        executemany_commit_per_chunk = False
         if kwargsKeys.__contains__( 'options' ):
-            kwargs.update( kwargs.get( 'options' ) )
+            options = dict( kwargs.get( 'options' ) )
+            statement_cache_size = int( options.get( 'STATEMENT_CACHE_SIZE' ) or 0 )
+            typed_parameter_markers = bool( options.get( 'TYPED_PARAMETER_MARKERS' ) )
+            pool_options = options.get( 'POOL' )
+            if options.get( 'USABLE_WINDOW' ) is not None:
+                usable_window = float( options['USABLE_WINDOW'] )
+            fetch_block_size = max( int( options.get( 'FETCH_BLOCK_SIZE' ) or DEFAULT_FETCH_BLOCK_SIZE ), 1 )
+            executemany_chunk_size = max( int( options.get( 'EXECUTEMANY_CHUNK_SIZE' ) or DEFAULT_EXECUTEMANY_CHUNK_SIZE ), 1 )
+            executemany_commit_per_chunk = bool( options.get( 'EXECUTEMANY_COMMIT_PER_CHUNK' ) )
+            for key in BACKEND_OPTIONS:
+                options.pop( key, None )
+            kwargs.update( options )
             del kwargs['options']
         if kwargsKeys.__contains__( 'port' ):
             del kwargs['port']
@@ -117,29 +791,63 @@ class DatabaseWrapper( object ):
             pconnect_flag = kwargs['PCONNECT']
             del kwargs['PCONNECT']
             
-        if pconnect_flag:
+        if pool_options:
+            connection = get_pool( kwargs, pconnect_flag, pool_options ).acquire()
+        elif pconnect_flag:
             connection = Database.pconnect( **kwargs )
         else:
             connection = Database.connect( **kwargs )
         connection.autocommit = connection.set_autocommit
+        # A pooled connection keeps the statements cached while it was idle.
+        if statement_cache_size > 0 and getattr( connection, 'statement_cache', None ) is None:
+            connection.statement_cache = StatementCache( statement_cache_size )
+        connection.typed_parameter_markers = typed_parameter_markers
+        connection.fetch_block_size = fetch_block_size
+        connection.usable_window = usable_window
+        connection.broken = False
+        connection.executemany_chunk_size = executemany_chunk_size
+        connection.executemany_commit_per_chunk = executemany_commit_per_chunk
         
         return connection
     
     def is_active( self, connection = None ):
         return Database.ibm_db.active(connection.conn_handler)
+
+    # A connection which ran a statement successfully within the last
+    # usable_window seconds is taken as usable without asking the driver.
+    def is_usable( self, connection ):
+        if connection is None or getattr( connection, 'broken', False ):
+            return False
+        last_activity = getattr( connection, 'last_activity', None )
+        if ( last_activity is not None and
+             time.monotonic() - last_activity < getattr( connection, 'usable_window', DEFAULT_USABLE_WINDOW ) ):
+            return True
+        try:
+            usable = bool( self.is_active( connection ) )
+        except Exception:
+            return False
+        if usable:
+            connection.last_activity = time.monotonic()
+        return usable
         
     # Over-riding _cursor method to return DB2 cursor.
     def _cursor( self, connection ):
         return DB2CursorWrapper( connection )
                     
     def close( self, connection ):
+        pool = getattr( connection, 'pool', None )
+        if pool is not None:
+            return pool.release( connection )
+        statement_cache = getattr( connection, 'statement_cache', None )
+        if statement_cache is not None:
+            statement_cache.invalidate()
         connection.close()
         
     def get_server_version( self, connection ):
         self.connection = connection
         if not self.connection:
             self.cursor()
-        return tuple( int( version ) for version in self.connection.server_info()[1].split( "." ) )
+        return dialect.parse_version( self.connection.server_info()[1] )
     
 class DB2CursorWrapper( Database.Cursor ):
         
@@ -151,194 +859,354 @@ class DB2CursorWrapper( Database.Cursor ):
     
     def __init__( self, connection ): 
         super( DB2CursorWrapper, self ).__init__( connection.conn_handler, connection )
+        # ( sql, handle, generation ) of the statement checked out from the statement cache
+        self._statement_lease = None
+        # ( description, USE_TZ, ConversionPlan ) of the current result set
+        self._conversion = None
+        # Block of rows read ahead by __next__, the position of the next row to
+        # hand out and the statement handle the rows were fetched from.
+        self._buffer_rows = None
+        self._buffer_index = 0
+        self._buffer_handle = None
+        self.arraysize = getattr( connection, 'fetch_block_size', DEFAULT_FETCH_BLOCK_SIZE )
+        # Instrumentation collector of the connection and the StatementRecord
+        # of the statement being measured.
+        self._collector = getattr( connection, 'collector', None )
+        self._record = None
+        # Temporary tables holding the rows of the StagedRows parameters of
+        # the current statement.
+        self._staged_tables = []
         
     def __iter__( self ):
         return self
         
+    # Rows are fetched arraysize at a time and handed out from a buffer,
+    # instead of with one driver call per row.
     def __next__( self ):
-        row = self.fetchone()
-        if row == None:
-            raise StopIteration
-        return row
+        rows = self._buffer_rows
+        index = self._buffer_index
+        if rows is None or index >= len( rows ) or self._buffer_handle is not self.stmt_handler:
+            rows = self._fetch_rows( self.arraysize )
+            if not rows:
+                self._buffer_rows = None
+                raise StopIteration
+            self._buffer_rows = rows
+            self._buffer_handle = self.stmt_handler
+            index = 0
+        self._buffer_index = index + 1
+        return rows[index]
+
+    # Hands out up to size (all when None) of the rows read ahead by __next__,
+    # so the fetch methods carry on where the iteration stopped.
+    def _take_buffered( self, size = None ):
+        rows = self._buffer_rows
+        if rows is None:
+            return []
+        if self._buffer_handle is not self.stmt_handler:
+            self._buffer_rows = None
+            return []
+        start = self._buffer_index
+        end = len( rows ) if size is None else min( len( rows ), start + size )
+        if end >= len( rows ):
+            self._buffer_rows = None
+        else:
+            self._buffer_index = end
+        return rows[start:end]
+
+    def _fetch_rows( self, size ):
+        return self._fetch( False, super( DB2CursorWrapper, self ).fetchmany, size )
+
+    # Fetches through the ibm_db_dbi method and converts the row (one) or rows,
+    # timing both phases when the statement is instrumented.
+    def _fetch( self, one, fetch, *args ):
+        record = self._record
+        if record is None:
+            return self._convert( fetch( *args ), one )
+        start = time.perf_counter()
+        result = fetch( *args )
+        fetched = time.perf_counter()
+        result = self._convert( result, one )
+        record.fetch += fetched - start
+        record.convert += time.perf_counter() - fetched
+        if result:
+            record.add_rows( [result] if one else result, self.stmt_handler )
+        self._collector.capture( record )
+        return result
+
+    def _convert( self, result, one ):
+        if result is None:
+            return result
+        plan = self._conversion_plan()
+        if plan.noop:
+            return result
+        return plan.apply_row( result ) if one else plan.apply( result )
+
+    # Hands the record of the previous statement to the collector.
+    def _finish_record( self ):
+        record = self._record
+        if record is None:
+            return
+        self._record = None
+        if not record.rows and record.error is None and self._Cursor__description is None:
+            record.rows = max( self._Cursor__rowcount, 0 )
+        self._collector.record( record )
+
+    def _start_record( self, operation, parameters, started, many = False ):
+        record = self._record = StatementRecord( operation, many, parameters )
+        record.rewrite = time.perf_counter() - started
+        self.connection.last_record = record
+        return record
     
     def _create_instance(self, connection):
         return DB2CursorWrapper(connection)
         
-    #Ex: string = 'ababababababababab', sub = 'ab', wanted = 'CD', n = 5
-    #outputs: ababababCDabababab
-    def _replacenth( self, string, sub, wanted, index, need_quote):
-        where = [m.start() for m in re.finditer(sub, string)][index]
-        before = string[:where]
-        after = string[where+2:]
-        newString = before + need_quote + str(wanted) + need_quote + after
-        return newString
-
-    def _format_parameters( self, parameters, operation, return_only_param = False):
-        select_update = False
-        if re.match(r'^(SELECT|UPDATE) ', operation):
-            select_update = True
-
-        new_parameters = []
-        parameters = list( parameters )
-        for index in range( len( parameters ) ):
-            # With raw SQL queries, datetimes can reach this function
-            # without being converted by DateTimeField.get_db_prep_value.
-            if settings.USE_TZ and isinstance( parameters[index], datetime.datetime ):
-                param = parameters[index]
-                if timezone.is_naive( param ):
-                    warnings.warn("Received a naive datetime (%s)"
-                              " while time zone support is active." % param,
-                              RuntimeWarning)
-                    default_timezone = timezone.get_default_timezone()
-                    param = timezone.make_aware( param, default_timezone )
-                param = param.astimezone(timezone.utc).replace(tzinfo=None)
-                parameters[index] = param
-
-            need_quote = ''
-            if (select_update and isinstance(parameters[index], Decimal)):
-                operation = self._replacenth(operation, '%s', parameters[index], len(new_parameters), need_quote)
-            else:
-                new_parameters.append(parameters[index])
+    # With raw SQL queries, datetimes can reach the cursor without being
+    # converted by DateTimeField.get_db_prep_value.
+    def _adapt_parameters( self, parameters ):
+        if not settings.USE_TZ:
+            return parameters
+        return [ self._adapt_datetime_param( param ) if isinstance( param, datetime.datetime ) else param
+                 for param in parameters ]
 
-        if return_only_param:
-            return tuple( new_parameters )
+    def _adapt_datetime_param( self, param ):
+        if timezone.is_naive( param ):
+            warnings.warn("Received a naive datetime (%s)"
+                      " while time zone support is active." % param,
+                      RuntimeWarning)
+            default_timezone = timezone.get_default_timezone()
+            param = timezone.make_aware( param, default_timezone )
+        return param.astimezone(timezone.utc).replace(tzinfo=None)
 
-        return tuple( new_parameters ), operation
+    # Runs the statement through the connection's statement cache, if it has
+    # one: a cached handle is executed with the new parameters, otherwise the
+    # statement is prepared and its handle is cached once the cursor is done with it.
+    def _execute_statement( self, operation, parameters ):
+        record = self._record
+        if record is not None:
+            start = time.perf_counter()
+        try:
+            result = self._run_statement( operation, parameters )
+        except Exception as e:
+            self._check_connection( e )
+            if record is not None:
+                record.execute = time.perf_counter() - start
+                record.error = str( e )
+                self._collector.capture( record )
+            raise
+        self.connection.last_activity = time.monotonic()
+        if record is not None:
+            record.execute = time.perf_counter() - start
+            self._collector.capture( record )
+        return result
 
-    def _resolve_parameters_in_aggregator_func(self, parameters, operation, aggr_list, pattern):
-        op_temp = ""
-        op_temp_wParam = ""
-        p_start = 0
-        res = any(ele in operation for ele in aggr_list)
+    def _run_statement( self, operation, parameters ):
+        self._buffer_rows = None
+        cache = getattr( self.connection, 'statement_cache', None )
+        if cache is None:
+            return super( DB2CursorWrapper, self ).execute( operation, parameters )
+        head = operation.lstrip()[:8].upper()
+        if head.startswith( _UNCACHED_STATEMENTS ):
+            if not head.startswith( _CACHE_NEUTRAL_STATEMENTS ) and not operation.startswith( _STAGED_DECLARE ):
+                cache.invalidate()
+            return super( DB2CursorWrapper, self ).execute( operation, parameters )
 
-        if res:
-            for m in regex.finditer(pattern, operation):
-                end = m.end()
-                p_start = len(op_temp)
-                if end <= p_start:
+        self._release_statement()
+        handle = cache.checkout( operation )
+        if handle is None:
+            self._prepare_helper( operation )
+            handle = self.stmt_handler
+        else:
+            # A handle of a statement run outside the cache is freed the way
+            # ibm_db_dbi frees it before preparing another statement.
+            if self.stmt_handler is not None:
+                try:
+                    Database.ibm_db.free_stmt( self.stmt_handler )
+                except Exception:
+                    pass
+            self.stmt_handler = handle
+        self._statement_lease = ( operation, handle, cache.generation )
+        # Same state reset as ibm_db_dbi.Cursor.execute does before executing.
+        self.messages = []
+        self._Cursor__description = None
+        self._all_stmt_handlers = []
+        self._execute_helper( parameters )
+        self._set_cursor_helper()
+        return self._set_rowcount()
+
+    # Marks the connection unusable when the error says it is gone, so
+    # is_usable() does not need to ask the driver.
+    def _check_connection( self, error ):
+        message = str( error )
+        if any( code in message for code in BROKEN_CONNECTION_ERRORS ):
+            self.connection.broken = True
+
+    # Hands the statement checked out by this cursor back to the statement cache.
+    def _release_statement( self ):
+        lease = self._statement_lease
+        if lease is None:
+            return
+        self._statement_lease = None
+        sql, handle, generation = lease
+        if self.stmt_handler is handle:
+            self.stmt_handler = None
+        try:
+            Database.ibm_db.free_result( handle )
+        except Exception:
+            pass
+        cache = getattr( self.connection, 'statement_cache', None )
+        if cache is not None:
+            cache.checkin( sql, handle, generation )
+
+    # Over-riding this method so a cached statement handle is never freed by
+    # ibm_db_dbi when the cursor prepares another statement.
+    def _prepare_helper( self, operation, parameters = None ):
+        self._release_statement()
+        return super( DB2CursorWrapper, self )._prepare_helper( operation, parameters )
+
+    # Stages the rows of each StagedRows parameter into a declared global
+    # temporary table of this cursor's own, with a DECLARE ... WITH REPLACE and
+    # an array insert on a separate cursor, and returns the parameters with
+    # the tables in their place. A table no other open cursor holds is reused,
+    # so the statement text is the same from one execution to the next.
+    def _stage_parameters( self, parameters ):
+        owners = getattr( self.connection, 'staged_tables', None )
+        if owners is None:
+            owners = self.connection.staged_tables = {}
+        # The notes the compiler left are for the statement, not the staging.
+        notes = take_notes()
+        try:
+            # The statement of the previous execute may be on a table about to
+            # be declared again, it goes back to the cache first.
+            self._release_statement()
+            staged = []
+            for param in parameters:
+                if not isinstance( param, StagedRows ):
+                    staged.append( param )
                     continue
-                prev_str = operation[p_start:end-1]
-                op_temp = op_temp + prev_str
-                op_temp_wParam = op_temp_wParam + prev_str
-                next_str = operation[end-1:]
-                parm_count = op_temp_wParam.count('%s')
-                for item in regex.finditer(r'\((?>[^()]|(?R))*\)', next_str):
-                    start = item.start()
-                    end = item.end()
-                    str_wp = next_str[start:end]
-                    while (str_wp.count('%s') > 0):
-                        if(isinstance(parameters[parm_count], str) and
-                           (parameters[parm_count].find('DATE') != 0) and
-                           (parameters[parm_count].find('TIMESTAMP') != 0)):
-                            need_quote = "\'"
-                        else:
-                            need_quote = ''
-                        str_wp = self._replacenth(str_wp, '%s', parameters[parm_count], 0, need_quote)
-                        parameters = parameters[:parm_count] + parameters[(parm_count+1):]
-                    op_temp_wParam = op_temp_wParam + str_wp
-                    op_temp = op_temp + next_str[start:end]
-                    break
-
-            p_start = len(op_temp)
-            operation = op_temp_wParam + operation[p_start:]
-
-        return parameters, operation
-
-    def _resolve_parameters_in_expression_func(self, parameters, operation):
-        prev_end = 0
-        op_temp_wParam = ""
-        p_start = 0
-
-        if re.search(r'%s\ *\-|\-\ *%s|%s\ *\+|\+\ *%s|\ *THEN\ *%s|\ *\(?%s\)?\ *AS\ *|\ *ELSE\ *%s', operation):
-            for m in re.finditer(r'%s\ *\-|\-\ *%s|%s\ *\+|\+\ *%s|\ *THEN\ *%s|\ *\(?%s\)?\ *AS\ *|\ *ELSE\ *%s', operation):
-                p_start = m.start()
-                op_temp_wParam = op_temp_wParam + operation[prev_end:p_start]
-                parm_count = op_temp_wParam.count('%s')
-                end = m.end()
-                str_wp = operation[p_start:end]
-                if((isinstance(parameters[parm_count], str) and
-                   (parameters[parm_count].find('DATE') != 0) and
-                   (parameters[parm_count].find('TIMESTAMP') != 0)) or
-                    (isinstance(parameters[parm_count], datetime.date))):
-                    need_quote = "\'"
-                else:
-                    need_quote = ''
-                if(isinstance(parameters[parm_count], memoryview)):
-                    replace_string = "BX\'%s\'" % parameters[parm_count].obj.hex()
-                else:
-                    replace_string = parameters[parm_count]
-                str_wp = self._replacenth(str_wp, '%s', replace_string, 0, need_quote)
-                parameters = parameters[:parm_count] + parameters[(parm_count+1):]
-                op_temp_wParam = op_temp_wParam + str_wp
-                prev_end = end
-
-            operation = op_temp_wParam + operation[end:]
-
-        return parameters, operation
-
-    def _rewrite_default_params(self, query: str, params: list):
-        """
-        Replace %s with DEFAULT when a param equals 'DEFAULT'.
-        Returns (query, new_params).
-        """
-        new_params = []
-        parts = query.split("%s")
-        new_query = parts[0]
-    
-        for i, param in enumerate(params):
-            if i < len(parts) - 1:
-                if isinstance(param, str) and param.upper() == "DEFAULT":
-                    # Inline DEFAULT into SQL
-                    new_query += "DEFAULT" + parts[i + 1]
-                else:
-                    # Keep %s placeholder and param
-                    new_query += "%s" + parts[i + 1]
-                    new_params.append(param)
-    
-        return new_query, new_params
-        
+                index = 0
+                while True:
+                    name = '%s_%d' % ( STAGED_TABLE_PREFIX, index )
+                    owner = owners.get( name )
+                    if owner is None or owner() is None:
+                        break
+                    index += 1
+                owners[name] = weakref.ref( self )
+                self._staged_tables.append( name )
+                self._stage_rows( name, param )
+                staged.append( StagedTable( name ) )
+            return staged
+        finally:
+            for kind, choice in notes:
+                note( kind, choice )
+
+    # A table is declared again only when its columns change, otherwise its
+    # rows are deleted. The DECLARE drops the statements on the table from the
+    # statement cache, and only those.
+    def _stage_rows( self, name, param ):
+        columns = ', '.join( 'V%d %s' % ( position + 1, column_type )
+                             for position, column_type in enumerate( param.column_types ) )
+        declared = getattr( self.connection, 'staged_columns', None )
+        if declared is None:
+            declared = self.connection.staged_columns = {}
+        cursor = DB2CursorWrapper( self.connection )
+        try:
+            if declared.get( name ) != columns or not self._empty_staged_table( cursor, name ):
+                declared.pop( name, None )
+                cursor.execute( 'DECLARE GLOBAL TEMPORARY TABLE %s (%s) '
+                                'ON COMMIT PRESERVE ROWS NOT LOGGED WITH REPLACE' % ( name, columns ) )
+                declared[name] = columns
+                cache = getattr( self.connection, 'statement_cache', None )
+                if cache is not None:
+                    cache.invalidate_matching( name )
+            cursor.executemany( 'INSERT INTO %s VALUES (%s)' % ( name, ', '.join( '?' * len( param.column_types ) ) ),
+                                param.rows )
+        finally:
+            cursor.close()
+
+    # Deletes the rows of a table staged before. Returns False if the table is
+    # gone, as it is when the unit of work which declared it was rolled back.
+    def _empty_staged_table( self, cursor, name ):
+        try:
+            cursor.execute( 'DELETE FROM %s' % name )
+        except utils.DatabaseError as e:
+            if '42704' not in str( e ):
+                raise
+            return False
+        return True
+
+    # Gives up the temporary tables of the previous statement. Their rows stay
+    # until the next statement staging into them replaces the table.
+    def _release_staged_tables( self ):
+        if not self._staged_tables:
+            return
+        owners = self.connection.staged_tables
+        for name in self._staged_tables:
+            owner = owners.get( name )
+            if owner is not None and owner() is self:
+                del owners[name]
+        self._staged_tables = []
+
+    def close( self ):
+        if self._collector is not None:
+            self._finish_record()
+        self._release_statement()
+        self._release_staged_tables()
+        return super( DB2CursorWrapper, self ).close()
+
+    # Turns format style SQL and its parameters into the qmark SQL and the
+    # parameters execute() sends to the driver.
+    def rewrite( self, operation, parameters ):
+        if operation.count("db2regexExtraField(%s)") > 0:
+            operation = operation.replace("db2regexExtraField(%s)", "")
+            operation = operation % parameters
+            parameters = ()
+
+        if parameters and "%s" in operation:
+            key = ( operation, _param_signature( parameters ) )
+            plan = rewrite_cache.get( key )
+            if plan is None:
+                plan = RewritePlan( sqltokenizer.tokenize( operation ), key[1] )
+                rewrite_cache.put( key, plan )
+            operation, parameters = plan.apply( self._adapt_parameters( parameters ),
+                                                getattr( self.connection, 'typed_parameter_markers', False ) )
+        return operation, parameters
+
     # Over-riding this method to modify SQLs which contains format parameter to qmark. 
     def execute( self, operation, parameters = () ):
         if( djangoVersion[0:2] >= (2 , 0)):
             operation = str(operation)
+        if self._collector is not None:
+            self._finish_record()
+        self._release_staged_tables()
+        if parameters and any( isinstance( param, StagedRows ) for param in parameters ):
+            parameters = self._stage_parameters( parameters )
+        if self._collector is not None:
+            started = time.perf_counter()
         try:
             if operation == "''":
                 operation = "SELECT NULL FROM SYSIBM.DUAL FETCH FIRST 0 ROW ONLY"
-            if operation.find('ALTER TABLE') == 0 and getattr(self.connection, dbms_name) != 'DB2':
+            if operation.startswith('ALTER TABLE') and not self.connection.dialect.is_zos:
                 doReorg = 1
             else:
                 doReorg = 0
-            if operation.count("db2regexExtraField(%s)") > 0:
-                operation = operation.replace("db2regexExtraField(%s)", "")
-                operation = operation % parameters
-                parameters = ()
-
-            if operation.count( "%s" ) > 0 and parameters:
-                parameters, operation = self._resolve_parameters_in_aggregator_func(parameters, operation, ['COUNT','AVG','MIN','MAX','SUM'], r'(SUM|AVG|COUNT|MIN|MAX)\ *\(')
-                parameters, operation = self._resolve_parameters_in_aggregator_func(parameters, operation, ['COALESCE'], r'(COALESCE)\ *\(')
-                parameters, operation = self._format_parameters( parameters, operation )
-                parameters, operation = self._resolve_parameters_in_expression_func( parameters, operation )
-                if any(isinstance(p, str) and p.upper() == "DEFAULT" for p in parameters):
-                    operation, parameters = self._rewrite_default_params(operation, parameters) 
-                if operation.count( "%s" ) > 0:
-                    operation = operation.replace("%s", "?")
-                
-                if operation.count( "%%" ) > 0:
-                    operation = operation.replace("%%", "%")
+            operation, parameters = self.rewrite( operation, parameters )
+            if self._collector is not None:
+                statement_texts.add( operation )
+                self._start_record( operation, parameters, started )
             
             if ( djangoVersion[0:2] <= ( 1, 1 ) ):
                 if ( doReorg == 1 ):
-                    super( DB2CursorWrapper, self ).execute( operation, parameters )
+                    self._execute_statement( operation, parameters )
                     return self._reorg_tables()
                 else:    
-                    return super( DB2CursorWrapper, self ).execute( operation, parameters )
+                    return self._execute_statement( operation, parameters )
             else:
                 try:
                     if ( doReorg == 1 ):
-                        super( DB2CursorWrapper, self ).execute( operation, parameters )
+                        self._execute_statement( operation, parameters )
                         return self._reorg_tables()
                     else:    
-                        return super( DB2CursorWrapper, self ).execute( operation, parameters )
+                        return self._execute_statement( operation, parameters )
                 except IntegrityError as e:
                     six.reraise(utils.IntegrityError, utils.IntegrityError( *tuple( six.PY3 and e.args or ( e._message, ) ) ), sys.exc_info()[2])
                     raise
@@ -356,20 +1224,24 @@ class DB2CursorWrapper( Database.Cursor ):
         
     # Over-riding this method to modify SQLs which contains format parameter to qmark.
     def executemany( self, operation, seq_parameters ):
+        if self._collector is not None:
+            self._finish_record()
+            started = time.perf_counter()
+        self._release_staged_tables()
         try:
             if operation.count("db2regexExtraField(%s)") > 0:
                  raise ValueError("Regex not supported in this operation")
 
-            return_only_param = True
-            seq_parameters = [ self._format_parameters( parameters, operation, return_only_param) for parameters in seq_parameters ]
             if operation.count( "%s" ) > 0:
                 operation = operation % ( tuple( "?" * operation.count( "%s" ) ) )
+            if self._collector is not None:
+                self._start_record( operation, None, started, many = True )
                 
             if ( djangoVersion[0:2] <= ( 1, 1 ) ):
-                return super( DB2CursorWrapper, self ).executemany( operation, seq_parameters )
+                return self._execute_chunks( operation, seq_parameters )
             else:
                 try:
-                    return super( DB2CursorWrapper, self ).executemany( operation, seq_parameters )
+                    return self._execute_chunks( operation, seq_parameters )
                 except IntegrityError as e:
                     six.reraise(utils.IntegrityError, utils.IntegrityError( *tuple( six.PY3 and e.args or ( e._message, ) ) ), sys.exc_info()[2])
                     raise
@@ -381,6 +1253,77 @@ class DB2CursorWrapper( Database.Cursor ):
         except ( IndexError, TypeError ):
             return None
     
+    # Binds the parameter sets to the prepared statement in chunks of
+    # executemany_chunk_size rows through ibm_db.execute_many, reading them
+    # from seq_parameters as it goes, so any iterable can be passed and only
+    # one chunk is held in memory. With autocommit on, all the chunks are
+    # committed together, or one by one with OPTIONS['EXECUTEMANY_COMMIT_PER_CHUNK'].
+    def _execute_chunks( self, operation, seq_parameters ):
+        if seq_parameters is None:
+            raise InterfaceError( "executemany expects a not None seq_parameters value" )
+        chunk_size = getattr( self.connection, 'executemany_chunk_size', DEFAULT_EXECUTEMANY_CHUNK_SIZE )
+        commit_per_chunk = getattr( self.connection, 'executemany_commit_per_chunk', False )
+        conn_handler = self.conn_handler
+        self.messages = []
+        self._Cursor__description = None
+        self._all_stmt_handlers = []
+        self._Cursor__rowcount = -1
+        self._buffer_rows = None
+        # ( rows, seconds ) of every chunk executed by the last executemany
+        self.chunk_timings = []
+        record = self._record
+        if record is not None:
+            start = time.perf_counter()
+        self._prepare_helper( operation )
+
+        rowcount = 0
+        autocommit = Database.ibm_db.autocommit( conn_handler )
+        if autocommit != 0:
+            Database.ibm_db.autocommit( conn_handler, 0 )
+        try:
+            chunk = []
+            for parameters in seq_parameters:
+                chunk.append( tuple( bytes( param ) if isinstance( param, memoryview ) else param
+                                     for param in self._adapt_parameters( parameters ) ) )
+                if len( chunk ) >= chunk_size:
+                    rowcount += self._execute_chunk( chunk )
+                    chunk = []
+                    if autocommit != 0 and commit_per_chunk:
+                        Database.ibm_db.commit( conn_handler )
+            if chunk:
+                rowcount += self._execute_chunk( chunk )
+            if autocommit != 0:
+                Database.ibm_db.commit( conn_handler )
+        except Exception as inst:
+            self._check_connection( inst )
+            if record is not None:
+                record.execute = time.perf_counter() - start
+                record.error = str( inst )
+                self._collector.capture( record )
+            if autocommit != 0:
+                Database.ibm_db.rollback( conn_handler )
+            if isinstance( inst, ( Error, TypeError, IndexError ) ):
+                raise
+            raise Database._get_exception( inst )
+        finally:
+            if autocommit != 0:
+                Database.ibm_db.autocommit( conn_handler, autocommit )
+        self._Cursor__rowcount = rowcount
+        self.connection.last_activity = time.monotonic()
+        if record is not None:
+            record.execute = time.perf_counter() - start
+            self._collector.capture( record )
+        return True
+
+    def _execute_chunk( self, chunk ):
+        start = time.perf_counter()
+        rowcount = Database.ibm_db.execute_many( self.stmt_handler, tuple( chunk ) )
+        self.chunk_timings.append( ( len( chunk ), time.perf_counter() - start ) )
+        if rowcount is None or rowcount == -1:
+            message = Database.ibm_db.stmt_errormsg() or Database.ibm_db.conn_errormsg()
+            raise Database._get_exception( Exception( message ) )
+        return rowcount
+
     # table reorganization method
     def _reorg_tables( self ):
         checkReorgSQL = "select TABSCHEMA, TABNAME from SYSIBMADM.ADMINTABINFO where REORG_PENDING = 'Y'"
@@ -400,43 +1343,41 @@ class DB2CursorWrapper( Database.Cursor ):
     
     # Over-riding this method to modify result set containing datetime and time zone support is active
     def fetchone( self ):
-        row = super( DB2CursorWrapper, self ).fetchone()
-        if row is None:
-            return row
-        else:
-            return self._fix_return_data( row )
+        if self._buffer_rows is not None:
+            rows = self._take_buffered( 1 )
+            if rows:
+                return rows[0]
+        return self._fetch( True, super( DB2CursorWrapper, self ).fetchone )
     
     # Over-riding this method to modify result set containing datetime and time zone support is active
     def fetchmany( self, size=0 ):
-        rows = super( DB2CursorWrapper, self ).fetchmany( size )
-        if rows is None:
-            return rows
-        else:
-            return [self._fix_return_data( row ) for row in rows]
+        if self._buffer_rows is not None and isinstance( size, int ) and size >= 0:
+            size = size or self.arraysize
+            rows = self._take_buffered( size )
+            if rows:
+                if len( rows ) < size:
+                    rows.extend( self._fetch_rows( size - len( rows ) ) )
+                return rows
+        return self._fetch_rows( size )
     
     # Over-riding this method to modify result set containing datetime and time zone support is active
     def fetchall( self ):
-        rows = super( DB2CursorWrapper, self ).fetchall()
+        buffered = self._take_buffered() if self._buffer_rows is not None else None
+        rows = self._fetch( False, super( DB2CursorWrapper, self ).fetchall )
         if rows is None:
             return rows
-        else:
-            return [self._fix_return_data( row ) for row in rows]
+        if buffered:
+            return buffered + list( rows )
+        return rows
         
-    # This method to modify result set containing datetime and time zone support is active   
-    def _fix_return_data( self, row ):
-        row = list( row )
-        index = -1
-        if ( djangoVersion[0:2] >= ( 1, 4 ) ):
-            for value, desc in zip( row, self.description ):
-                index = index + 1
-                if ( desc[1] == Database.DATETIME ):
-                    if settings.USE_TZ and value is not None and timezone.is_naive( value ):
-                        if ( djangoVersion[0:2] >= (5, 0 ) ):
-                            value = value.replace( tzinfo=datetime.timezone.utc )
-                        else:
-                            value = value.replace( tzinfo=timezone.utc )
-                        row[index] = value
-                elif ( djangoVersion[0:2] >= (1, 5 ) ):
-                    if isinstance(value, six.string_types):
-                        row[index] = re.sub(r'[\x00]', '', value)
-        return tuple( row )
+    # The plan is built on the first fetch of a result set and kept for as long
+    # as the cursor description (rebuilt by ibm_db_dbi for every execute) is the same.
+    def _conversion_plan( self ):
+        description = self.description
+        use_tz = settings.USE_TZ
+        cached = self._conversion
+        if cached is not None and cached[0] is description and cached[1] == use_tz:
+            return cached[2]
+        plan = ConversionPlan( description, use_tz )
+        self._conversion = ( description, use_tz, plan )
+        return plan
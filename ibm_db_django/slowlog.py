@@ -0,0 +1,192 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+"""
+Slow query log, enabled with OPTIONS['SLOW_QUERY_LOG'] = { 'THRESHOLD': 0.5, ... }.
+It is an instrumentation collector: statements which took longer than the
+threshold (execute, fetch and conversion together) are kept in a ring buffer
+and, with a PATH, appended to a rotating JSON lines file. With EXPLAIN the
+access plan of the statement is captured on a separate connection by a
+background thread, so the slow request is not delayed any further.
+"""
+
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import traceback
+from collections import deque
+
+from ibm_db_django.instrumentation import Collector
+from ibm_db_django import explain
+
+DEFAULTS = {
+    'THRESHOLD': 1.0,
+    'BUFFER_SIZE': 100,
+    'PATH': None,
+    'MAX_BYTES': 10 * 1024 * 1024,
+    'BACKUP_COUNT': 5,
+    'STACK_DEPTH': 8,
+    'EXPLAIN': False,
+}
+
+# Statements EXPLAIN accepts.
+EXPLAINABLE = ( 'SELECT', 'WITH', 'VALUES', 'INSERT', 'UPDATE', 'DELETE', 'MERGE' )
+
+# Frames of these packages are left out of the recorded caller stack.
+_INTERNAL_PATHS = tuple( os.path.dirname( __import__( name ).__file__ ) + os.sep
+                         for name in ( 'django', 'ibm_db_django' ) )
+
+def _caller_stack( depth ):
+    frames = [frame for frame in traceback.extract_stack()[:-1]
+              if not frame.filename.startswith( _INTERNAL_PATHS )]
+    return ['%s:%d in %s' % ( frame.filename, frame.lineno, frame.name ) for frame in frames[-depth:]]
+
+class SlowQueryLog( Collector ):
+    """
+    Entries are dictionaries with the time the statement started, its final
+    SQL and fingerprint, the Python types of its parameters, its phase timings
+    in seconds, rows, LOB bytes, error and caller stack, and with EXPLAIN the
+    plan summary (total cost, table and index scans and the indexes used) or
+    the error raised by the explain.
+    """
+
+    def __init__( self, alias, threshold = 1.0, buffer_size = 100, path = None, max_bytes = 10 * 1024 * 1024,
+                  backup_count = 5, stack_depth = 8, explain = False, explain_schema = None ):
+        self.alias = alias
+        self.threshold = threshold
+        self.stack_depth = stack_depth
+        self.explain = explain
+        self.explain_schema = explain_schema
+        self._entries = deque( maxlen = buffer_size )
+        self._lock = threading.Lock()
+        self._logger = None
+        if path is not None:
+            handler = logging.handlers.RotatingFileHandler( path, maxBytes = max_bytes, backupCount = backup_count )
+            handler.setFormatter( logging.Formatter( '%(message)s' ) )
+            self._logger = logging.getLogger( 'ibm_db_django.slow_queries.%s' % alias )
+            self._logger.propagate = False
+            self._logger.setLevel( logging.INFO )
+            self._logger.addHandler( handler )
+        self._pending = deque()
+        self._pending_ready = threading.Condition( self._lock )
+        self._explainer = None
+        self._side_connection = None
+
+    # The caller stack is taken while the statement runs, as soon as it has
+    # taken longer than the threshold.
+    def capture( self, record ):
+        if record.stack is None and record.elapsed >= self.threshold:
+            record.stack = _caller_stack( self.stack_depth )
+
+    def record( self, record ):
+        if record.elapsed < self.threshold:
+            return
+        entry = record.as_dict()
+        entry['started'] = datetime.datetime.fromtimestamp( record.started ).isoformat()
+        entry['elapsed'] = record.elapsed
+        entry['parameter_types'] = None if record.parameters is None else \
+            [type( value ).__name__ for value in record.parameters]
+        entry['stack'] = record.stack or []
+        with self._lock:
+            self._entries.append( entry )
+            if self.explain and record.sql.lstrip()[:6].upper().startswith( EXPLAINABLE ):
+                self._pending.append( entry )
+                self._pending_ready.notify()
+                if self._explainer is None:
+                    self._explainer = threading.Thread( target = self._explain_pending,
+                                                        name = 'ibm_db_django-explain-%s' % self.alias )
+                    self._explainer.daemon = True
+                    self._explainer.start()
+                return
+        self._write( entry )
+
+    def entries( self ):
+        with self._lock:
+            return list( self._entries )
+
+    def clear( self ):
+        with self._lock:
+            self._entries.clear()
+
+    def _write( self, entry ):
+        if self._logger is not None:
+            self._logger.info( json.dumps( entry, default = str ) )
+
+    def _explain_pending( self ):
+        while True:
+            with self._lock:
+                while not self._pending:
+                    self._pending_ready.wait()
+                entry = self._pending.popleft()
+            cursor = None
+            try:
+                cursor = self._cursor()
+                plan = explain.explain( cursor, entry['sql'], self.explain_schema )
+                entry['plan'] = plan.summary() if plan is not None else None
+            except Exception as e:
+                entry['explain_error'] = str( e )
+                if self._side_connection is not None and not self._side_connection.is_usable():
+                    self._close_side_connection()
+            finally:
+                if cursor is not None:
+                    try:
+                        cursor.close()
+                    except Exception:
+                        pass
+            self._write( entry )
+
+    # Cursor of the side connection, which is opened on the first explain and
+    # whose statements are not recorded.
+    def _cursor( self ):
+        if self._side_connection is None:
+            from django.db import connections
+            wrapper = connections.create_connection( self.alias )
+            wrapper.ensure_connection()
+            wrapper.connection.collector = None
+            self._side_connection = wrapper
+        return self._side_connection.create_cursor()
+
+    def _close_side_connection( self ):
+        wrapper = self._side_connection
+        self._side_connection = None
+        if wrapper is not None:
+            try:
+                wrapper.close()
+            except Exception:
+                pass
+
+# Process wide slow query logs, keyed by database alias.
+logs = {}
+_lock = threading.Lock()
+
+# Returns the slow query log of the alias, created from OPTIONS['SLOW_QUERY_LOG']
+# (True for the defaults, or a dictionary of settings) on the first connect.
+# Plans are read from the explain tables in explain_schema (OPTIONS['EXPLAIN_SCHEMA']).
+def log_for( alias, options, explain_schema = None ):
+    log = logs.get( alias )
+    if log is None:
+        with _lock:
+            log = logs.get( alias )
+            if log is None:
+                settings = dict( DEFAULTS, EXPLAIN_SCHEMA = explain_schema )
+                if isinstance( options, dict ):
+                    settings.update( options )
+                log = logs[alias] = SlowQueryLog( alias, **dict( ( key.lower(), value ) for key, value in settings.items() ) )
+    return log
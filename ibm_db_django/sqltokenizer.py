@@ -0,0 +1,146 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+"""
+Single pass scanner for the format style (%s) SQL handed to DB2CursorWrapper.
+The statement is scanned once and split on its parameter markers. For every
+marker the scanner records the context the rewrite in pybase cares about:
+whether it sits inside an aggregate or COALESCE call, whether it is an
+operand of +/-, follows THEN/ELSE or is aliased with AS, and whether it is
+the operand of a CAST( ... AS <type>).
+"""
+
+import re
+
+# Context flags recorded for each parameter marker.
+IN_AGGREGATE = 1
+IN_COALESCE = 2
+IN_EXPRESSION = 4
+IN_CAST = 8
+
+AGGREGATE_FUNCTIONS = frozenset( ( 'SUM', 'AVG', 'COUNT', 'MIN', 'MAX' ) )
+
+_TOKEN = re.compile( r"%[%s]|['\"]|\w+|[^\s\w]" )
+
+class TokenizedSQL( object ):
+    """
+    Result of tokenize(). segments holds the SQL text around the markers
+    (with %% already turned into %), so there is always one more segment
+    than there are markers. flags holds the context flags of each marker.
+    """
+    __slots__ = ( 'segments', 'flags' )
+
+    def __init__( self, segments, flags ):
+        self.segments = segments
+        self.flags = flags
+
+    def __len__( self ):
+        return len( self.flags )
+
+def tokenize( operation ):
+    segments = []
+    flags = []
+    chunks = []
+    chunk_start = 0
+    quote = None
+    # Stack of context flags for the open parentheses and the number of open
+    # aggregate/COALESCE calls, so the context of a marker is known in O(1).
+    parens = []
+    aggregate_depth = 0
+    coalesce_depth = 0
+    # Previous significant token outside of quotes, and the marker waiting
+    # for its right hand side token to be seen.
+    previous = None
+    pending = None
+    pending_paren = False
+    pending_cast = False
+
+    for match in _TOKEN.finditer( operation ):
+        token = match.group()
+        start = match.start()
+
+        if token == '%%':
+            chunks.append( operation[chunk_start:start + 1] )
+            chunk_start = start + 2
+            continue
+
+        if token == '%s':
+            chunks.append( operation[chunk_start:start] )
+            segments.append( ''.join( chunks ) )
+            chunks = []
+            chunk_start = start + 2
+            context = 0
+            if aggregate_depth:
+                context |= IN_AGGREGATE
+            if coalesce_depth:
+                context |= IN_COALESCE
+            if quote is None:
+                if previous in ( '-', '+', 'THEN', 'ELSE' ):
+                    context |= IN_EXPRESSION
+                pending = len( flags )
+                pending_paren = False
+                pending_cast = previous == '(' and bool( parens ) and parens[-1] == IN_CAST
+                previous = token
+            flags.append( context )
+            continue
+
+        if quote is not None:
+            if token == quote:
+                quote = None
+            continue
+
+        if pending is not None:
+            if pending_cast and token == 'AS':
+                flags[pending] |= IN_CAST
+                pending = None
+            elif token in ( '-', '+' ) or token.startswith( 'AS' ):
+                flags[pending] |= IN_EXPRESSION
+                pending = None
+            elif token == ')' and not pending_paren:
+                pending_paren = True
+            else:
+                pending = None
+
+        if token == "'" or token == '"':
+            quote = token
+            previous = token
+        elif token == '(':
+            if previous in AGGREGATE_FUNCTIONS:
+                parens.append( IN_AGGREGATE )
+                aggregate_depth += 1
+            elif previous == 'COALESCE':
+                parens.append( IN_COALESCE )
+                coalesce_depth += 1
+            elif previous == 'CAST':
+                parens.append( IN_CAST )
+            else:
+                parens.append( 0 )
+            previous = token
+        elif token == ')':
+            if parens:
+                context = parens.pop()
+                if context == IN_AGGREGATE:
+                    aggregate_depth -= 1
+                elif context == IN_COALESCE:
+                    coalesce_depth -= 1
+            previous = token
+        else:
+            previous = token
+
+    chunks.append( operation[chunk_start:] )
+    segments.append( ''.join( chunks ) )
+    return TokenizedSQL( segments, flags )
@@ -0,0 +1,1236 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+"""
+Stand-in for the ibm_db extension module, running statements on SQLite, so the
+backend can be exercised and benchmarked on a machine without a Db2 server.
+It is enabled with IBM_DB_DJANGO_STANDIN = True in the Django settings, or a
+dictionary with the DBMS_NAME and DBMS_VER the server reports (by default
+'DB2/LINUXX8664' and '11.05.0900'). The ibm_db_dbi module of the ibm_db
+package is then loaded on top of the stand-in, so ibm_db_dbi, DB2CursorWrapper,
+the compilers and the introspection run unchanged; only the C driver and the
+server are replaced.
+
+Statements are translated to SQLite: FETCH FIRST/OFFSET ROWS, SYSIBM.SYSDUMMY1,
+the CURRENT special registers, SELECT FROM FINAL TABLE (INSERT ...), identity
+columns, savepoints and the common date functions. Foreign keys added with ALTER
+TABLE are recorded for introspection but not enforced. Queries of the catalog
+(SYSCAT, SYSIBM, SYSIBMADM, ...) return no rows unless a canned result has been
+registered for them with add_response(). The MERGE of bulk_create() and
+bulk_update() runs as an INSERT ... ON CONFLICT or an UPDATE ... FROM. ALTER
+COLUMN and the other DDL SQLite has no equivalent for fail as they would on a
+server without them.
+
+The database is NAME of the settings: a file when it contains a path separator
+or ends with .db, .sqlite or .sqlite3, otherwise an in-memory database shared
+by the connections of the process, kept until it is dropped.
+"""
+
+import datetime
+import decimal
+import functools
+import importlib.util
+import os
+import re
+import sqlite3
+import sys
+import threading
+import types
+
+__version__ = '3.3.0'
+
+DEFAULT_DBMS_NAME = 'DB2/LINUXX8664'
+DEFAULT_DBMS_VER = '11.05.0900'
+
+# Constants of ibm_db used by ibm_db_dbi, with the values of the driver.
+CONSTANTS = {
+    'ATTR_CASE': 3271982,
+    'CASE_NATURAL': 0,
+    'CASE_LOWER': 1,
+    'CASE_UPPER': 2,
+    'SQL_ATTR_AUTOCOMMIT': 102,
+    'SQL_ATTR_CURRENT_SCHEMA': 1254,
+    'SQL_ATTR_CURSOR_TYPE': 6,
+    'SQL_ATTR_TXN_ISOLATION': 108,
+    'SQL_AUTOCOMMIT_OFF': 0,
+    'SQL_AUTOCOMMIT_ON': 1,
+    'SQL_CURSOR_FORWARD_ONLY': 0,
+    'SQL_DBMS_NAME': 17,
+    'SQL_DBMS_VER': 18,
+    'SQL_FALSE': 0,
+    'SQL_TRUE': 1,
+    'SQL_TABLE_STAT': 0,
+    'SQL_INDEX_CLUSTERED': 1,
+    'SQL_INDEX_OTHER': 3,
+    'SQL_TXN_READ_UNCOMMITTED': 1,
+    'SQL_TXN_READ_COMMITTED': 2,
+    'SQL_TXN_REPEATABLE_READ': 4,
+    'SQL_TXN_SERIALIZABLE': 8,
+    'SQL_TXN_NO_COMMIT': 32,
+    'SQL_PARAM_INPUT': 1,
+    'SQL_PARAM_INPUT_OUTPUT': 2,
+    'SQL_PARAM_OUTPUT': 4,
+    'SQL_CHAR': 1,
+    'SQL_DECIMAL': 3,
+    'SQL_INTEGER': 4,
+    'SQL_SMALLINT': 5,
+    'SQL_REAL': 7,
+    'SQL_DOUBLE': 8,
+    'SQL_VARCHAR': 12,
+    'SQL_BOOLEAN': 16,
+    'SQL_TYPE_DATE': 91,
+    'SQL_TYPE_TIME': 92,
+    'SQL_TYPE_TIMESTAMP': 93,
+    'SQL_BIGINT': -5,
+    'SQL_BLOB': -98,
+    'SQL_CLOB': -99,
+    'SQL_XML': -370,
+    'USE_WCHAR': 100,
+    'WCHAR_NO': 0,
+    'WCHAR_YES': 1,
+}
+globals().update( CONSTANTS )
+
+# Leading words of declared column types and the ibm_db field_type() and ODBC
+# type of the columns declared with them.
+_TYPES = (
+    ( ( 'SMALLINT', ), 'int', SQL_SMALLINT ),
+    ( ( 'BIGINT', ), 'bigint', SQL_BIGINT ),
+    ( ( 'INTEGER', 'INT' ), 'int', SQL_INTEGER ),
+    ( ( 'DECFLOAT', ), 'decfloat', SQL_DOUBLE ),
+    ( ( 'DECIMAL', 'DEC', 'NUMERIC', 'NUM' ), 'decimal', SQL_DECIMAL ),
+    ( ( 'DOUBLE', 'FLOAT' ), 'double', SQL_DOUBLE ),
+    ( ( 'REAL', ), 'real', SQL_REAL ),
+    ( ( 'CLOB', 'DBCLOB', 'TEXT' ), 'clob', SQL_CLOB ),
+    ( ( 'BLOB', 'VARBINARY', 'BINARY' ), 'blob', SQL_BLOB ),
+    ( ( 'TIMESTAMP', ), 'timestamp', SQL_TYPE_TIMESTAMP ),
+    ( ( 'DATE', ), 'date', SQL_TYPE_DATE ),
+    ( ( 'TIME', ), 'time', SQL_TYPE_TIME ),
+    ( ( 'BOOLEAN', ), 'boolean', SQL_BOOLEAN ),
+    ( ( 'XML', ), 'xml', SQL_XML ),
+)
+_LEADING_WORD = re.compile( r'\s*([A-Za-z]+)' )
+_LENGTH = re.compile( r'\(\s*(\d+)\s*(?:,\s*(\d+)\s*)?\)' )
+
+class ColumnType( object ):
+    """
+    Type of a result or table column: the ibm_db field_type() name, the ODBC
+    type, the length or precision and scale of the declaration, whether the
+    column is nullable, and the function turning the values SQLite returns
+    into those the driver returns, if they differ.
+    """
+    __slots__ = ( 'name', 'type_name', 'sql_type', 'size', 'scale', 'nullable', 'convert' )
+
+    def __init__( self, name, type_name, sql_type, size = 0, scale = 0, nullable = True ):
+        self.name = name
+        self.type_name = type_name
+        self.sql_type = sql_type
+        self.size = size
+        self.scale = scale
+        self.nullable = nullable
+        self.convert = _CONVERTERS.get( name )
+
+def _column_type( declared, nullable = True ):
+    declared = ( declared or '' ).upper()
+    match = _LEADING_WORD.match( declared )
+    word = match.group( 1 ) if match else ''
+    length = _LENGTH.search( declared )
+    size = int( length.group( 1 ) ) if length else 0
+    scale = int( length.group( 2 ) ) if length and length.group( 2 ) else 0
+    for words, name, sql_type in _TYPES:
+        if word in words:
+            return ColumnType( name, word, sql_type, size, scale, nullable )
+    if word in ( 'CHAR', 'CHARACTER', 'GRAPHIC' ):
+        return ColumnType( 'string', word, SQL_CHAR, size, scale, nullable )
+    return ColumnType( 'string', word or 'VARCHAR', SQL_VARCHAR, size, scale, nullable )
+
+# Type of a column without a declaration (an expression), from its first value.
+def _value_type( value ):
+    if isinstance( value, int ):
+        return _column_type( 'INTEGER' if -2 ** 31 <= value < 2 ** 31 else 'BIGINT' )
+    if isinstance( value, float ):
+        return _column_type( 'DOUBLE' )
+    if isinstance( value, bytes ):
+        return _column_type( 'BLOB' )
+    return _column_type( 'VARCHAR' )
+
+def _to_text( value ):
+    return value if isinstance( value, str ) else str( value )
+
+def _to_date( value ):
+    return datetime.date.fromisoformat( value[:10] ) if isinstance( value, str ) else value
+
+def _to_time( value ):
+    return datetime.time.fromisoformat( value ) if isinstance( value, str ) else value
+
+def _to_timestamp( value ):
+    if not isinstance( value, str ):
+        return value
+    if len( value ) == 10:
+        return datetime.datetime.fromisoformat( value )
+    # Db2 separates the time with a dot, SQLite with a space.
+    if len( value ) > 10 and value[10] == '-':
+        value = '%s %s' % ( value[:10], value[11:].replace( '.', ':', 2 ) )
+    return datetime.datetime.fromisoformat( value )
+
+# The driver returns DECIMAL values as strings, ibm_db_dbi makes Decimals of them.
+def _to_decimal( value ):
+    return value if isinstance( value, str ) else repr( value )
+
+def _to_bool( value ):
+    return bool( value ) if isinstance( value, int ) else value
+
+_CONVERTERS = {
+    'date': _to_date,
+    'time': _to_time,
+    'timestamp': _to_timestamp,
+    'decimal': _to_decimal,
+    'boolean': _to_bool,
+    'string': _to_text,
+    'clob': _to_text,
+}
+
+_TEMPORAL_STRING = re.compile( r"^(?:DATE|TIME|TIMESTAMP)\('(.*)'\)$" )
+
+# Parameters are bound the way the driver sends them to the server. Strings
+# are cast by the server to the type of the column, DatabaseOperations binds
+# dates and datetimes as DATE('...') and TIMESTAMP('...') strings.
+def _adapt( value ):
+    if isinstance( value, str ):
+        if value[:4] in ( 'DATE', 'TIME' ):
+            match = _TEMPORAL_STRING.match( value )
+            if match:
+                return match.group( 1 )
+        return value
+    if isinstance( value, datetime.datetime ):
+        return value.replace( tzinfo = None ).isoformat( ' ' )
+    if isinstance( value, ( datetime.date, datetime.time ) ):
+        return value.isoformat()
+    if isinstance( value, decimal.Decimal ):
+        return str( value )
+    if isinstance( value, bool ):
+        return int( value )
+    if isinstance( value, ( memoryview, bytearray ) ):
+        return bytes( value )
+    return value
+
+def _adapt_all( parameters ):
+    return tuple( _adapt( value ) for value in parameters )
+
+# Messages are written like those of the CLI driver, so ibm_db_dbi and the
+# backend map them on the same exceptions through SQLSTATE and SQLCODE.
+_ERRORS = (
+    ( 'UNIQUE constraint failed', -803, '23505' ),
+    ( 'NOT NULL constraint failed', -407, '23502' ),
+    ( 'FOREIGN KEY constraint failed', -530, '23503' ),
+    ( 'CHECK constraint failed', -545, '23513' ),
+    ( 'no such table', -204, '42704' ),
+    ( 'no such column', -206, '42703' ),
+    ( 'no such function', -440, '42884' ),
+    ( 'already exists', -601, '42710' ),
+    ( 'is locked', -911, '40001' ),
+    ( 'syntax error', -104, '42601' ),
+    ( 'incomplete input', -104, '42601' ),
+    ( 'Incorrect number of bindings', -313, '07004' ),
+    ( 'Error binding parameter', -301, '07006' ),
+)
+
+_state = threading.local()
+
+def _error( prefix, message, sqlcode, sqlstate ):
+    text = '%s[IBM][CLI Driver][%s] SQL%04dN  %s  SQLSTATE=%s SQLCODE=%d' % (
+        prefix, DEFAULT_DBMS_NAME, abs( sqlcode ), message, sqlstate, sqlcode )
+    _state.error = ( text, sqlstate, sqlcode )
+    # The driver raises plain Exceptions, which ibm_db_dbi maps on its own.
+    return Exception( text )
+
+def _sqlite_error( prefix, error ):
+    message = str( error )
+    for text, sqlcode, sqlstate in _ERRORS:
+        if text in message:
+            return _error( prefix, message, sqlcode, sqlstate )
+    if isinstance( error, sqlite3.IntegrityError ):
+        return _error( prefix, message, -803, '23505' )
+    if isinstance( error, sqlite3.ProgrammingError ):
+        return _error( prefix, message, -104, '42601' )
+    return _error( prefix, message, -901, '58004' )
+
+# Canned results of statements SQLite cannot run, as ( regex, columns, rows ).
+responses = []
+
+# Statements matching pattern (a regular expression searched for in the SQL,
+# case insensitive) return rows, tuples of the values of columns, which are
+# names or ( name, declared type ) pairs.
+def add_response( pattern, columns, rows = () ):
+    columns = tuple( ( column, 'VARCHAR' ) if isinstance( column, str ) else tuple( column ) for column in columns )
+    responses.insert( 0, ( re.compile( pattern, re.I | re.S ), columns, tuple( tuple( row ) for row in rows ) ) )
+
+def clear_responses():
+    del responses[:]
+
+def _canned( sql ):
+    for pattern, columns, rows in responses:
+        if pattern.search( sql ):
+            return columns, rows
+    return None
+
+# ---------------------------------------------------------------------------
+# Db2 to SQLite translation
+# ---------------------------------------------------------------------------
+
+_FLAGS = re.I | re.S
+_REWRITES = tuple( ( re.compile( pattern, _FLAGS ), replacement ) for pattern, replacement in (
+    ( r'\bOFFSET\s+(\d+)\s+ROWS?\s+FETCH\s+(?:FIRST|NEXT)\s+(\d+)\s+ROWS?\s+ONLY\b', r'LIMIT \2 OFFSET \1' ),
+    ( r'\bFETCH\s+(?:FIRST|NEXT)\s+(\d+)\s+ROWS?\s+ONLY\b', r'LIMIT \1' ),
+    ( r'\bFETCH\s+(?:FIRST|NEXT)\s+ROWS?\s+ONLY\b', r'LIMIT 1' ),
+    ( r'\bOFFSET\s+(\d+)\s+ROWS?\b', r'LIMIT -1 OFFSET \1' ),
+    ( r'\bOPTIMIZE\s+FOR\s+\d+\s+ROWS?\b', '' ),
+    ( r'\bFOR\s+(?:READ|FETCH)\s+ONLY\b', '' ),
+    ( r'\bFOR\s+UPDATE(?:\s+OF\s+[\w"., ]+?)?(?=\s*(?:WITH\s|SKIP\s|$|\)))', '' ),
+    ( r'\bSKIP\s+LOCKED\s+DATA\b', '' ),
+    ( r'\bWITH\s+(?:UR|CS|RS|RR)\s*(?:USE\s+AND\s+KEEP\s+\w+\s+LOCKS\s*)?(?=;?\s*$)', '' ),
+    ( r'\bSYSIBM\s*\.\s*(?:SYSDUMMY1|DUAL)\b', '(SELECT 1)' ),
+    ( r'\bCURRENT[ _]TIMESTAMP\b(?:\s*\(\s*\d+\s*\))?', 'CURRENT_TIMESTAMP' ),
+    ( r'\bCURRENT[ _]DATE\b', 'CURRENT_DATE' ),
+    ( r'\bCURRENT[ _]TIME\b', 'CURRENT_TIME' ),
+    ( r'\bCURRENT[ _]SCHEMA\b', 'CURRENT_SCHEMA()' ),
+    ( r'\bCURRENT\s+SQLID\b', 'CURRENT_SCHEMA()' ),
+    ( r'\bIDENTITY_VAL_LOCAL\s*\(\s*\)', 'last_insert_rowid()' ),
+    # Values cast to a datetime type stay text, as they are stored.
+    ( r'\bAS\s+(?:TIMESTAMP|DATE|TIME)\s*(?:\(\s*\d+\s*\))?\s*\)', 'AS TEXT)' ),
+    ( r'\bSAVEPOINT\s+("?\w+"?)\s+ON\s+ROLLBACK\s+RETAIN\s+(?:CURSORS|LOCKS)(?:\s+ON\s+ROLLBACK\s+RETAIN\s+\w+)?', r'SAVEPOINT \1' ),
+    ( r'\bRELEASE\s+TO\s+SAVEPOINT\b', 'RELEASE SAVEPOINT' ),
+    ( r'\bORGANIZE\s+BY\s+(?:ROW|COLUMN)\b', '' ),
+    # Declared temporary tables live in the temp schema of the connection.
+    ( r'\bSESSION\s*\.\s*', 'temp.' ),
+    # The JSON array of SQLCompiler.handle_large_in, unnested by json_each.
+    ( r"\bJSON_TABLE\s*\(\s*CAST\s*\(\s*\?\s+AS\s+CLOB\s*\)\s+FORMAT\s+JSON\s*,\s*'\$\[\*\]'\s+COLUMNS\s*\(\s*(\w+)\s+.*?\s+PATH\s+'\$'\s*\)"
+      r"\s+ERROR\s+ON\s+ERROR\s*\)",
+      r'(SELECT value AS \1 FROM json_each(?))' ),
+    # Identity columns become the rowid of the table.
+    ( r'\b(?:SMALLINT|INTEGER|INT|BIGINT)((?:\s+NOT\s+NULL)?)\s+GENERATED\s+(?:BY\s+DEFAULT|ALWAYS)\s+AS\s+IDENTITY\s*(?:\([^)]*\))?',
+      r'INTEGER\1' ),
+    ( r'\bGENERATED\s+(?:BY\s+DEFAULT|ALWAYS)\s+AS\s+IDENTITY\s*(?:\([^)]*\))?', '' ),
+) )
+
+_FINAL_TABLE = re.compile( r'^\s*SELECT\s+(.*?)\s+FROM\s+(?:FINAL|NEW)\s+TABLE\s*\((.*)\)\s*(?:ORDER\s+BY\s+INPUT\s+SEQUENCE)?\s*;?\s*$', _FLAGS )
+# The MERGE of DatabaseOperations.merge_sql(), for bulk_create() with
+# ignore_conflicts or update_conflicts.
+_MERGE = re.compile( r'^\s*MERGE\s+INTO\s+(\S+)\s+AS\s+T\s+USING\s+\((VALUES\s.*)\)\s+AS\s+S\s*\(([^)]*)\)\s+ON\s+(.*?)'
+                     r'(?:\s+WHEN\s+MATCHED\s+THEN\s+UPDATE\s+SET\s+(.*?))?'
+                     r'(?:\s+WHEN\s+NOT\s+MATCHED\s+THEN\s+INSERT\s*\(([^)]*)\)\s+VALUES\s*\([^)]*\))?\s*$', _FLAGS )
+_RENAME_TABLE = re.compile( r'^\s*RENAME\s+(?:TABLE\s+)?(\S+)\s+TO\s+(\S+)\s*$', _FLAGS )
+_TRUNCATE = re.compile( r'^\s*TRUNCATE\s+(?:TABLE\s+)?(\S+).*$', _FLAGS )
+_ADD_FOREIGN_KEY = re.compile( r'^\s*ALTER\s+TABLE\s+(\S+)\s+ADD\s+(?:CONSTRAINT\s+(\S+)\s+)?FOREIGN\s+KEY\s*\(([^)]*)\)\s*'
+                               r'REFERENCES\s+(\S+?)\s*\(([^)]*)\).*$', _FLAGS )
+_ADD_UNIQUE = re.compile( r'^\s*ALTER\s+TABLE\s+(\S+)\s+ADD\s+(?:CONSTRAINT\s+(\S+)\s+)?UNIQUE\s*\(([^)]*)\)\s*$', _FLAGS )
+_DROP_CONSTRAINT = re.compile( r'^\s*ALTER\s+TABLE\s+(\S+)\s+DROP\s+(?:CONSTRAINT|FOREIGN\s+KEY|UNIQUE)\s+(\S+)\s*$', _FLAGS )
+# Statements accepted and ignored: their effect is on storage, locking,
+# statistics or enforcement, none of which the stand-in has.
+_IGNORED = re.compile( r'^\s*(?:CALL\s+SYSPROC\.|LOCK\s+TABLE\b|SET\s+INTEGRITY\b|COMMENT\s+ON\b|RUNSTATS\b|REORG\b|'
+                       r'SET\s+(?:CURRENT\s+)?(?:SCHEMA|PATH|ISOLATION|LOCK\s+TIMEOUT|DEGREE|QUERY\s+OPTIMIZATION)\b|'
+                       r'ALTER\s+TABLE\s+\S+\s+(?:ADD\s+(?:CONSTRAINT\s+\S+\s+)?(?:PRIMARY\s+KEY|CHECK)\b|'
+                       r'ALTER\s+(?:FOREIGN\s+KEY|CHECK)\b|DROP\s+(?:PRIMARY\s+KEY|CHECK)\b|'
+                       r'(?:ALTER\s+COLUMN\s+\S+\s+)?(?:DROP\s+IDENTITY|VOLATILE|NOT\s+VOLATILE|APPEND|PCTFREE)\b|'
+                       r'ALTER\s+COLUMN\s+\S+\s+(?:DROP|SET)\s+(?:DEFAULT|NOT\s+NULL)\b))', _FLAGS )
+_DECLARE_TEMPORARY = re.compile( r'^\s*DECLARE\s+GLOBAL\s+TEMPORARY\s+TABLE\s+(?:SESSION\s*\.\s*)?(\S+)\s*(\(.*\))'
+                                 r'((?:\s+(?:ON\s+COMMIT\s+(?:DELETE|PRESERVE)\s+ROWS|NOT\s+LOGGED(?:\s+ON\s+ROLLBACK\s+\w+\s+ROWS)?|'
+                                 r'LOGGED|WITH\s+REPLACE|IN\s+\S+))*)\s*$', _FLAGS )
+_DROP_COLUMN = re.compile( r'^\s*ALTER\s+TABLE\s+(\S+)\s+DROP\s+COLUMN\s+(\S+)(?:\s+CASCADE|\s+RESTRICT)?\s*$', _FLAGS )
+_CATALOG = re.compile( r'\b(?:SYSCAT|SYSIBM|SYSIBMADM|SYSSTAT|SYSTOOLS|SYSPROC|QSYS2)\s*\.', re.I )
+_DDL = re.compile( r'^\s*(?:CREATE|DROP|ALTER|RENAME)\b', re.I )
+_QUERY = re.compile( r'^\s*(?:SELECT|WITH)\b', re.I )
+
+def _unquote( name ):
+    name = name.strip().rstrip( ';' )
+    if '.' in name and not name.startswith( '"' ):
+        name = name.rsplit( '.', 1 )[1]
+    elif '"."' in name:
+        name = name.rsplit( '"."', 1 )[1]
+    return name.strip( '"' )
+
+def _names( text ):
+    return tuple( _unquote( name ) for name in text.split( ',' ) )
+
+def _quote( name ):
+    return '"%s"' % name.replace( '"', '""' )
+
+# Splits the select list of a catalog query into the names of its columns.
+def _select_columns( sql ):
+    match = re.match( r'\s*SELECT\s+(?:DISTINCT\s+)?(.*?)\s+FROM\s', sql, _FLAGS )
+    if match is None:
+        return ()
+    items = []
+    depth = 0
+    start = 0
+    text = match.group( 1 )
+    for index, char in enumerate( text ):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            items.append( text[start:index] )
+            start = index + 1
+    items.append( text[start:] )
+    columns = []
+    for position, item in enumerate( items ):
+        name = re.search( r'"?([\w$#@]+)"?\s*$', item.strip() )
+        columns.append( ( name.group( 1 ).upper() if name and not item.strip().endswith( ')' ) else str( position + 1 ),
+                          'VARCHAR' ) )
+    return tuple( columns )
+
+# Translation of a statement: ( 'sql', sql ) to run on SQLite, ( 'rows',
+# ( columns, rows ) ) for a canned result, ( 'none', None ) for a statement
+# which is ignored, or a catalog change as ( 'foreign_key', ( table, name,
+# columns, to_table, to_columns ) ), ( 'drop_constraint', ( table, name ) )
+# ( 'drop_column', ( table, column ) ), a declared temporary table as
+# ( 'declare_temporary', ( table, columns, replace ) ) or a MERGE as ( 'merge',
+# ( checks, sql ) ), where each check is a query which returns a row when the
+# MERGE fails with its sqlcode: ( sql, sqlcode, sqlstate, message ).
+@functools.lru_cache( maxsize = 2048 )
+def translate( sql ):
+    if _IGNORED.match( sql ):
+        return 'none', None
+    match = _ADD_FOREIGN_KEY.match( sql )
+    if match:
+        table, name, columns, to_table, to_columns = match.groups()
+        table = _unquote( table )
+        name = _unquote( name ) if name else 'FK_%s_%s' % ( table, '_'.join( _names( columns ) ) )
+        return 'foreign_key', ( table, name, _names( columns ), _unquote( to_table ), _names( to_columns ) )
+    match = _ADD_UNIQUE.match( sql )
+    if match:
+        table, name, columns = match.groups()
+        name = _unquote( name ) if name else 'UQ_%s_%s' % ( _unquote( table ), '_'.join( _names( columns ) ) )
+        return 'sql', 'CREATE UNIQUE INDEX %s ON %s (%s)' % ( _quote( name ), table, columns )
+    match = _DROP_CONSTRAINT.match( sql )
+    if match:
+        return 'drop_constraint', ( _unquote( match.group( 1 ) ), _unquote( match.group( 2 ) ) )
+    match = _DROP_COLUMN.match( sql )
+    if match:
+        return 'drop_column', ( match.group( 1 ), match.group( 2 ) )
+    match = _DECLARE_TEMPORARY.match( sql )
+    if match:
+        table, columns, clauses = match.groups()
+        return 'declare_temporary', ( table, columns, re.search( r'WITH\s+REPLACE', clauses, re.I ) is not None )
+    match = _RENAME_TABLE.match( sql )
+    if match:
+        return 'sql', 'ALTER TABLE %s RENAME TO %s' % match.groups()
+    match = _TRUNCATE.match( sql )
+    if match:
+        return 'sql', 'DELETE FROM %s' % match.group( 1 )
+
+    for pattern, replacement in _REWRITES:
+        sql = pattern.sub( replacement, sql )
+    if _CATALOG.search( sql ):
+        if _QUERY.match( sql ):
+            return 'rows', ( _select_columns( sql ), () )
+        return 'none', None
+    match = _FINAL_TABLE.match( sql )
+    if match:
+        sql = '%s RETURNING %s' % ( match.group( 2 ), match.group( 1 ) )
+    match = _MERGE.match( sql )
+    if match:
+        table, values, source, on, update, columns = match.groups()
+        source_table = 'WITH S (%s) AS (%s) ' % ( source, values )
+        # SQLite applies duplicate source rows one after the other, Db2 refuses
+        # them: two rows matching the same target row fail with SQL0788N, two
+        # rows inserted with the same key with SQL0803N.
+        checks = [( source_table + 'SELECT 1 FROM %s AS T JOIN S ON %s GROUP BY T.rowid HAVING COUNT(*) > 1 LIMIT 1'
+                    % ( table, on ), -788, '21506', 'The same row of target table was identified more than once' )]
+        if columns is not None:
+            for group in on.split( ' OR ' ):
+                keys = re.findall( r'\bS\.("?[\w$#@]+"?)', group )
+                checks.append( ( source_table + 'SELECT 1 FROM S WHERE %s GROUP BY %s HAVING COUNT(*) > 1 LIMIT 1'
+                                 % ( ' AND '.join( '%s IS NOT NULL' % key for key in keys ), ', '.join( keys ) ),
+                                 -803, '23505', 'One or more values in the INSERT statement are not unique' ) )
+        sql = source_table
+        if columns is None:
+            sql += 'UPDATE %s AS T SET %s FROM S WHERE %s' % ( table, update, on )
+        else:
+            sql += 'INSERT INTO %s (%s) SELECT %s FROM S WHERE 1 = 1 ' % ( table, columns, source )
+            if update:
+                target = re.findall( r'\bT\.("?[\w$#@]+"?)\s*=', on.split( ' OR ' )[0] )
+                sql += 'ON CONFLICT (%s) DO UPDATE SET %s' % ( ', '.join( target ), re.sub( r'\bS\.', 'excluded.', update ) )
+            else:
+                sql += 'ON CONFLICT DO NOTHING'
+        return 'merge', ( tuple( checks ), sql )
+    return 'sql', sql
+
+# Tables a statement reads or writes, whose declared column types describe
+# the columns of its result.
+_TABLE_REFERENCE = re.compile( r'\b(?:FROM|JOIN|INTO|UPDATE)\s+((?:"[^"]+"|[\w$#@]+)(?:\s*\.\s*(?:"[^"]+"|[\w$#@]+))?)', re.I )
+
+def _referenced_tables( sql ):
+    tables = []
+    for reference in _TABLE_REFERENCE.findall( sql ):
+        name = _unquote( reference )
+        if name not in tables:
+            tables.append( name )
+    return tables
+
+# ---------------------------------------------------------------------------
+# Databases, connections and statements
+# ---------------------------------------------------------------------------
+
+def _weekday( value ):
+    return _to_date( value ).isoweekday() % 7 + 1 if value is not None else None
+
+def _date_part( part ):
+    def function( value ):
+        if not isinstance( value, str ):
+            return None
+        value = _to_timestamp( value ) if len( value ) > 10 else _to_date( value ) if len( value ) == 10 else _to_time( value )
+        return getattr( value, part )
+    return function
+
+# Db2 scalar functions the backend generates which SQLite does not have.
+_FUNCTIONS = (
+    ( 'YEAR', 1, _date_part( 'year' ) ),
+    ( 'MONTH', 1, _date_part( 'month' ) ),
+    ( 'DAY', 1, _date_part( 'day' ) ),
+    ( 'HOUR', 1, _date_part( 'hour' ) ),
+    ( 'MINUTE', 1, _date_part( 'minute' ) ),
+    ( 'SECOND', 1, _date_part( 'second' ) ),
+    ( 'QUARTER', 1, lambda value: ( _to_date( value ).month - 1 ) // 3 + 1 if value is not None else None ),
+    ( 'DAYOFWEEK', 1, _weekday ),
+    ( 'DAYOFWEEK_ISO', 1, lambda value: _to_date( value ).isoweekday() if value is not None else None ),
+    ( 'DAYOFYEAR', 1, lambda value: _to_date( value ).timetuple().tm_yday if value is not None else None ),
+    ( 'WEEK_ISO', 1, lambda value: _to_date( value ).isocalendar()[1] if value is not None else None ),
+    ( 'MOD', 2, lambda a, b: None if a is None or b is None else a % b ),
+    ( 'LCASE', 1, lambda value: value.lower() if value is not None else None ),
+    ( 'UCASE', 1, lambda value: value.upper() if value is not None else None ),
+    ( 'LOCATE', 2, lambda needle, haystack: None if needle is None or haystack is None else haystack.find( needle ) + 1 ),
+    ( 'POSSTR', 2, lambda haystack, needle: None if needle is None or haystack is None else haystack.find( needle ) + 1 ),
+    ( 'CONCAT', 2, lambda a, b: None if a is None or b is None else '%s%s' % ( a, b ) ),
+)
+
+class Database( object ):
+    """
+    A database of the process: its SQLite URI, the connection keeping an
+    in-memory database alive, the foreign keys added with ALTER TABLE, and the
+    declared column types of its tables, refreshed after every DDL statement.
+    """
+
+    def __init__( self, name ):
+        self.name = name
+        if os.sep in name or '/' in name or name.lower().endswith( ( '.db', '.sqlite', '.sqlite3' ) ):
+            self.uri = 'file:%s' % os.path.abspath( name )
+            self.keeper = None
+        else:
+            self.uri = 'file:ibm_db_django_%s?mode=memory&cache=shared' % name.upper()
+            self.keeper = sqlite3.connect( self.uri, uri = True, check_same_thread = False )
+        self.foreign_keys = []
+        self.generation = 0
+        self._columns = {}
+        self._result_types = {}
+        self.lock = threading.Lock()
+
+    def schema_changed( self ):
+        with self.lock:
+            self.generation += 1
+            self._columns.clear()
+            self._result_types.clear()
+
+    # { column name: ColumnType } of a table, upper cased names.
+    def columns( self, connection, table ):
+        key = table.upper()
+        columns = self._columns.get( key )
+        if columns is None:
+            columns = {}
+            for cid, name, declared, notnull, default, pk in connection.execute( 'PRAGMA table_info(%s)' % _quote( table ) ):
+                columns[name.upper()] = _column_type( declared, not ( notnull or pk ) )
+            self._columns[key] = columns
+        return columns
+
+    # Column types of the result of sql, from the tables it references; None
+    # for the columns which are expressions.
+    def result_types( self, connection, sql, names ):
+        types = self._result_types.get( sql )
+        if types is None:
+            tables = [self.columns( connection, table ) for table in _referenced_tables( sql )]
+            types = []
+            for name in names:
+                key = name.upper()
+                types.append( next( ( columns[key] for columns in tables if key in columns ), None ) )
+            self._result_types[sql] = types
+        return types
+
+    def drop( self ):
+        if self.keeper is not None:
+            self.keeper.close()
+            self.keeper = None
+        elif os.path.exists( self.uri[5:] ):
+            os.remove( self.uri[5:] )
+
+databases = {}
+_lock = threading.Lock()
+
+def _database( name, create = True ):
+    with _lock:
+        database = databases.get( name )
+        if database is None and create:
+            database = databases[name] = Database( name )
+        return database
+
+def _dsn_values( dsn ):
+    values = {}
+    for part in dsn.split( ';' ):
+        key, sep, value = part.partition( '=' )
+        if sep:
+            values[key.strip().upper()] = value.strip()
+    return values
+
+class IBM_DBConnection( object ):
+
+    def __init__( self, database, schema, options ):
+        self.database = database
+        self.schema = schema
+        self.autocommit = 1
+        self.closed = False
+        self.sqlite = None
+        self.declared = set()
+        settings = options or {}
+        self.dbms_name = settings.get( 'DBMS_NAME', DEFAULT_DBMS_NAME )
+        self.dbms_ver = settings.get( 'DBMS_VER', DEFAULT_DBMS_VER )
+        if database is not None:
+            self.sqlite = sqlite3.connect( database.uri, uri = True, isolation_level = None,
+                                           check_same_thread = False, timeout = 30 )
+            self.sqlite.execute( 'PRAGMA read_uncommitted = 1' )
+            self.sqlite.create_function( 'CURRENT_SCHEMA', 0, lambda: self.schema, deterministic = True )
+            for name, arguments, function in _FUNCTIONS:
+                self.sqlite.create_function( name, arguments, function, deterministic = True )
+
+    # Db2 starts a unit of work with the first statement after a commit when
+    # autocommit is off.
+    def begin( self ):
+        if not self.autocommit and not self.sqlite.in_transaction:
+            self.sqlite.execute( 'BEGIN' )
+
+    # Db2 drops a temporary table declared or replaced in a unit of work
+    # which is rolled back.
+    def end( self, command ):
+        if self.sqlite is not None and self.sqlite.in_transaction:
+            self.sqlite.execute( command )
+            if command == 'ROLLBACK':
+                for table in self.declared:
+                    self.sqlite.execute( 'DROP TABLE IF EXISTS temp.%s' % table )
+        self.declared = set()
+
+class IBM_DBStatement( object ):
+
+    def __init__( self, connection, sql ):
+        self.connection = connection
+        self.sql = sql
+        self.kind, self.payload = ( 'sql', None ) if sql is None else translate( sql )
+        canned = _canned( sql ) if sql is not None and responses else None
+        if canned is not None:
+            self.kind, self.payload = 'rows', canned
+        self.bound = {}
+        self._reset()
+
+    def _reset( self ):
+        self.cursor = None
+        self.columns = ()
+        self.types = ()
+        self.converters = ()
+        self.pending = []
+        self.rowcount = -1
+
+    # A result set of literal rows, of the catalog functions and canned responses.
+    def set_rows( self, columns, rows ):
+        self._reset()
+        self.columns = tuple( name for name, declared in columns )
+        self.types = tuple( _column_type( declared ) for name, declared in columns )
+        self.pending = list( rows )
+
+    def execute( self, parameters ):
+        self._reset()
+        connection = self.connection
+        if connection.closed or connection.sqlite is None:
+            raise _error( 'Statement Execute Failed: ', 'Connection is not active', -1024, '08003' )
+        kind = self.kind
+        if kind == 'rows':
+            self.set_rows( *self.payload )
+            return True
+        if kind == 'none':
+            self.rowcount = 0
+            return True
+        if kind == 'foreign_key':
+            table, name, columns, to_table, to_columns = self.payload
+            with connection.database.lock:
+                connection.database.foreign_keys.append( ( table.upper(), name.upper(), columns, to_table.upper(), to_columns ) )
+            self.rowcount = 0
+            return True
+        if kind == 'drop_constraint':
+            table, name = self.payload
+            database = connection.database
+            with database.lock:
+                database.foreign_keys = [fk for fk in database.foreign_keys if fk[:2] != ( table.upper(), name.upper() )]
+            connection.sqlite.execute( 'DROP INDEX IF EXISTS %s' % _quote( name ) )
+            database.schema_changed()
+            self.rowcount = 0
+            return True
+        if kind == 'drop_column':
+            # Db2 drops the indexes on the column with it, SQLite refuses to
+            # drop an indexed column.
+            table, column = self.payload
+            try:
+                connection.begin()
+                for index in connection.sqlite.execute( 'PRAGMA index_list(%s)' % table ).fetchall():
+                    names = [info[2] for info in connection.sqlite.execute( 'PRAGMA index_info(%s)' % _quote( index[1] ) )]
+                    if _unquote( column ) in names and index[3] == 'c':
+                        connection.sqlite.execute( 'DROP INDEX %s' % _quote( index[1] ) )
+                connection.sqlite.execute( 'ALTER TABLE %s DROP COLUMN %s' % ( table, column ) )
+            except sqlite3.Error as e:
+                raise _sqlite_error( 'Statement Execute Failed: ', e )
+            connection.database.schema_changed()
+            self.rowcount = 0
+            return True
+
+        if kind == 'declare_temporary':
+            table, columns, replace = self.payload
+            try:
+                connection.begin()
+                if connection.sqlite.in_transaction:
+                    connection.declared.add( table )
+                existing = connection.sqlite.execute( "SELECT sql FROM sqlite_temp_master WHERE type = 'table' "
+                                                      "AND name = ?", ( table, ) ).fetchone()
+                # SQLite cannot drop a table while a statement is reading, so a
+                # table replaced by one of the same columns is emptied instead.
+                if replace and existing is not None and existing[0] == 'CREATE TABLE %s %s' % ( table, columns ):
+                    connection.sqlite.execute( 'DELETE FROM temp.%s' % table )
+                else:
+                    if replace:
+                        connection.sqlite.execute( 'DROP TABLE IF EXISTS temp.%s' % table )
+                    connection.sqlite.execute( 'CREATE TEMP TABLE %s %s' % ( table, columns ) )
+            except sqlite3.Error as e:
+                raise _sqlite_error( 'Statement Execute Failed: ', e )
+            self.rowcount = 0
+            return True
+
+        if kind == 'merge':
+            checks, sql = self.payload
+            try:
+                for check, sqlcode, sqlstate, message in checks:
+                    if connection.sqlite.execute( check, _adapt_all( parameters ) ).fetchone() is not None:
+                        raise _error( 'Statement Execute Failed: ', message, sqlcode, sqlstate )
+            except ( sqlite3.Error, ValueError, OverflowError ) as e:
+                raise _sqlite_error( 'Statement Execute Failed: ', e )
+        else:
+            sql = self.payload
+        changes = connection.sqlite.total_changes
+        try:
+            connection.begin()
+            cursor = connection.sqlite.execute( sql, _adapt_all( parameters ) )
+        except ( sqlite3.Error, ValueError, OverflowError ) as e:
+            raise _sqlite_error( 'Statement Execute Failed: ', e )
+        if _DDL.match( sql ):
+            connection.database.schema_changed()
+        if cursor.description is None:
+            # sqlite3 has no rowcount for a statement starting with WITH.
+            self.rowcount = cursor.rowcount if kind != 'merge' else connection.sqlite.total_changes - changes
+            return True
+        self.cursor = cursor
+        self.columns = tuple( desc[0] for desc in cursor.description )
+        types = list( connection.database.result_types( connection.sqlite, sql, self.columns ) )
+        if None in types:
+            # Expressions are typed from their first value, rows are read ahead
+            # until every such column has had one or the result set ends.
+            self._read_ahead( types )
+        self.types = tuple( types )
+        self.converters = tuple( ( index, column.convert ) for index, column in enumerate( types ) if column.convert is not None )
+        if self.pending and self.converters:
+            self.pending = [self._convert( row ) for row in self.pending]
+        return True
+
+    def _read_ahead( self, types ):
+        untyped = set( index for index, column in enumerate( types ) if column is None )
+        while untyped:
+            rows = self.cursor.fetchmany( 100 )
+            if not rows:
+                break
+            self.pending.extend( rows )
+            for row in rows:
+                for index in list( untyped ):
+                    if row[index] is not None:
+                        types[index] = _value_type( row[index] )
+                        untyped.discard( index )
+        for index in untyped:
+            types[index] = _column_type( 'VARCHAR' )
+
+    def _convert( self, row ):
+        row = list( row )
+        for index, convert in self.converters:
+            value = row[index]
+            if value is not None:
+                row[index] = convert( value )
+        return tuple( row )
+
+    def fetch( self, size = None ):
+        rows = []
+        if self.pending:
+            if size is None or len( self.pending ) <= size:
+                rows, self.pending = self.pending, []
+            else:
+                rows, self.pending = self.pending[:size], self.pending[size:]
+        if self.cursor is not None and ( size is None or len( rows ) < size ):
+            try:
+                more = self.cursor.fetchall() if size is None else self.cursor.fetchmany( size - len( rows ) )
+            except sqlite3.Error as e:
+                raise _sqlite_error( 'Fetch Failure: ', e )
+            if self.converters:
+                more = [self._convert( row ) for row in more]
+            rows.extend( more )
+            if size is None or len( rows ) < size:
+                self.cursor = None
+        return rows
+
+    def execute_many( self, seq_parameters ):
+        self._reset()
+        if self.kind != 'sql':
+            rowcount = 0
+            for parameters in seq_parameters:
+                self.execute( parameters )
+                rowcount += max( self.rowcount, 0 )
+            return rowcount
+        connection = self.connection
+        try:
+            connection.begin()
+            cursor = connection.sqlite.executemany( self.payload, [_adapt_all( parameters ) for parameters in seq_parameters] )
+        except ( sqlite3.Error, ValueError, OverflowError ) as e:
+            raise _sqlite_error( 'Statement Execute Failed: ', e )
+        self.rowcount = cursor.rowcount
+        return self.rowcount
+
+    def free( self ):
+        if self.cursor is not None:
+            self.cursor.close()
+        self._reset()
+
+# ---------------------------------------------------------------------------
+# The ibm_db API
+# ---------------------------------------------------------------------------
+
+# Settings of the stand-in given to install(): DBMS_NAME and DBMS_VER.
+_options = {}
+
+def connect( dsn, user = '', password = '', options = None, *args ):
+    values = _dsn_values( dsn )
+    name = values.get( 'DATABASE' ) or values.get( 'DSN' )
+    schema = ( values.get( 'CURRENTSCHEMA' ) or values.get( 'UID' ) or user or 'DB2INST1' ).upper()
+    # Without a database name the connection is an attachment to the
+    # instance, for createdb() and dropdb().
+    connection = IBM_DBConnection( _database( name ) if name else None, schema, _options )
+    if options:
+        set_option( connection, options, 1 )
+    return connection
+
+pconnect = connect
+
+def close( connection ):
+    if not connection.closed:
+        connection.closed = True
+        if connection.sqlite is not None:
+            connection.end( 'ROLLBACK' )
+            connection.sqlite.close()
+    return True
+
+def active( connection ):
+    return connection is not None and not connection.closed
+
+def autocommit( connection, value = None ):
+    if value is None:
+        return connection.autocommit
+    value = int( value )
+    # Switching autocommit on commits the unit of work in progress.
+    if value and not connection.autocommit:
+        connection.end( 'COMMIT' )
+    connection.autocommit = value
+    return True
+
+def commit( connection ):
+    connection.end( 'COMMIT' )
+    return True
+
+def rollback( connection ):
+    connection.end( 'ROLLBACK' )
+    return True
+
+def get_db_info( connection, option ):
+    if option == SQL_DBMS_NAME:
+        return connection.dbms_name
+    if option == SQL_DBMS_VER:
+        return connection.dbms_ver
+    return None
+
+def set_option( handle, options, handle_type ):
+    if isinstance( handle, IBM_DBConnection ):
+        for key, value in options.items():
+            if key == SQL_ATTR_AUTOCOMMIT:
+                autocommit( handle, value )
+            elif key == SQL_ATTR_CURRENT_SCHEMA and value:
+                handle.schema = value.upper()
+    return True
+
+def get_option( handle, option, handle_type ):
+    if isinstance( handle, IBM_DBConnection ):
+        if option == SQL_ATTR_CURRENT_SCHEMA:
+            return handle.schema
+        if option == SQL_ATTR_AUTOCOMMIT:
+            return handle.autocommit
+        return None
+    if option == SQL_ATTR_CURSOR_TYPE:
+        return SQL_CURSOR_FORWARD_ONLY
+    return None
+
+def prepare( connection, sql, options = None ):
+    if connection is None or connection.closed:
+        raise _error( 'Statement prepare Failed: ', 'Connection is not active', -1024, '08003' )
+    if connection.database is None:
+        raise _error( 'Statement prepare Failed: ', 'A database connection does not exist', -1024, '08003' )
+    return IBM_DBStatement( connection, sql )
+
+def exec_immediate( connection, sql, options = None ):
+    statement = prepare( connection, sql )
+    statement.execute( () )
+    return statement
+
+def bind_param( statement, index, value, *args ):
+    statement.bound[index] = value
+    return True
+
+def execute( statement, parameters = None ):
+    if parameters is None:
+        parameters = tuple( statement.bound[index] for index in sorted( statement.bound ) )
+    _state.error = None
+    return statement.execute( parameters )
+
+def execute_many( statement, seq_parameters, options = None ):
+    _state.error = None
+    return statement.execute_many( seq_parameters )
+
+def num_fields( statement ):
+    return len( statement.columns )
+
+def num_rows( statement ):
+    return statement.rowcount
+
+def get_num_result( statement ):
+    return len( statement.pending ) if statement.cursor is None else -1
+
+def _column( statement, column ):
+    if isinstance( column, str ):
+        column = [name.upper() for name in statement.columns].index( column.upper() )
+    return statement.types[column]
+
+def field_name( statement, column ):
+    return statement.columns[column] if isinstance( column, int ) else column.upper()
+
+def field_type( statement, column ):
+    return _column( statement, column ).name
+
+def field_display_size( statement, column ):
+    return _column( statement, column ).size
+
+def field_precision( statement, column ):
+    return _column( statement, column ).size
+
+def field_width( statement, column ):
+    return _column( statement, column ).size
+
+def field_scale( statement, column ):
+    return _column( statement, column ).scale
+
+def field_nullable( statement, column ):
+    return _column( statement, column ).nullable
+
+def fetch_tuple( statement, row_number = None ):
+    rows = statement.fetch( 1 )
+    return rows[0] if rows else False
+
+def fetch_assoc( statement, row_number = None ):
+    rows = statement.fetch( 1 )
+    return dict( zip( statement.columns, rows[0] ) ) if rows else False
+
+def fetch_both( statement, row_number = None ):
+    rows = statement.fetch( 1 )
+    if not rows:
+        return False
+    row = dict( zip( statement.columns, rows[0] ) )
+    row.update( enumerate( rows[0] ) )
+    return row
+
+def fetchone( statement ):
+    rows = statement.fetch( 1 )
+    return rows[0] if rows else None
+
+def fetchmany( statement, size ):
+    return statement.fetch( size )
+
+def fetchall( statement ):
+    return statement.fetch()
+
+def fetch_row( statement, row_number = None ):
+    statement.current = fetch_tuple( statement )
+    return statement.current is not False
+
+def result( statement, column ):
+    return statement.current[column] if isinstance( column, int ) else \
+        statement.current[[name.upper() for name in statement.columns].index( column.upper() )]
+
+def next_result( statement ):
+    return False
+
+def free_result( statement ):
+    statement.free()
+    return True
+
+def free_stmt( statement ):
+    if statement is not None:
+        statement.free()
+    return True
+
+def callproc( connection, procname, parameters = None ):
+    raise _error( '', 'Procedure "%s" is not supported by the stand-in driver' % procname, -440, '42884' )
+
+def _last_error( index, default ):
+    error = getattr( _state, 'error', None )
+    return error[index] if error else default
+
+def stmt_errormsg( statement = None ):
+    return _last_error( 0, '' )
+
+def conn_errormsg( connection = None ):
+    return _last_error( 0, '' )
+
+def stmt_error( statement = None ):
+    return _last_error( 1, '' )
+
+def conn_error( connection = None ):
+    return _last_error( 1, '' )
+
+def get_sqlcode( handle = None ):
+    return _last_error( 2, 0 )
+
+def stmt_warn( statement = None ):
+    return ''
+
+def conn_warn( connection = None ):
+    return ''
+
+def server_info( connection ):
+    return types.SimpleNamespace( DBMS_NAME = connection.dbms_name, DBMS_VER = connection.dbms_ver )
+
+def client_info( connection ):
+    return types.SimpleNamespace( DRIVER_NAME = 'ibm_db_django.standin', DRIVER_VER = __version__ )
+
+# Creating a database over an existing one starts it afresh.
+def createdb( connection, database, codeset = '', mode = '' ):
+    dropdb( connection, database )
+    _database( database )
+    return True
+
+def recreatedb( connection, database, codeset = '', mode = '' ):
+    return createdb( connection, database, codeset, mode )
+
+def createdbNX( connection, database, codeset = '', mode = '' ):
+    _database( database )
+    return True
+
+def dropdb( connection, database ):
+    with _lock:
+        dropped = databases.pop( database, None )
+    if dropped is None:
+        dropped = Database( database )
+    dropped.drop()
+    return True
+
+# Result sets of the catalog functions, with the columns of CLI.
+
+def _catalog_statement( connection, columns, rows ):
+    statement = IBM_DBStatement( connection, None )
+    statement.set_rows( columns, rows )
+    return statement
+
+def _pattern( value ):
+    return value if value not in ( None, '' ) else '%'
+
+def _table_names( connection, table, types = ( 'table', 'view' ) ):
+    return [( name, kind ) for name, kind in connection.sqlite.execute(
+        "SELECT name, type FROM sqlite_master WHERE type IN (%s) AND name NOT LIKE 'sqlite\\_%%' ESCAPE '\\' "
+        "AND name LIKE ? ORDER BY name" % ', '.join( "'%s'" % kind for kind in types ), ( _pattern( table ), ) )]
+
+def tables( connection, qualifier = None, schema = None, table = None, table_type = None ):
+    columns = ( ( 'TABLE_CAT', 'VARCHAR' ), ( 'TABLE_SCHEM', 'VARCHAR' ), ( 'TABLE_NAME', 'VARCHAR' ),
+                ( 'TABLE_TYPE', 'VARCHAR' ), ( 'REMARKS', 'VARCHAR' ) )
+    rows = [( None, connection.schema, name, 'VIEW' if kind == 'view' else 'TABLE', None )
+            for name, kind in _table_names( connection, table )
+            if not table_type or ( 'VIEW' if kind == 'view' else 'TABLE' ) in table_type.upper()]
+    return _catalog_statement( connection, columns, rows )
+
+def columns( connection, qualifier = None, schema = None, table = None, column = None ):
+    names = ( 'TABLE_CAT', 'TABLE_SCHEM', 'TABLE_NAME', 'COLUMN_NAME', 'DATA_TYPE', 'TYPE_NAME', 'COLUMN_SIZE',
+              'BUFFER_LENGTH', 'DECIMAL_DIGITS', 'NUM_PREC_RADIX', 'NULLABLE', 'REMARKS', 'COLUMN_DEF',
+              'SQL_DATA_TYPE', 'SQL_DATETIME_SUB', 'CHAR_OCTET_LENGTH', 'ORDINAL_POSITION', 'IS_NULLABLE' )
+    rows = []
+    for name, kind in _table_names( connection, table ):
+        for cid, column_name, declared, notnull, default, pk in connection.sqlite.execute( 'PRAGMA table_info(%s)' % _quote( name ) ):
+            if column and column_name.upper() != column.upper():
+                continue
+            column_type = _column_type( declared, not ( notnull or pk ) )
+            rows.append( ( None, connection.schema, name, column_name, column_type.sql_type, column_type.type_name,
+                           column_type.size, column_type.size, column_type.scale,
+                           10 if column_type.name in ( 'int', 'bigint', 'decimal' ) else None,
+                           int( column_type.nullable ), None, default, column_type.sql_type, None,
+                           column_type.size if column_type.name == 'string' else None, cid + 1,
+                           'YES' if column_type.nullable else 'NO' ) )
+    return _catalog_statement( connection, [( name, 'VARCHAR' ) for name in names], rows )
+
+# Primary key columns of a table, from its declaration.
+def _primary_key( connection, table ):
+    columns = sorted( ( pk, name ) for cid, name, declared, notnull, default, pk
+                      in connection.sqlite.execute( 'PRAGMA table_info(%s)' % _quote( table ) ) if pk )
+    return [name for pk, name in columns]
+
+def primary_keys( connection, qualifier = None, schema = None, table = None ):
+    names = ( 'TABLE_CAT', 'TABLE_SCHEM', 'TABLE_NAME', 'COLUMN_NAME', 'KEY_SEQ', 'PK_NAME' )
+    rows = []
+    for name, kind in _table_names( connection, table, ( 'table', ) ):
+        for position, column in enumerate( _primary_key( connection, name ) ):
+            rows.append( ( None, connection.schema, name, column, position + 1, 'PK_%s' % name.upper() ) )
+    return _catalog_statement( connection, [( name, 'VARCHAR' ) for name in names], rows )
+
+def statistics( connection, qualifier = None, schema = None, table = None, unique = False ):
+    names = ( 'TABLE_CAT', 'TABLE_SCHEM', 'TABLE_NAME', 'NON_UNIQUE', 'INDEX_QUALIFIER', 'INDEX_NAME', 'TYPE',
+              'ORDINAL_POSITION', 'COLUMN_NAME', 'ASC_OR_DESC', 'CARDINALITY', 'PAGES', 'FILTER_CONDITION' )
+    rows = []
+    for name, kind in _table_names( connection, table, ( 'table', ) ):
+        indexes = []
+        has_primary_key = False
+        for seq, index_name, index_unique, origin, partial in connection.sqlite.execute( 'PRAGMA index_list(%s)' % _quote( name ) ):
+            has_primary_key = has_primary_key or origin == 'pk'
+            columns = [row[2] for row in connection.sqlite.execute( 'PRAGMA index_info(%s)' % _quote( index_name ) )]
+            if origin == 'pk':
+                index_name = 'PK_%s' % name.upper()
+            indexes.append( ( index_name, bool( index_unique ), columns ) )
+        # An INTEGER PRIMARY KEY is the rowid and has no index in SQLite,
+        # Db2 creates one for every primary key.
+        primary_key = _primary_key( connection, name )
+        if primary_key and not has_primary_key:
+            indexes.insert( 0, ( 'PK_%s' % name.upper(), True, primary_key ) )
+        for index_name, index_unique, columns in indexes:
+            if unique and not index_unique:
+                continue
+            for position, column in enumerate( columns ):
+                rows.append( ( None, connection.schema, name, int( not index_unique ), connection.schema, index_name,
+                               SQL_INDEX_OTHER, position + 1, column, 'A', None, None, None ) )
+    return _catalog_statement( connection, [( name, 'VARCHAR' ) for name in names], rows )
+
+def foreign_keys( connection, pk_qualifier = None, pk_schema = None, pk_table = None,
+                  fk_qualifier = None, fk_schema = None, fk_table = None ):
+    names = ( 'PKTABLE_CAT', 'PKTABLE_SCHEM', 'PKTABLE_NAME', 'PKCOLUMN_NAME', 'FKTABLE_CAT', 'FKTABLE_SCHEM',
+              'FKTABLE_NAME', 'FKCOLUMN_NAME', 'KEY_SEQ', 'UPDATE_RULE', 'DELETE_RULE', 'FK_NAME', 'PK_NAME',
+              'DEFERRABILITY' )
+    keys = list( connection.database.foreign_keys )
+    # Foreign keys declared with the table.
+    for name, kind in _table_names( connection, fk_table, ( 'table', ) ):
+        declared = {}
+        for row in connection.sqlite.execute( 'PRAGMA foreign_key_list(%s)' % _quote( name ) ):
+            declared.setdefault( row[0], ( row[2], [], [] ) )
+            declared[row[0]][1].append( row[3] )
+            declared[row[0]][2].append( row[4] )
+        for id, ( to_table, columns, to_columns ) in sorted( declared.items() ):
+            keys.append( ( name.upper(), 'FK_%s_%d' % ( name.upper(), id ), tuple( columns ), to_table.upper(), tuple( to_columns ) ) )
+    rows = []
+    for table, name, columns, to_table, to_columns in keys:
+        if fk_table and table != fk_table.upper() or pk_table and to_table != pk_table.upper():
+            continue
+        for position, ( column, to_column ) in enumerate( zip( columns, to_columns ) ):
+            rows.append( ( None, connection.schema, to_table, to_column, None, connection.schema, table, column,
+                           position + 1, 3, 3, name, 'PK_%s' % to_table, 7 ) )
+    return _catalog_statement( connection, [( name, 'VARCHAR' ) for name in names], rows )
+
+# ---------------------------------------------------------------------------
+# Installation
+# ---------------------------------------------------------------------------
+
+API = (
+    'connect', 'pconnect', 'close', 'active', 'autocommit', 'commit', 'rollback', 'get_db_info', 'set_option',
+    'get_option', 'prepare', 'exec_immediate', 'bind_param', 'execute', 'execute_many', 'num_fields', 'num_rows',
+    'get_num_result', 'field_name', 'field_type', 'field_display_size', 'field_precision', 'field_width',
+    'field_scale', 'field_nullable', 'fetch_tuple', 'fetch_assoc', 'fetch_both', 'fetchone', 'fetchmany',
+    'fetchall', 'fetch_row', 'result', 'next_result', 'free_result', 'free_stmt', 'callproc', 'stmt_errormsg',
+    'conn_errormsg', 'stmt_error', 'conn_error', 'get_sqlcode', 'stmt_warn', 'conn_warn', 'server_info',
+    'client_info', 'createdb', 'recreatedb', 'createdbNX', 'dropdb', 'tables', 'columns', 'primary_keys',
+    'statistics', 'foreign_keys', 'IBM_DBConnection', 'IBM_DBStatement', '__version__',
+)
+
+_install_lock = threading.Lock()
+
+# The ibm_db module of the stand-in.
+def driver_module():
+    module = types.ModuleType( 'ibm_db', 'Stand-in for the ibm_db driver, running statements on SQLite.' )
+    this = sys.modules[__name__]
+    for name in API:
+        setattr( module, name, getattr( this, name ) )
+    for name, value in CONSTANTS.items():
+        setattr( module, name, value )
+    return module
+
+# Installs the stand-in as the ibm_db module and loads ibm_db_dbi on top of it,
+# before the backend imports ibm_db_dbi. options are DBMS_NAME and DBMS_VER.
+def install( options = None ):
+    with _install_lock:
+        _options.clear()
+        _options.update( options or {} )
+        current = sys.modules.get( 'ibm_db_dbi' )
+        if current is not None and getattr( current, '_standin', False ):
+            return current
+        spec = importlib.util.find_spec( 'ibm_db_dbi' )
+        if spec is None:
+            from django.core.exceptions import ImproperlyConfigured
+            raise ImproperlyConfigured( "The stand-in driver runs the ibm_db_dbi module of the ibm_db package, "
+                                        "which is not installed." )
+        driver = driver_module()
+        real = sys.modules.get( 'ibm_db' )
+        sys.modules['ibm_db'] = driver
+        try:
+            dbi = importlib.util.module_from_spec( spec )
+            spec.loader.exec_module( dbi )
+        except BaseException:
+            if real is not None:
+                sys.modules['ibm_db'] = real
+            else:
+                sys.modules.pop( 'ibm_db', None )
+            raise
+        dbi._standin = True
+        sys.modules['ibm_db_dbi'] = dbi
+        return dbi
+
+# Installs the stand-in when IBM_DB_DJANGO_STANDIN is set in the settings.
+def install_from_settings():
+    from django.conf import settings
+    if not settings.configured:
+        return None
+    value = getattr( settings, 'IBM_DB_DJANGO_STANDIN', None )
+    if not value:
+        return None
+    return install( value if isinstance( value, dict ) else None )
+
+def installed():
+    return getattr( sys.modules.get( 'ibm_db_dbi' ), '_standin', False )
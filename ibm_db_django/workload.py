@@ -0,0 +1,370 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+"""
+End to end ORM workload, run by python manage.py db2_workload against a Db2
+server or the stand-in driver. It creates its own tables (BENCH_PUBLISHER,
+BENCH_AUTHOR, BENCH_BOOK), fills them and runs a set of scenarios: model
+CRUD, select_related() joins, prefetch_related(), admin style paginated
+changelists, bulk_create()/bulk_update(), iterator() exports and schema
+migrations. Each scenario reports operations per second, p50/p99 latency,
+statements and Python CPU per statement. The statements of a scenario are
+then replayed through a plain ibm_db_dbi cursor, so that the time spent in
+Django and in the backend can be told apart from the time spent in the
+driver and the server.
+"""
+
+import datetime
+import random
+import statistics
+import sys
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+_models = None
+
+# The workload models, defined on first use under the ibm_db_django app so
+# that they exist only when the workload runs.
+def get_models():
+    global _models
+    if _models is None:
+        from django.db import models
+
+        class Publisher( models.Model ):
+            name = models.CharField( max_length = 100 )
+            country = models.CharField( max_length = 2 )
+
+            class Meta:
+                app_label = 'ibm_db_django'
+                db_table = 'BENCH_PUBLISHER'
+
+        class Author( models.Model ):
+            name = models.CharField( max_length = 100 )
+            email = models.CharField( max_length = 254 )
+            born = models.DateField( null = True )
+
+            class Meta:
+                app_label = 'ibm_db_django'
+                db_table = 'BENCH_AUTHOR'
+
+        class Book( models.Model ):
+            title = models.CharField( max_length = 200 )
+            author = models.ForeignKey( Author, models.CASCADE, related_name = 'books' )
+            publisher = models.ForeignKey( Publisher, models.CASCADE, related_name = 'books' )
+            price = models.DecimalField( max_digits = 9, decimal_places = 2 )
+            pages = models.IntegerField()
+            rating = models.FloatField( default = 0 )
+            published = models.DateTimeField( db_index = True )
+            summary = models.TextField( blank = True )
+
+            class Meta:
+                app_label = 'ibm_db_django'
+                db_table = 'BENCH_BOOK'
+
+        _models = ( Publisher, Author, Book )
+    return _models
+
+# Peak resident set size of the process in bytes, None where it is not known.
+def peak_rss():
+    if resource is None:
+        return None
+    rss = resource.getrusage( resource.RUSAGE_SELF ).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+# Datetimes are aware when time zone support is active.
+def _datetime( *args ):
+    return datetime.datetime( *args, tzinfo = datetime.timezone.utc if settings.USE_TZ else None )
+
+def _percentile( values, fraction ):
+    ordered = sorted( values )
+    return ordered[min( len( ordered ) - 1, int( fraction * len( ordered ) ) )]
+
+class Scenario( object ):
+    """
+    One kind of operation of the workload. run( context ) performs a single
+    operation. Scenarios which write run each operation in a transaction
+    which is rolled back, so the data stays the same from one operation to
+    the next; replay is False for those whose statements cannot be replayed
+    on their own (DDL).
+    """
+
+    def __init__( self, name, run, writes = False, replay = True ):
+        self.name = name
+        self.run = run
+        self.writes = writes
+        self.replay = replay
+
+class Context( object ):
+    """
+    What the scenarios work on: the connection, the models, the ids of the
+    rows loaded and a random generator seeded for reproducible runs.
+    """
+
+    def __init__( self, connection, scale, seed ):
+        self.connection = connection
+        self.Publisher, self.Author, self.Book = get_models()
+        self.scale = scale
+        self.random = random.Random( seed )
+        self.author_ids = []
+        self.book_ids = []
+
+def _crud( context ):
+    Author = context.Author
+    author = Author.objects.create( name = 'New author', email = 'new@example.com', born = datetime.date( 1980, 1, 1 ) )
+    author = Author.objects.get( pk = author.pk )
+    author.email = 'changed@example.com'
+    author.save( update_fields = ['email'] )
+    author.delete()
+
+def _select_related( context ):
+    start = context.random.randrange( max( 1, len( context.book_ids ) - 50 ) )
+    return list( context.Book.objects.select_related( 'author', 'publisher' )
+                 .filter( id__gte = context.book_ids[start] ).order_by( 'id' )[:50] )
+
+def _prefetch_related( context ):
+    authors = list( context.Author.objects.prefetch_related( 'books' ).order_by( 'id' )[:20] )
+    return sum( len( author.books.all() ) for author in authors )
+
+# An admin changelist page: the count for the paginator and one page of
+# 100 rows with the foreign keys shown in the list.
+def _changelist( context ):
+    from django.core.paginator import Paginator
+    queryset = context.Book.objects.select_related( 'author' ).order_by( '-published', '-id' )
+    paginator = Paginator( queryset, 100 )
+    page = paginator.page( context.random.randint( 1, paginator.num_pages ) )
+    return list( page.object_list )
+
+def _bulk_create( context ):
+    Book = context.Book
+    now = _datetime( 2024, 1, 1 )
+    Book.objects.bulk_create( [Book( title = 'Bulk %d' % index, author_id = context.author_ids[index % len( context.author_ids )],
+                                     publisher_id = 1 + index % 10, price = Decimal( '12.50' ), pages = 100 + index,
+                                     published = now ) for index in range( 100 )] )
+
+def _bulk_update( context ):
+    Book = context.Book
+    start = context.random.randrange( max( 1, len( context.book_ids ) - 100 ) )
+    books = list( Book.objects.filter( id__gte = context.book_ids[start] ).order_by( 'id' )[:100] )
+    for book in books:
+        book.price += Decimal( '1.00' )
+        book.rating = 4.5
+    Book.objects.bulk_update( books, ['price', 'rating'], batch_size = 100 )
+
+def _export( context ):
+    count = 0
+    for row in context.Book.objects.values_list( 'id', 'title', 'price', 'published', 'author__name' ).order_by( 'id' ).iterator( chunk_size = 500 ):
+        count += 1
+    return count
+
+# The schema editor operations of a typical migration: a new table, a new
+# column and an index on it, and the table dropped again.
+def _migrate( context ):
+    from django.db import models
+    Author = context.Author
+    with context.connection.schema_editor() as editor:
+        field = models.IntegerField( default = 0, db_index = True )
+        field.set_attributes_from_name( 'followers' )
+        field.model = Author
+        editor.add_field( Author, field )
+        editor.remove_field( Author, field )
+
+SCENARIOS = [
+    Scenario( 'crud', _crud, writes = True ),
+    Scenario( 'select_related', _select_related ),
+    Scenario( 'prefetch_related', _prefetch_related ),
+    Scenario( 'changelist', _changelist ),
+    Scenario( 'bulk_create', _bulk_create, writes = True ),
+    Scenario( 'bulk_update', _bulk_update, writes = True ),
+    Scenario( 'export', _export ),
+    Scenario( 'migrate', _migrate, writes = True, replay = False ),
+]
+
+def create_schema( connection ):
+    with connection.schema_editor() as editor:
+        for model in get_models():
+            editor.create_model( model )
+
+def drop_schema( connection ):
+    with connection.schema_editor() as editor:
+        for model in reversed( get_models() ):
+            editor.delete_model( model )
+
+# Loads scale authors with 25 books each and 10 publishers.
+def load_data( context ):
+    Publisher, Author, Book = context.Publisher, context.Author, context.Book
+    Publisher.objects.bulk_create( [Publisher( id = index + 1, name = 'Publisher %d' % index, country = 'US' )
+                                    for index in range( 10 )] )
+    Author.objects.bulk_create( [Author( name = 'Author %d' % index, email = 'author%d@example.com' % index,
+                                         born = datetime.date( 1950 + index % 50, 1 + index % 12, 1 ) )
+                                 for index in range( context.scale )] )
+    context.author_ids = list( Author.objects.order_by( 'id' ).values_list( 'id', flat = True ) )
+    start = _datetime( 2000, 1, 1 )
+    books = []
+    for index in range( context.scale * 25 ):
+        books.append( Book( title = 'Book %d' % index, author_id = context.author_ids[index % len( context.author_ids )],
+                            publisher_id = 1 + index % 10, price = Decimal( '%d.99' % ( 5 + index % 50 ) ),
+                            pages = 50 + index % 900, rating = ( index % 50 ) / 10.0,
+                            published = start + datetime.timedelta( hours = index ), summary = 'Summary of book %d' % index ) )
+        if len( books ) == 1000:
+            Book.objects.bulk_create( books )
+            books = []
+    if books:
+        Book.objects.bulk_create( books )
+    context.book_ids = list( Book.objects.order_by( 'id' ).values_list( 'id', flat = True ) )
+
+class StatementRecorder( object ):
+    """
+    Execute wrapper which counts the statements of the connection and, when
+    capturing, keeps them with their parameters for the replay.
+    """
+
+    def __init__( self ):
+        self.count = 0
+        self.capture = None
+
+    def __call__( self, execute, sql, params, many, context ):
+        self.count += 1
+        if self.capture is not None:
+            self.capture.append( ( sql, list( params ) if many else params, many ) )
+        return execute( sql, params, many, context )
+
+def _operation( connection, scenario, context ):
+    if scenario.writes:
+        with transaction.atomic( using = connection.alias ):
+            scenario.run( context )
+            transaction.set_rollback( True, using = connection.alias )
+    else:
+        scenario.run( context )
+
+def _summary( latencies, wall, cpu, statements ):
+    return {
+        'operations': len( latencies ),
+        'ops_per_sec': len( latencies ) / wall if wall else None,
+        'p50_ms': _percentile( latencies, 0.5 ) * 1000,
+        'p99_ms': _percentile( latencies, 0.99 ) * 1000,
+        'mean_ms': statistics.mean( latencies ) * 1000,
+        'statements': statements,
+        'cpu_per_statement_us': cpu / statements * 1e6 if statements else None,
+    }
+
+# Runs scenario iterations times (after warmup untimed ones) through the ORM.
+# Returns the summary and the statements of the last operation.
+def run_orm( connection, scenario, context, iterations, warmup, recorder ):
+    for _ in range( warmup ):
+        _operation( connection, scenario, context )
+    latencies = []
+    statements = recorder.count
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    for index in range( iterations ):
+        if index == iterations - 1:
+            recorder.capture = []
+        start = time.perf_counter()
+        _operation( connection, scenario, context )
+        latencies.append( time.perf_counter() - start )
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+    captured = recorder.capture
+    recorder.capture = None
+    # The BEGIN/SAVEPOINT statements of the transaction wrapping a writing
+    # operation are not seen by the execute wrapper.
+    return _summary( latencies, wall, cpu, recorder.count - statements ), captured
+
+# Runs the statements of one ORM operation iterations times through a plain
+# ibm_db_dbi cursor, with the SQL already in qmark form and every row
+# fetched, and returns the summary.
+def run_raw( connection, scenario, statements, iterations ):
+    from ibm_db_django.pybase import Database
+    with connection.cursor() as wrapper:
+        rewrite = wrapper.cursor.rewrite
+        prepared = []
+        for sql, params, many in statements:
+            if many:
+                # The statement of executemany() is the rewrite of its first
+                # parameter set.
+                rows = [rewrite( sql, row ) for row in params]
+                if rows:
+                    prepared.append( ( rows[0][0], [row[1] for row in rows], True ) )
+            else:
+                sql, params = rewrite( sql, params or () )
+                prepared.append( ( sql, params, False ) )
+
+    dbi_connection = connection.connection
+    latencies = []
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    for _ in range( iterations ):
+        start = time.perf_counter()
+        if scenario.writes:
+            connection.set_autocommit( False )
+        try:
+            cursor = Database.Cursor( dbi_connection.conn_handler, dbi_connection )
+            for sql, params, many in prepared:
+                if many:
+                    cursor.executemany( sql, params )
+                else:
+                    cursor.execute( sql, params )
+                    if cursor.description:
+                        cursor.fetchall()
+            cursor.close()
+        finally:
+            if scenario.writes:
+                connection.rollback()
+                connection.set_autocommit( True )
+        latencies.append( time.perf_counter() - start )
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+    return _summary( latencies, wall, cpu, len( prepared ) * iterations )
+
+# Runs the workload and returns the results by scenario name, each with the
+# ORM summary, the raw replay summary and the overhead of the ORM over the
+# raw replay (mean milliseconds and fraction), and the peak RSS of the process.
+def run( connection, scale = 40, iterations = 50, warmup = 5, names = None, replay = True, seed = 1,
+         keep = False, progress = None ):
+    context = Context( connection, scale, seed )
+    create_schema( connection )
+    recorder = StatementRecorder()
+    results = {}
+    try:
+        load_data( context )
+        with connection.execute_wrapper( recorder ):
+            for scenario in SCENARIOS:
+                if names and scenario.name not in names:
+                    continue
+                orm, statements = run_orm( connection, scenario, context, iterations, warmup, recorder )
+                result = { 'orm': orm, 'raw': None, 'overhead_ms': None, 'overhead': None }
+                if replay and scenario.replay and statements:
+                    raw = run_raw( connection, scenario, statements, iterations )
+                    result['raw'] = raw
+                    result['overhead_ms'] = orm['mean_ms'] - raw['mean_ms']
+                    result['overhead'] = result['overhead_ms'] / orm['mean_ms'] if orm['mean_ms'] else None
+                result['peak_rss'] = peak_rss()
+                results[scenario.name] = result
+                if progress is not None:
+                    progress( scenario.name, result )
+    finally:
+        if not keep:
+            drop_schema( connection )
+    return results
@@ -46,7 +46,7 @@ setup (
     maintainer_email  = 'bimal.jha1@ibm.com',
     url               = 'http://pypi.python.org/pypi/ibm_db_django/',
     keywords          = 'django ibm_db_django backends adapter IBM Data Servers database db2',
-    packages          = ['ibm_db_django'],
+    packages          = ['ibm_db_django', 'ibm_db_django.management', 'ibm_db_django.management.commands'],
     classifiers       = [ _IS_JYTHON and 'Development Status :: 4 - Beta' or 'Development Status :: 5 - Production/Stable',
                          'Intended Audience :: Developers',
                          'License :: OSI Approved :: Apache Software License',
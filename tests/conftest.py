@@ -0,0 +1,78 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+"""
+Settings of the test suite, run with python -m pytest tests. The backend runs
+on the stand-in driver (ibm_db_django.standin), so no Db2 server is needed.
+"""
+
+import django
+from django.conf import settings
+
+def pytest_configure( config ):
+    settings.configure(
+        DATABASES = {
+            'default': {
+                'ENGINE': 'ibm_db_django',
+                'NAME': 'ibm_db_django_tests',
+                'USER': 'db2inst1',
+                'PASSWORD': 'password',
+            },
+            # The same database, with the tuning options of the backend set
+            # low enough for small tests to reach them.
+            'tuned': {
+                'ENGINE': 'ibm_db_django',
+                'NAME': 'ibm_db_django_tests',
+                'USER': 'db2inst1',
+                'PASSWORD': 'password',
+                'OPTIONS': {
+                    'STATEMENT_CACHE_SIZE': 20,
+                    'FETCH_BLOCK_SIZE': 7,
+                    'EXECUTEMANY_CHUNK_SIZE': 10,
+                    'IN_LIST_STRATEGY': 'temp_table',
+                    'IN_LIST_THRESHOLD': 50,
+                },
+            },
+            # The same database, with the async ORM reads run on two worker
+            # threads of ibm_db_django.aio.
+            'workers': {
+                'ENGINE': 'ibm_db_django',
+                'NAME': 'ibm_db_django_tests',
+                'USER': 'db2inst1',
+                'PASSWORD': 'password',
+                'OPTIONS': {
+                    'ASYNC_WORKERS': 2,
+                },
+            },
+            # The same database, with a HistogramCollector collecting the
+            # statements of the alias and a slow query log taking all of them.
+            'instrumented': {
+                'ENGINE': 'ibm_db_django',
+                'NAME': 'ibm_db_django_tests',
+                'USER': 'db2inst1',
+                'PASSWORD': 'password',
+                'OPTIONS': {
+                    'INSTRUMENTATION': 'ibm_db_django.instrumentation.HistogramCollector',
+                    'SLOW_QUERY_LOG': { 'THRESHOLD': 0 },
+                },
+            },
+        },
+        INSTALLED_APPS = [ 'tests.testapp' ],
+        USE_TZ = False,
+        IBM_DB_DJANGO_STANDIN = True,
+    )
+    django.setup()
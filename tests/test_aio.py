@@ -0,0 +1,146 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+"""
+ibm_db_django.aio: the worker threads of WorkerPool, AsyncCursor and the
+async ORM reads which base.py routes through the pool of an alias with
+OPTIONS['ASYNC_WORKERS'], unless the caller's connection is in a transaction.
+"""
+
+import asyncio
+import threading
+
+from asgiref.sync import async_to_sync
+from django.db import connections, transaction
+
+from ibm_db_django import aio
+
+from .testapp.models import Item
+from .utils import TableTestCase
+
+class WorkerPoolTests( TableTestCase ):
+
+    @classmethod
+    def tearDownClass( cls ):
+        aio.close_pools()
+        super( WorkerPoolTests, cls ).tearDownClass()
+
+    def test_run_on_a_worker_thread( self ):
+        pool = aio.WorkerPool( 'workers', 1 )
+        try:
+            name = asyncio.run( pool.run( lambda: threading.current_thread().name ) )
+        finally:
+            pool.close()
+        self.assertTrue( name.startswith( 'ibm_db_django-workers-0' ) )
+        self.assertEqual( pool.stats()['checkouts'], 1 )
+
+    # A task waits for a worker without blocking the loop, and gets it when
+    # the one holding it releases it.
+    def test_acquire_waits_for_a_release( self ):
+        pool = aio.WorkerPool( 'workers', 1 )
+        async def scenario():
+            held = await pool.acquire()
+            waiting = asyncio.ensure_future( pool.acquire() )
+            await asyncio.sleep( 0 )
+            self.assertEqual( pool.stats()['waiting'], 1 )
+            pool.release( held )
+            self.assertIs( await waiting, held )
+            pool.release( held )
+        try:
+            asyncio.run( scenario() )
+        finally:
+            pool.close()
+        stats = pool.stats()
+        self.assertEqual( ( stats['checkouts'], stats['waits'], stats['idle'] ), ( 2, 1, 1 ) )
+
+    def test_cancelled_waiter_does_not_keep_the_worker( self ):
+        pool = aio.WorkerPool( 'workers', 1 )
+        async def scenario():
+            held = await pool.acquire()
+            waiting = asyncio.ensure_future( pool.acquire() )
+            await asyncio.sleep( 0 )
+            waiting.cancel()
+            await asyncio.sleep( 0 )
+            pool.release( held )
+        try:
+            asyncio.run( scenario() )
+        finally:
+            pool.close()
+        self.assertEqual( pool.stats()['idle'], 1 )
+
+class AsyncCursorTests( TableTestCase ):
+    models = ( Item, )
+
+    @classmethod
+    def tearDownClass( cls ):
+        aio.close_pools()
+        super( AsyncCursorTests, cls ).tearDownClass()
+
+    def test_execute_and_iterate( self ):
+        Item.objects.bulk_create( [ Item( name = 'c%02d' % index, qty = index ) for index in range( 12 ) ] )
+        quote = connections['workers'].ops.quote_name
+        sql = 'SELECT %s FROM %s WHERE %s >= %%s ORDER BY %s' % (
+            quote( 'qty' ), quote( Item._meta.db_table ), quote( 'qty' ), quote( 'qty' ) )
+        async def scenario():
+            async with aio.cursor( 'workers' ) as cursor:
+                await cursor.execute( sql, [ 2 ] )
+                first = await cursor.fetchone()
+                rest = [ row async for row in cursor ]
+            return cursor, first, rest
+        cursor, first, rest = asyncio.run( scenario() )
+        self.assertEqual( first, ( 2, ) )
+        self.assertEqual( rest, [ ( qty, ) for qty in range( 3, 12 ) ] )
+        self.assertTrue( cursor.closed )
+        self.assertEqual( aio.get_pool( 'workers' ).stats()['idle'], 2 )
+
+class ORMReadTests( TableTestCase ):
+    models = ( Item, )
+
+    @classmethod
+    def tearDownClass( cls ):
+        aio.close_pools()
+        super( ORMReadTests, cls ).tearDownClass()
+
+    def checkouts( self ):
+        return aio.get_pool( 'workers' ).stats()['checkouts']
+
+    def test_reads_go_to_the_pool( self ):
+        Item.objects.bulk_create( [ Item( name = 'r%d' % index, qty = index ) for index in range( 3 ) ] )
+        items = Item.objects.using( 'workers' )
+        async def reads():
+            return ( await items.acount(), await items.filter( qty = 1 ).aexists(),
+                     ( await items.aget( qty = 2 ) ).name, [ item.name async for item in items.order_by( 'qty' ) ] )
+        before = self.checkouts()
+        self.assertEqual( async_to_sync( reads )(), ( 3, True, 'r2', [ 'r0', 'r1', 'r2' ] ) )
+        self.assertEqual( self.checkouts() - before, 4 )
+
+    # Inside atomic() the read runs on the caller's connection and sees its
+    # uncommitted rows, which no worker connection can.
+    def test_reads_inside_atomic_stay_on_the_connection( self ):
+        items = Item.objects.using( 'workers' )
+        async def count():
+            return await items.acount()
+        before = self.checkouts()
+        with transaction.atomic( using = 'workers' ):
+            items.create( name = 'a' )
+            self.assertTrue( aio.in_transaction( 'workers' ) )
+            self.assertEqual( async_to_sync( count )(), 1 )
+            transaction.set_rollback( True, using = 'workers' )
+        self.assertEqual( self.checkouts(), before )
+        self.assertFalse( aio.in_transaction( 'workers' ) )
+        self.assertEqual( async_to_sync( count )(), 0 )
+        self.assertEqual( self.checkouts() - before, 1 )
@@ -0,0 +1,199 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+"""
+Connections: the process wide pool of OPTIONS['POOL'] and the is_usable()
+check which trusts a recent successful statement for USABLE_WINDOW seconds.
+"""
+
+import copy
+import threading
+import time
+import unittest
+from unittest import mock
+
+from django.db import connection, utils
+
+from ibm_db_django import dialect, pybase
+from ibm_db_django.base import DatabaseWrapper
+
+class StandinConnection( object ):
+    """
+    What ConnectionPool uses of an ibm_db_dbi connection.
+    """
+    def __init__( self, number ):
+        self.number = number
+        self.conn_handler = number
+        self.closed = False
+        self.rollbacks = 0
+
+    def rollback( self ):
+        self.rollbacks += 1
+
+    def close( self ):
+        self.closed = True
+
+class ConnectionPoolTests( unittest.TestCase ):
+
+    def pool( self, **arguments ):
+        opened = []
+        def connect():
+            opened.append( StandinConnection( len( opened ) ) )
+            return opened[-1]
+        return pybase.ConnectionPool( connect, **arguments ), opened
+
+    def test_acquire_reuses_released_connections( self ):
+        pool, opened = self.pool( max_size = 2 )
+        first = pool.acquire()
+        second = pool.acquire()
+        self.assertEqual( [ first.number, second.number ], [ 0, 1 ] )
+        pool.release( first )
+        self.assertEqual( first.rollbacks, 1 )
+        self.assertIs( pool.acquire(), first )
+        stats = pool.stats()
+        self.assertEqual( ( stats['size'], stats['in_use'], stats['created'], stats['checkouts'] ), ( 2, 2, 2, 3 ) )
+
+    def test_fill_opens_min_size( self ):
+        pool, opened = self.pool( min_size = 2, max_size = 3 )
+        pool.fill()
+        self.assertEqual( ( len( opened ), pool.stats()['idle'] ), ( 2, 2 ) )
+
+    def test_acquire_times_out_when_exhausted( self ):
+        pool, opened = self.pool( max_size = 1, timeout = 0.05 )
+        pool.acquire()
+        with self.assertRaises( pybase.OperationalError ):
+            pool.acquire()
+        stats = pool.stats()
+        self.assertEqual( ( stats['timeouts'], stats['waits'], len( opened ) ), ( 1, 0, 1 ) )
+
+    def test_waiter_gets_the_released_connection( self ):
+        pool, opened = self.pool( max_size = 1, timeout = 5 )
+        held = pool.acquire()
+        acquired = []
+        waiter = threading.Thread( target = lambda: acquired.append( pool.acquire() ) )
+        waiter.start()
+        time.sleep( 0.05 )
+        pool.release( held )
+        waiter.join( 5 )
+        self.assertEqual( acquired, [ held ] )
+        self.assertEqual( len( opened ), 1 )
+
+    def test_idle_connection_is_validated_on_checkout( self ):
+        pool, opened = self.pool( validate_after = 0 )
+        first = pool.acquire()
+        pool.release( first )
+        with mock.patch.object( pybase.Database.ibm_db, 'active', return_value = True ) as active:
+            self.assertIs( pool.acquire(), first )
+        active.assert_called_once_with( first.conn_handler )
+        pool.release( first )
+        with mock.patch.object( pybase.Database.ibm_db, 'active', return_value = False ):
+            second = pool.acquire()
+        self.assertIsNot( second, first )
+        self.assertTrue( first.closed )
+        self.assertEqual( pool.stats()['discarded'], 1 )
+
+    def test_recently_released_connection_is_not_validated( self ):
+        pool, opened = self.pool( validate_after = 30 )
+        pool.release( pool.acquire() )
+        with mock.patch.object( pybase.Database.ibm_db, 'active' ) as active:
+            pool.acquire()
+        active.assert_not_called()
+
+    def test_broken_connection_is_discarded_on_release( self ):
+        pool, opened = self.pool()
+        first = pool.acquire()
+        first.broken = True
+        pool.release( first )
+        self.assertTrue( first.closed )
+        self.assertEqual( ( pool.stats()['size'], pool.stats()['discarded'] ), ( 0, 1 ) )
+
+class PooledWrapperTests( unittest.TestCase ):
+
+    def setUp( self ):
+        settings_dict = copy.deepcopy( connection.settings_dict )
+        settings_dict['OPTIONS'] = { 'POOL': { 'MAX_SIZE': 2 } }
+        self.wrapper = DatabaseWrapper( settings_dict, 'pooled' )
+        self.pools = set( pybase.pools )
+
+    def tearDown( self ):
+        self.wrapper.close()
+        for key in set( pybase.pools ) - self.pools:
+            del pybase.pools[key]
+        dialect.reset( 'pooled' )
+
+    # DatabaseWrapper.close() hands the connection back to the pool, the next
+    # connect takes it out again.
+    def test_close_returns_the_connection( self ):
+        self.wrapper.ensure_connection()
+        pooled = self.wrapper.connection
+        pool = pooled.pool
+        self.assertEqual( pool.stats()['in_use'], 1 )
+        self.wrapper.close()
+        self.assertEqual( ( pool.stats()['in_use'], pool.stats()['idle'] ), ( 0, 1 ) )
+        self.wrapper.ensure_connection()
+        self.assertIs( self.wrapper.connection, pooled )
+        self.assertEqual( pool.stats()['created'], 1 )
+        with self.wrapper.cursor() as cursor:
+            cursor.execute( 'SELECT 1 FROM SYSIBM.SYSDUMMY1' )
+            self.assertEqual( cursor.fetchall(), [ ( 1, ) ] )
+
+class IsUsableTests( unittest.TestCase ):
+
+    def setUp( self ):
+        settings_dict = copy.deepcopy( connection.settings_dict )
+        settings_dict['OPTIONS'] = { 'USABLE_WINDOW': 10 }
+        self.wrapper = DatabaseWrapper( settings_dict, 'usable' )
+        with self.wrapper.cursor() as cursor:
+            cursor.execute( 'SELECT 1 FROM SYSIBM.SYSDUMMY1' )
+
+    def tearDown( self ):
+        self.wrapper.close()
+        dialect.reset( 'usable' )
+
+    def test_driver_is_not_asked_within_the_window( self ):
+        with mock.patch.object( pybase.Database.ibm_db, 'active' ) as active:
+            self.assertTrue( self.wrapper.is_usable() )
+        active.assert_not_called()
+
+    def test_driver_is_asked_after_the_window( self ):
+        self.wrapper.connection.last_activity = time.monotonic() - 11
+        with mock.patch.object( pybase.Database.ibm_db, 'active', return_value = True ) as active:
+            self.assertTrue( self.wrapper.is_usable() )
+            self.assertTrue( self.wrapper.is_usable() )
+        self.assertEqual( active.call_count, 1 )
+        self.wrapper.connection.last_activity = time.monotonic() - 11
+        with mock.patch.object( pybase.Database.ibm_db, 'active', return_value = False ):
+            self.assertFalse( self.wrapper.is_usable() )
+
+    def test_broken_connection_error_makes_it_unusable( self ):
+        error = pybase.OperationalError( '[IBM][CLI Driver] SQL30081N  A communication error has been '
+                                         'detected. SQLSTATE=08001 SQLCODE=-30081' )
+        with mock.patch.object( pybase.DB2CursorWrapper, '_run_statement', side_effect = error ):
+            with self.assertRaises( utils.DatabaseError ):
+                with self.wrapper.cursor() as cursor:
+                    cursor.execute( 'SELECT 1 FROM SYSIBM.SYSDUMMY1' )
+        with mock.patch.object( pybase.Database.ibm_db, 'active' ) as active:
+            self.assertFalse( self.wrapper.is_usable() )
+        active.assert_not_called()
+
+    def test_statement_error_keeps_it_usable( self ):
+        with self.assertRaises( utils.DatabaseError ):
+            with self.wrapper.cursor() as cursor:
+                cursor.execute( 'SELECT NO_SUCH_COLUMN FROM SYSIBM.SYSDUMMY1' )
+        with mock.patch.object( pybase.Database.ibm_db, 'active' ) as active:
+            self.assertTrue( self.wrapper.is_usable() )
+        active.assert_not_called()
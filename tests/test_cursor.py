@@ -0,0 +1,218 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+"""
+DB2CursorWrapper: the per-connection statement cache, the rows fetched
+FETCH_BLOCK_SIZE at a time while a cursor is iterated, executemany()
+bound in chunks of EXECUTEMANY_CHUNK_SIZE rows and the ConversionPlan
+applied to the fetched rows.
+"""
+
+import datetime
+import unittest
+from unittest import mock
+
+from django.db import connections, utils
+from django.test.utils import override_settings
+
+from ibm_db_django.pybase import ConversionPlan, Database, _UTC
+
+from .testapp.models import Item
+from .utils import TableTestCase
+
+class CursorTestCase( TableTestCase ):
+    models = ( Item, )
+
+    def setUp( self ):
+        self.tuned = connections['tuned']
+        quote = self.tuned.ops.quote_name
+        self.table = quote( Item._meta.db_table )
+        self.insert = 'INSERT INTO %s (%s, %s) VALUES (%%s, %%s)' % ( self.table, quote( 'name' ), quote( 'qty' ) )
+        self.select = 'SELECT %s FROM %s ORDER BY %s' % ( quote( 'name' ), self.table, quote( 'name' ) )
+
+    def add_items( self, count ):
+        Item.objects.bulk_create( [ Item( name = 'n%03d' % index, qty = index ) for index in range( count ) ] )
+        return [ ( 'n%03d' % index, ) for index in range( count ) ]
+
+class StatementCacheTests( CursorTestCase ):
+
+    def stats( self ):
+        self.tuned.ensure_connection()
+        return self.tuned.connection.statement_cache.stats()
+
+    def test_repeated_statement_is_served_from_the_cache( self ):
+        self.add_items( 3 )
+        before = self.stats()
+        for _ in range( 3 ):
+            self.assertEqual( Item.objects.using( 'tuned' ).filter( qty__gte = 1 ).count(), 2 )
+        after = self.stats()
+        self.assertEqual( after['misses'] - before['misses'], 1 )
+        self.assertEqual( after['hits'] - before['hits'], 2 )
+
+    def test_ddl_invalidates_the_cache( self ):
+        query = Item.objects.using( 'tuned' ).filter( qty = 1 )
+        query.count()
+        with self.tuned.cursor() as cursor:
+            cursor.execute( 'DECLARE GLOBAL TEMPORARY TABLE SESSION.T (V INTEGER) '
+                            'ON COMMIT PRESERVE ROWS NOT LOGGED WITH REPLACE' )
+        before = self.stats()
+        query.count()
+        self.assertEqual( self.stats()['misses'] - before['misses'], 1 )
+
+    def test_explain_keeps_the_cache( self ):
+        query = Item.objects.using( 'tuned' ).filter( qty = 2 )
+        query.count()
+        with self.tuned.cursor() as cursor:
+            try:
+                cursor.execute( "EXPLAIN PLAN SET QUERYTAG = 'T' FOR SELECT 1 FROM SYSIBM.SYSDUMMY1" )
+            except utils.DatabaseError:
+                pass
+        before = self.stats()
+        query.count()
+        self.assertEqual( self.stats()['hits'] - before['hits'], 1 )
+
+    # A cache hit frees the handle the cursor held for an uncached statement.
+    def test_cache_hit_frees_the_previous_handle( self ):
+        with self.tuned.cursor() as cursor, self.tuned.cursor() as other:
+            cursor.execute( 'DECLARE GLOBAL TEMPORARY TABLE SESSION.T (V INTEGER) '
+                            'ON COMMIT PRESERVE ROWS NOT LOGGED WITH REPLACE' )
+            previous = cursor.cursor.stmt_handler
+            other.execute( self.select )
+            other.fetchall()
+            other.cursor._release_statement()
+            before = self.stats()
+            with mock.patch.object( Database.ibm_db, 'free_stmt', wraps = Database.ibm_db.free_stmt ) as free_stmt:
+                cursor.execute( self.select )
+            self.assertEqual( self.stats()['hits'] - before['hits'], 1 )
+            free_stmt.assert_called_once_with( previous )
+
+    # A cached handle never serves two open result sets at once.
+    def test_open_result_sets_of_one_statement( self ):
+        rows = self.add_items( 20 )
+        with self.tuned.cursor() as first, self.tuned.cursor() as second:
+            first.execute( self.select )
+            second.execute( self.select )
+            read = []
+            for _ in range( 20 ):
+                read.append( ( first.fetchone(), second.fetchone() ) )
+        self.assertEqual( read, list( zip( rows, rows ) ) )
+
+class BufferingTests( CursorTestCase ):
+
+    def test_iteration_reads_blocks( self ):
+        rows = self.add_items( 20 )
+        with self.tuned.cursor() as cursor:
+            cursor.execute( self.select )
+            self.assertEqual( cursor.cursor.arraysize, 7 )
+            self.assertEqual( list( cursor ), rows )
+
+    def test_fetch_carries_on_after_iteration( self ):
+        rows = self.add_items( 20 )
+        with self.tuned.cursor() as cursor:
+            cursor.execute( self.select )
+            iterator = iter( cursor )
+            read = [ next( iterator ) for _ in range( 3 ) ]
+            read.append( cursor.fetchone() )
+            read.extend( cursor.fetchmany( 5 ) )
+            read.extend( cursor.fetchall() )
+        self.assertEqual( read, rows )
+
+    def test_a_new_statement_drops_the_buffer( self ):
+        rows = self.add_items( 10 )
+        with self.tuned.cursor() as cursor:
+            cursor.execute( self.select )
+            next( iter( cursor ) )
+            cursor.execute( self.select )
+            self.assertEqual( cursor.fetchall(), rows )
+
+class ExecutemanyTests( CursorTestCase ):
+
+    def test_rows_are_bound_in_chunks( self ):
+        with self.tuned.cursor() as cursor:
+            cursor.executemany( self.insert, ( ( 'm%02d' % index, index ) for index in range( 25 ) ) )
+            self.assertEqual( [ rows for rows, seconds in cursor.cursor.chunk_timings ], [ 10, 10, 5 ] )
+            self.assertEqual( cursor.rowcount, 25 )
+        self.assertEqual( Item.objects.count(), 25 )
+
+    # With autocommit on, the chunks are committed together.
+    def test_failing_chunk_rolls_back_all_the_chunks( self ):
+        rows = [ ( 'm%02d' % index, index ) for index in range( 25 ) ] + [ ( 'm01', 99 ) ]
+        with self.tuned.cursor() as cursor:
+            with self.assertRaises( utils.IntegrityError ):
+                cursor.executemany( self.insert, rows )
+        self.assertEqual( Item.objects.count(), 0 )
+
+    def test_commit_per_chunk( self ):
+        self.tuned.ensure_connection()
+        self.tuned.connection.executemany_commit_per_chunk = True
+        try:
+            rows = [ ( 'm%02d' % index, index ) for index in range( 25 ) ] + [ ( 'm01', 99 ) ]
+            with self.tuned.cursor() as cursor:
+                with self.assertRaises( utils.IntegrityError ):
+                    cursor.executemany( self.insert, rows )
+        finally:
+            self.tuned.connection.executemany_commit_per_chunk = False
+        self.assertEqual( Item.objects.count(), 20 )
+
+# Description and rows of a result set as the driver returns them.
+DESCRIPTION = [
+    ( 'ID', Database.NUMBER, 10, 10, 10, 0, False ),
+    ( 'NAME', Database.STRING, 20, 20, 20, 0, True ),
+    ( 'AT', Database.DATETIME, 26, 26, 26, 6, True ),
+    ( 'DAY', Database.DATE, 10, 10, 10, 0, True ),
+]
+AT = datetime.datetime( 2024, 5, 1, 12, 30 )
+
+class ConversionPlanTests( unittest.TestCase ):
+
+    def test_nul_characters_are_stripped( self ):
+        plan = ConversionPlan( DESCRIPTION, False )
+        self.assertEqual( plan.strings, ( 1, ) )
+        row = ( 1, 'a\x00b\x00', AT, None )
+        self.assertEqual( plan.apply( [ row ] ), [ ( 1, 'ab', AT, None ) ] )
+
+    def test_rows_without_fix_ups_are_kept( self ):
+        plan = ConversionPlan( DESCRIPTION, False )
+        row = ( 1, 'ab', AT, None )
+        self.assertIs( plan.apply( [ row ] )[0], row )
+
+    def test_timestamps_are_made_aware_with_use_tz( self ):
+        plan = ConversionPlan( DESCRIPTION, True )
+        self.assertEqual( plan.datetimes, ( 2, ) )
+        aware = AT.replace( tzinfo = _UTC )
+        converted = plan.apply( [ ( 1, 'a', AT, None ), ( 2, 'b', None, None ), ( 3, 'c', aware, None ) ] )
+        self.assertEqual( [ row[2] for row in converted ], [ aware, None, aware ] )
+        self.assertEqual( converted[0][2].tzinfo, _UTC )
+        self.assertIsNone( ConversionPlan( DESCRIPTION, False ).apply( [ ( 1, 'a', AT, None ) ] )[0][2].tzinfo )
+
+    def test_noop_returns_the_rows( self ):
+        description = [ column for column in DESCRIPTION if column[1] is not Database.STRING ]
+        plan = ConversionPlan( description, False )
+        self.assertTrue( plan.noop )
+        rows = [ ( 1, AT, None ) ]
+        self.assertIs( plan.apply( rows ), rows )
+        self.assertFalse( ConversionPlan( description, True ).noop )
+
+    # The cursor builds one plan per result set and rebuilds it when USE_TZ changes.
+    def test_cursor_keeps_the_plan_of_the_result_set( self ):
+        with connections['default'].cursor() as cursor:
+            cursor.execute( 'SELECT CAST(%s AS VARCHAR(10)) AS S FROM SYSIBM.SYSDUMMY1', [ 'a\x00b' ] )
+            plan = cursor.cursor._conversion_plan()
+            self.assertIs( cursor.cursor._conversion_plan(), plan )
+            with override_settings( USE_TZ = True ):
+                self.assertIsNot( cursor.cursor._conversion_plan(), plan )
+            self.assertEqual( cursor.fetchall(), [ ( 'ab', ) ] )
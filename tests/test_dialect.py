@@ -0,0 +1,114 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+"""
+Server flavour and version parsing of ibm_db_django.dialect, and the
+profiles kept per database alias.
+"""
+
+import unittest
+
+from ibm_db_django import dialect
+
+# ( DBMS version string, parsed version )
+VERSIONS = [
+    ( '11.05.0900', ( 11, 5, 900 ) ),
+    ( '11.01.0000', ( 11, 1, 0 ) ),
+    ( ' 12.01.0000 ', ( 12, 1, 0 ) ),
+    ( 'DSN12015', ( 12, 1, 5 ) ),
+    ( 'DSN11015', ( 11, 1, 5 ) ),
+    ( 'DSN1301', ( 13, 1, 0 ) ),
+    ( 'SQL11055', ( 11, 5, 5 ) ),
+    ( 'SQL10050', ( 10, 5, 0 ) ),
+    ( '07.05.0000', ( 7, 5, 0 ) ),
+    ( 'V7R4M0', ( 7, 4, 0 ) ),
+]
+
+# ( dbms_name, flavour )
+FLAVOURS = [
+    ( 'DB2', dialect.ZOS ),
+    ( 'AS', dialect.IBMI ),
+    ( 'DB2/LINUXX8664', dialect.LUW ),
+    ( 'DB2/NT64', dialect.LUW ),
+    ( 'DB2/AIX64', dialect.LUW ),
+]
+
+# ( dbms_name, version, expected capabilities )
+CAPABILITIES = [
+    ( 'DB2/LINUXX8664', ( 11, 5, 0 ), { 'supports_limit_offset': True, 'supports_boolean': True,
+                                        'supports_final_table': True, 'supports_multirow_insert': True } ),
+    ( 'DB2/LINUXX8664', ( 10, 5, 0 ), { 'supports_limit_offset': False, 'supports_regexp_like': False } ),
+    ( 'DB2', ( 12, 1, 5 ), { 'supports_multirow_insert': False, 'supports_final_table': True,
+                             'supports_regexp_like': False } ),
+    ( 'AS', ( 7, 5, 0 ), { 'supports_boolean': True, 'supports_regexp_like': True } ),
+    ( 'AS', ( 7, 0, 0 ), { 'supports_final_table': False, 'supports_regexp_like': False } ),
+]
+
+class ParseTests( unittest.TestCase ):
+
+    def test_parse_version( self ):
+        for text, version in VERSIONS:
+            with self.subTest( text = text ):
+                self.assertEqual( dialect.parse_version( text ), version )
+
+    def test_flavour_of( self ):
+        for dbms_name, flavour in FLAVOURS:
+            with self.subTest( dbms_name = dbms_name ):
+                self.assertEqual( dialect.flavour_of( dbms_name ), flavour )
+
+    def test_capabilities( self ):
+        for dbms_name, version, capabilities in CAPABILITIES:
+            profile = dialect.DialectProfile.build( dbms_name, version )
+            for name, value in capabilities.items():
+                with self.subTest( dbms_name = dbms_name, version = version, capability = name ):
+                    self.assertEqual( getattr( profile, name ), value )
+
+class ProfileTests( unittest.TestCase ):
+
+    def tearDown( self ):
+        dialect.reset( 'first' )
+        dialect.reset( 'second' )
+
+    def test_register_per_alias( self ):
+        zos = dialect.register( 'first', 'DB2', ( 12, 1, 5 ) )
+        luw = dialect.register( 'second', 'DB2/LINUXX8664', ( 11, 5, 0 ) )
+        self.assertTrue( zos.is_zos )
+        self.assertTrue( luw.is_luw )
+        self.assertIs( dialect.get_profile( 'first' ), zos )
+        self.assertIs( dialect.get_profile( 'second' ), luw )
+
+    # The first profile registered for an alias wins.
+    def test_first_registration_wins( self ):
+        first = dialect.register( 'first', 'DB2', ( 12, 1, 5 ) )
+        self.assertIs( dialect.register( 'first', 'AS', ( 7, 5, 0 ) ), first )
+
+    def test_reset_one_alias( self ):
+        dialect.register( 'first', 'DB2', ( 12, 1, 5 ) )
+        dialect.register( 'second', 'AS', ( 7, 5, 0 ) )
+        dialect.reset( 'first' )
+        self.assertIsNone( dialect.get_profile( 'first' ) )
+        self.assertTrue( dialect.get_profile( 'second' ).is_ibmi )
+        self.assertTrue( dialect.register( 'first', 'AS', ( 7, 5, 0 ) ).is_ibmi )
+
+    def test_reset_all_aliases( self ):
+        saved = dict( dialect.profiles )
+        try:
+            dialect.register( 'first', 'DB2', ( 12, 1, 5 ) )
+            dialect.reset()
+            self.assertEqual( dialect.profiles, {} )
+        finally:
+            dialect.profiles.update( saved )
@@ -0,0 +1,138 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+"""
+ibm_db_django.explain and QuerySet.explain(). The stand-in driver has no
+explain tables, the rows Db2 would leave in them are canned responses.
+"""
+
+import json
+import unittest
+
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+
+from ibm_db_django import explain, standin
+
+from .testapp.models import Item
+from .utils import TableTestCase
+
+# A nested loop join of a table scan and an index scan of ITEM.
+STATEMENT = (
+    ( 'EXPLAIN_REQUESTER', 'EXPLAIN_TIME', 'SOURCE_NAME', 'SOURCE_SCHEMA', 'SOURCE_VERSION', ( 'STMTNO', 'INTEGER' ),
+      ( 'SECTNO', 'INTEGER' ), 'STATEMENT_TYPE', ( 'TOTAL_COST', 'DOUBLE' ) ),
+    [ ( 'DB2INST1', '2026-01-01-00.00.00.000000', 'SQLC2P31', 'NULLID', '', 1, 1, 'Q', 15.5 ) ],
+)
+OPERATORS = (
+    ( ( 'OPERATOR_ID', 'INTEGER' ), 'OPERATOR_TYPE', ( 'TOTAL_COST', 'DOUBLE' ), ( 'IO_COST', 'DOUBLE' ),
+      ( 'CPU_COST', 'DOUBLE' ), ( 'FIRST_ROW_COST', 'DOUBLE' ) ),
+    [ ( 1, 'RETURN', 15.5, 2.0, 90000.0, 7.0 ),
+      ( 2, 'NLJOIN', 15.0, 2.0, 80000.0, 7.0 ),
+      ( 3, 'TBSCAN', 8.25, 1.0, 40000.0, 6.5 ),
+      ( 4, 'IXSCAN ', 6.0, 1.0, 30000.0, 6.0 ) ],
+)
+STREAMS = (
+    ( 'SOURCE_TYPE', ( 'SOURCE_ID', 'INTEGER' ), 'TARGET_TYPE', ( 'TARGET_ID', 'INTEGER' ), 'OBJECT_SCHEMA',
+      'OBJECT_NAME', ( 'STREAM_COUNT', 'DOUBLE' ) ),
+    [ ( 'O', 2, 'O', 1, None, None, 10.0 ),
+      ( 'O', 3, 'O', 2, None, None, 100.0 ),
+      ( 'O', 4, 'O', 2, None, None, 1.0 ),
+      ( 'D', -1, 'O', 3, 'DB2INST1 ', 'ITEM      ', 1000.0 ),
+      ( 'D', -1, 'O', 4, 'DB2INST1 ', 'ITEM_PK   ', 1000.0 ) ],
+)
+
+TEXT = [
+    'Total cost: 15.50',
+    'RETURN (1)  cost=15.50  rows=10',
+    '  NLJOIN (2)  cost=15  rows=10',
+    '    TBSCAN (3)  cost=8.25  rows=100  on DB2INST1.ITEM',
+    '    IXSCAN (4)  cost=6  rows=1  index DB2INST1.ITEM_PK',
+    'Join methods: NLJOIN',
+    'Indexes used: DB2INST1.ITEM_PK',
+]
+
+class ExplainTablesMixin( object ):
+
+    def setUp( self ):
+        super( ExplainTablesMixin, self ).setUp()
+        standin.add_response( r'^EXPLAIN PLAN', () )
+        standin.add_response( r'\bFROM EXPLAIN_STATEMENT\b', *STATEMENT )
+        standin.add_response( r'\bFROM EXPLAIN_OPERATOR\b', *OPERATORS )
+        standin.add_response( r'\bFROM EXPLAIN_STREAM\b', *STREAMS )
+
+    def tearDown( self ):
+        standin.clear_responses()
+        super( ExplainTablesMixin, self ).tearDown()
+
+class PlanTests( ExplainTablesMixin, unittest.TestCase ):
+
+    def plan( self ):
+        with connection.cursor() as cursor:
+            return explain.explain( cursor, 'SELECT "ID" FROM "ITEM" WHERE "ID" = ?' )
+
+    def test_operators_and_streams( self ):
+        plan = self.plan()
+        self.assertEqual( ( plan.statement_type, plan.total_cost ), ( 'Q', 15.5 ) )
+        self.assertEqual( plan.root.type, 'RETURN' )
+        self.assertEqual( plan.operators[2].inputs, [ 3, 4 ] )
+        self.assertEqual( [ plan.operators[id].cardinality for id in ( 1, 2, 3, 4 ) ], [ 10.0, 10.0, 100.0, 1.0 ] )
+        self.assertEqual( plan.operators[3].objects, [ ( 'DB2INST1', 'ITEM' ) ] )
+        self.assertEqual( plan.join_methods, [ 'NLJOIN' ] )
+        self.assertEqual( plan.indexes, [ 'DB2INST1.ITEM_PK' ] )
+
+    def test_summary_and_text( self ):
+        plan = self.plan()
+        self.assertEqual( plan.summary(), { 'total_cost': 15.5, 'table_scans': 1, 'index_scans': 1,
+                                            'indexes': [ 'DB2INST1.ITEM_PK' ] } )
+        self.assertEqual( plan.text_lines(), TEXT )
+
+    def test_as_dict( self ):
+        tree = self.plan().as_dict()['plan']
+        self.assertEqual( tree['operator'], 'RETURN' )
+        join = tree['inputs'][0]
+        self.assertEqual( [ child['operator'] for child in join['inputs'] ], [ 'TBSCAN', 'IXSCAN' ] )
+        self.assertEqual( join['inputs'][0]['tables'], [ 'DB2INST1.ITEM' ] )
+        self.assertEqual( join['inputs'][1]['indexes'], [ 'DB2INST1.ITEM_PK' ] )
+
+    def test_no_plan( self ):
+        standin.add_response( r'\bFROM EXPLAIN_STATEMENT\b', STATEMENT[0] )
+        self.assertIsNone( self.plan() )
+
+class ExplainQueryTests( ExplainTablesMixin, TableTestCase ):
+    models = ( Item, )
+
+    def explained( self, queryset, **options ):
+        with CaptureQueriesContext( connections[queryset.db] ) as queries:
+            text = queryset.explain( **options )
+        return text, [ query['sql'] for query in queries.captured_queries if query['sql'].startswith( 'EXPLAIN' ) ]
+
+    def test_text_and_json( self ):
+        text, statements = self.explained( Item.objects.filter( qty = 3 ) )
+        self.assertEqual( text.splitlines(), TEXT )
+        self.assertEqual( len( statements ), 1 )
+        self.assertIn( 'FOR SELECT', statements[0] )
+        text, statements = self.explained( Item.objects.filter( qty = 3 ), format = 'json' )
+        self.assertEqual( json.loads( text )['total_cost'], 15.5 )
+
+    # A large IN list is staged before the EXPLAIN, which names the staged
+    # table instead of a marker.
+    def test_staged_rows_are_explained_as_executed( self ):
+        queryset = Item.objects.using( 'tuned' ).filter( qty__in = range( 100 ) )
+        text, statements = self.explained( queryset )
+        self.assertEqual( text.splitlines(), TEXT )
+        self.assertIn( 'FROM SESSION.DJANGO_STAGED_0)', statements[0] )
+        self.assertNotIn( 'FROM ?', statements[0] )
@@ -0,0 +1,147 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+"""
+Inserts and upserts: primary keys returned from the FINAL TABLE of an
+INSERT, the MERGE of bulk_create() with ignore_conflicts/update_conflicts and
+the MERGE of bulk_update().
+"""
+
+import threading
+
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+
+from ibm_db_django import dialect
+
+from .testapp.models import Item, Pair
+from .utils import TableTestCase, statements
+
+class FinalTableTests( TableTestCase ):
+    models = ( Item, )
+
+    def test_create_returns_the_pk( self ):
+        with CaptureQueriesContext( connection ) as queries:
+            item = Item.objects.create( name = 'a', qty = 1 )
+        self.assertIsNotNone( item.pk )
+        self.assertIn( 'FROM FINAL TABLE (INSERT', statements( queries )[-1] )
+        self.assertEqual( Item.objects.get( pk = item.pk ).name, 'a' )
+
+    def test_bulk_create_returns_the_pks_in_order( self ):
+        with CaptureQueriesContext( connection ) as queries:
+            items = Item.objects.bulk_create( [ Item( name = 'b%d' % index, qty = index ) for index in range( 5 ) ] )
+        executed = statements( queries )
+        self.assertEqual( len( executed ), 1 )
+        self.assertIn( 'ORDER BY INPUT SEQUENCE', executed[0] )
+        self.assertEqual( len( set( item.pk for item in items ) ), 5 )
+        for item in items:
+            self.assertEqual( Item.objects.get( pk = item.pk ).name, item.name )
+
+    # A thread's connection object takes the flags from the profile of the
+    # alias, before it has connected itself.
+    def test_flags_of_a_new_thread_follow_the_profile( self ):
+        connection.ensure_connection()
+        saved = dialect.profiles['default']
+        dialect.profiles['default'] = dialect.DialectProfile.build( 'DB2', ( 12, 1, 5 ) )
+        seen = []
+        def work():
+            thread_connection = connections['default']
+            try:
+                features = thread_connection.features
+                seen.append( ( thread_connection.connection is None, features.has_bulk_insert,
+                               features.can_return_rows_from_bulk_insert, features.can_return_columns_from_insert ) )
+                items = Item.objects.bulk_create( [ Item( name = 'z%d' % index ) for index in range( 3 ) ] )
+                seen.append( len( items ) )
+            finally:
+                thread_connection.close()
+        try:
+            thread = threading.Thread( target = work )
+            thread.start()
+            thread.join()
+        finally:
+            dialect.profiles['default'] = saved
+        self.assertEqual( seen, [ ( True, False, False, True ), 3 ] )
+        self.assertEqual( Item.objects.filter( name__startswith = 'z' ).count(), 3 )
+
+class MergeTests( TableTestCase ):
+    models = ( Item, Pair )
+
+    def values( self ):
+        return dict( Item.objects.values_list( 'name', 'qty' ) )
+
+    def test_ignore_conflicts( self ):
+        Item.objects.create( name = 'a', qty = 1 )
+        with CaptureQueriesContext( connection ) as queries:
+            Item.objects.bulk_create( [ Item( name = 'a', qty = 2 ), Item( name = 'b', qty = 3 ) ], ignore_conflicts = True )
+        self.assertEqual( [ sql[:10] for sql in statements( queries ) ], [ 'MERGE INTO' ] )
+        self.assertEqual( self.values(), { 'a': 1, 'b': 3 } )
+
+    def test_ignore_conflicts_keeps_the_first_duplicate( self ):
+        Item.objects.bulk_create( [ Item( name = 'x', qty = 1 ), Item( name = 'x', qty = 2 ) ], ignore_conflicts = True )
+        self.assertEqual( self.values(), { 'x': 1 } )
+
+    def test_update_conflicts( self ):
+        Item.objects.create( name = 'a', qty = 1 )
+        Item.objects.bulk_create( [ Item( name = 'a', qty = 5 ), Item( name = 'c', qty = 6 ) ], update_conflicts = True,
+                                  unique_fields = [ 'name' ], update_fields = [ 'qty' ] )
+        self.assertEqual( self.values(), { 'a': 5, 'c': 6 } )
+
+    def test_update_conflicts_keeps_the_last_duplicate( self ):
+        Item.objects.bulk_create( [ Item( name = 'y', qty = 1 ), Item( name = 'y', qty = 2 ) ], update_conflicts = True,
+                                  unique_fields = [ 'name' ], update_fields = [ 'qty' ] )
+        self.assertEqual( self.values(), { 'y': 2 } )
+
+    def test_update_conflicts_on_unset_pk_inserts( self ):
+        Item.objects.bulk_create( [ Item( name = 'z1', qty = 1 ), Item( name = 'z2', qty = 2 ) ], update_conflicts = True,
+                                  unique_fields = [ 'pk' ], update_fields = [ 'qty' ] )
+        self.assertEqual( self.values(), { 'z1': 1, 'z2': 2 } )
+
+    def test_update_conflicts_on_composite_key( self ):
+        Pair.objects.create( a = 1, b = 'k', v = 1 )
+        Pair.objects.bulk_create( [ Pair( a = 1, b = 'k', v = 7 ), Pair( a = 2, b = 'k', v = 8 ) ], update_conflicts = True,
+                                  unique_fields = [ 'a', 'b' ], update_fields = [ 'v' ] )
+        self.assertEqual( sorted( Pair.objects.values_list( 'a', 'b', 'v' ) ), [ ( 1, 'k', 7 ), ( 2, 'k', 8 ) ] )
+
+    def test_bulk_update( self ):
+        items = Item.objects.bulk_create( [ Item( name = 'u%d' % index, qty = index ) for index in range( 4 ) ] )
+        for item in items:
+            item.qty += 10
+        with CaptureQueriesContext( connection ) as queries:
+            updated = Item.objects.bulk_update( items, [ 'qty' ] )
+        self.assertEqual( updated, 4 )
+        self.assertEqual( [ sql[:10] for sql in statements( queries ) ], [ 'MERGE INTO' ] )
+        self.assertEqual( self.values(), { 'u0': 10, 'u1': 11, 'u2': 12, 'u3': 13 } )
+
+    # Two source rows matching one target row fail a MERGE (SQL0788N), so
+    # the first object of a primary key wins, as with an UPDATE per object.
+    def test_bulk_update_duplicate_objects( self ):
+        item = Item.objects.create( name = 'd', qty = 1 )
+        first = Item.objects.get( pk = item.pk )
+        second = Item.objects.get( pk = item.pk )
+        first.qty = 100
+        second.qty = 200
+        Item.objects.bulk_update( [ first, second ], [ 'qty' ] )
+        self.assertEqual( self.values(), { 'd': 100 } )
+
+    def test_bulk_update_batches( self ):
+        items = Item.objects.bulk_create( [ Item( name = 'v%d' % index, qty = index ) for index in range( 10 ) ] )
+        for item in items:
+            item.qty = -item.qty
+        with CaptureQueriesContext( connection ) as queries:
+            Item.objects.bulk_update( items, [ 'qty' ], batch_size = 4 )
+        self.assertEqual( [ sql[:10] for sql in statements( queries ) ], [ 'MERGE INTO' ] * 3 )
+        self.assertEqual( sorted( self.values().values() ), sorted( -index for index in range( 10 ) ) )
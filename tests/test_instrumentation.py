@@ -0,0 +1,126 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+"""
+ibm_db_django.instrumentation: statement fingerprints, the latency
+histogram of HistogramCollector and the conversion time of the ORM
+converters added to the statistics of a statement.
+"""
+
+import datetime
+import time
+import unittest
+from unittest import mock
+
+from django.db import connections
+
+from ibm_db_django import instrumentation
+from ibm_db_django.operations import DatabaseOperations
+
+from .testapp.models import Item
+from .utils import TableTestCase
+
+# ( SQL, fingerprint )
+FINGERPRINTS = [
+    ( 'SELECT "A" FROM "T" WHERE "B" = \'x\'\'y\' AND "C" = 12',
+      'SELECT "A" FROM "T" WHERE "B" = ? AND "C" = ?' ),
+    ( 'SELECT "A" FROM "T" WHERE "C" > 1.5 OR "C" < 2E-3', 'SELECT "A" FROM "T" WHERE "C" > ? OR "C" < ?' ),
+    ( 'SELECT "A" FROM "T" WHERE "C" IN (?, ?, ?)', 'SELECT "A" FROM "T" WHERE "C" IN (...)' ),
+    ( 'SELECT "A" FROM "T" WHERE "C" IN (1, 2)', 'SELECT "A" FROM "T" WHERE "C" IN (...)' ),
+    ( 'SELECT "A" FROM "T" WHERE "C" IN (?)', 'SELECT "A" FROM "T" WHERE "C" IN (...)' ),
+    ( 'INSERT INTO "T" ("A", "B") VALUES (?, ?), (?, ?), (?, ?)', 'INSERT INTO "T" ("A", "B") VALUES (...)' ),
+    ( 'SELECT "T1"."A2" FROM "T1"\n   FETCH FIRST 10 ROWS ONLY', 'SELECT "T1"."A2" FROM "T1" FETCH FIRST ? ROWS ONLY' ),
+]
+
+class FingerprintTests( unittest.TestCase ):
+
+    def test_fingerprint( self ):
+        for sql, expected in FINGERPRINTS:
+            with self.subTest( sql = sql ):
+                self.assertEqual( instrumentation.fingerprint( sql ), expected )
+
+    def test_record_fingerprint( self ):
+        record = instrumentation.StatementRecord( 'SELECT 1 FROM "T" WHERE "A" = 5' )
+        self.assertEqual( record.fingerprint, 'SELECT ? FROM "T" WHERE "A" = ?' )
+
+class HistogramTests( unittest.TestCase ):
+
+    def record( self, seconds, sql = 'SELECT ?' ):
+        record = instrumentation.StatementRecord( sql )
+        record.execute = seconds
+        return record
+
+    # A bucket holds the latencies up to and including its bound.
+    def test_bucket_boundaries( self ):
+        bounds = instrumentation.BUCKET_BOUNDS
+        self.assertEqual( bounds[0], 0.0001 )
+        self.assertEqual( len( bounds ), 20 )
+        for seconds, bucket in ( ( 0.0, 0 ), ( bounds[0], 0 ), ( bounds[0] * 1.01, 1 ), ( bounds[1], 1 ),
+                                 ( bounds[-1], 19 ), ( bounds[-1] * 1.01, 20 ), ( 3600.0, 20 ) ):
+            with self.subTest( seconds = seconds ):
+                self.assertEqual( instrumentation._bucket( seconds ), bucket )
+
+    def test_collector_counts_per_fingerprint( self ):
+        collector = instrumentation.HistogramCollector()
+        for seconds in ( 0.00005, 0.0001, 0.00015, 60.0 ):
+            collector.record( self.record( seconds ) )
+        collector.record( self.record( 0.001, 'SELECT "A"' ) )
+        stats = { entry['fingerprint']: entry for entry in collector.snapshot() }
+        self.assertEqual( stats['SELECT ?']['count'], 4 )
+        self.assertEqual( stats['SELECT ?']['buckets'][:2], [ 2, 1 ] )
+        self.assertEqual( stats['SELECT ?']['buckets'][-1], 1 )
+        self.assertEqual( stats['SELECT ?']['max'], 60.0 )
+        self.assertEqual( stats['SELECT ?']['p50'], 0.0001 )
+        self.assertEqual( stats['SELECT "A"']['count'], 1 )
+
+    def test_statements_beyond_the_limit_are_counted_together( self ):
+        collector = instrumentation.HistogramCollector( max_statements = 1 )
+        collector.record( self.record( 0.001, 'SELECT A' ) )
+        collector.record( self.record( 0.001, 'SELECT B' ) )
+        collector.record( self.record( 0.001, 'SELECT C' ) )
+        stats = { entry['fingerprint']: entry['count'] for entry in collector.snapshot() }
+        self.assertEqual( stats, { 'SELECT A': 1, instrumentation.HistogramCollector.OTHER: 2 } )
+
+class ConversionTests( TableTestCase ):
+    models = ( Item, )
+
+    def setUp( self ):
+        connections['instrumented'].ensure_connection()
+        self.collector = instrumentation.collectors['instrumented']
+        self.collector.reset()
+
+    # The converters of the ORM run after the cursor is done; their time is
+    # added to the statistics of the statement which fetched the rows.
+    def test_conversion_time_is_added_to_the_record( self ):
+        Item.objects.bulk_create( [ Item( name = 'v%d' % index, day = datetime.date( 2024, 1, index + 1 ) )
+                                    for index in range( 5 ) ] )
+        original = DatabaseOperations.convert_datefield_value
+        def slow( self, value, expression, connection ):
+            time.sleep( 0.002 )
+            return original( self, value, expression, connection )
+        with mock.patch.object( DatabaseOperations, 'convert_datefield_value', slow ):
+            days = list( Item.objects.using( 'instrumented' ).order_by( 'day' ).values_list( 'day', flat = True ) )
+        self.assertEqual( len( days ), 5 )
+        stats = [ entry for entry in self.collector.snapshot() if entry['conversions'] ]
+        self.assertEqual( len( stats ), 1 )
+        self.assertEqual( ( stats[0]['count'], stats[0]['rows'], stats[0]['conversion_rows'] ), ( 1, 5, 5 ) )
+        self.assertGreaterEqual( stats[0]['phases']['convert'], 0.01 )
+
+    def test_no_conversion_without_converters( self ):
+        Item.objects.create( name = 'w' )
+        self.assertEqual( list( Item.objects.using( 'instrumented' ).values_list( 'qty', flat = True ) ), [ 0 ] )
+        self.assertEqual( [ entry['conversions'] for entry in self.collector.snapshot() ], [ 0 ] )
@@ -0,0 +1,267 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+"""
+How IN lookups are written: composite key lists (TupleIn) as ORed
+equalities, a VALUES table or a staged table of rows, and long lists of
+direct values staged through OPTIONS['IN_LIST_STRATEGY'].
+"""
+
+import datetime
+import json
+from unittest import mock
+
+from django.db import connection, connections, transaction
+from django.test.utils import CaptureQueriesContext
+
+from ibm_db_django import instrumentation, pybase
+from ibm_db_django.pybase import StagedRows
+
+from .testapp.models import Item, Pair
+from .utils import TableTestCase, server_version, statements
+
+# SQL, parameters and the strategy notes of compiling queryset.
+def compiled( queryset ):
+    instrumentation.take_notes()
+    sql, params = queryset.query.get_compiler( using = queryset.db ).as_sql()
+    return sql, params, instrumentation.take_notes()
+
+class TupleInTests( TableTestCase ):
+    models = ( Pair, )
+
+    def setUp( self ):
+        Pair.objects.bulk_create( [ Pair( a = index, b = 'k%d' % ( index % 7 ), v = index ) for index in range( 60 ) ] )
+
+    def keys( self, count ):
+        return [ ( index, 'k%d' % ( index % 7 ) ) for index in range( count ) ] + [ ( 999, 'none' ) ]
+
+    def test_or_for_a_few_rows( self ):
+        queryset = Pair.objects.filter( pk__in = self.keys( 3 ) )
+        sql, params, notes = compiled( queryset )
+        self.assertEqual( notes, ( ( 'tuple_in', 'or' ), ) )
+        self.assertEqual( queryset.count(), 3 )
+
+    def test_values_table( self ):
+        queryset = Pair.objects.filter( pk__in = self.keys( 20 ) )
+        sql, params, notes = compiled( queryset )
+        self.assertEqual( notes, ( ( 'tuple_in', 'values' ), ) )
+        self.assertIn( 'IN (VALUES (CAST(%s AS INTEGER), CAST(%s AS VARCHAR(10)))', sql )
+        self.assertEqual( len( params ), 42 )
+        self.assertEqual( sorted( queryset.values_list( 'a', flat = True ) ), list( range( 20 ) ) )
+
+    def test_staged_above_the_marker_budget( self ):
+        connection.ops.tuple_in_max_markers = 20
+        try:
+            queryset = Pair.objects.filter( pk__in = self.keys( 40 ) )
+            sql, params, notes = compiled( queryset )
+            self.assertEqual( notes, ( ( 'tuple_in', 'staged' ), ) )
+            self.assertIn( 'IN (SELECT V1, V2 FROM %s)', sql )
+            self.assertEqual( len( params ), 1 )
+            self.assertIsInstance( params[0], StagedRows )
+            self.assertEqual( sorted( queryset.values_list( 'a', flat = True ) ), list( range( 40 ) ) )
+        finally:
+            del connection.ops.tuple_in_max_markers
+
+    def test_values_table_on_zos_above_the_marker_budget( self ):
+        connection.ops.tuple_in_max_markers = 20
+        try:
+            with server_version( connection, ( 12, 1, 5 ), 'DB2' ):
+                sql, params, notes = compiled( Pair.objects.filter( pk__in = self.keys( 40 ) ) )
+        finally:
+            del connection.ops.tuple_in_max_markers
+        self.assertEqual( notes, ( ( 'tuple_in', 'values' ), ) )
+        self.assertEqual( len( params ), 82 )
+
+    def test_rows_with_null_are_left_out( self ):
+        queryset = Pair.objects.filter( pk__in = self.keys( 10 ) + [ ( None, 'k1' ) ] )
+        self.assertEqual( queryset.count(), 10 )
+
+class TupleExactTests( TableTestCase ):
+    models = ( Pair, )
+
+    def setUp( self ):
+        Pair.objects.bulk_create( [ Pair( a = index, b = 'k%d' % ( index % 3 ), v = index * 10 ) for index in range( 6 ) ] )
+
+    # A composite key equal to a subquery compares both columns with one row
+    # of the subquery, keeping its ordering.
+    def test_row_value_subquery( self ):
+        subquery = Pair.objects.filter( v__gte = 20 ).order_by( '-v' ).values( 'pk' )[:1]
+        queryset = Pair.objects.filter( pk = subquery )
+        sql, params, notes = compiled( queryset )
+        self.assertEqual( notes, ( ( 'tuple_exact', 'row_value' ), ) )
+        self.assertIn( 'WHERE ("TESTAPP_PAIR"."A", "TESTAPP_PAIR"."B") = (SELECT U0."A", U0."B" FROM "TESTAPP_PAIR" U0 '
+                       'WHERE U0."V" >= %s ORDER BY U0."V" DESC', sql )
+        self.assertEqual( list( params ), [ 20 ] )
+        self.assertEqual( list( queryset.values_list( 'a', 'b' ) ), [ ( 5, 'k2' ) ] )
+
+    def test_row_value_subquery_before_11_1( self ):
+        subquery = Pair.objects.filter( v__lt = 30 ).order_by( 'v' )[:1]
+        with server_version( connection, ( 10, 5, 0 ) ):
+            sql, params, notes = compiled( Pair.objects.filter( pk = subquery ) )
+            self.assertEqual( list( Pair.objects.filter( pk = subquery ).values_list( 'a', 'b' ) ), [ ( 0, 'k0' ) ] )
+        self.assertIn( ') = (SELECT U0."A", U0."B" FROM "TESTAPP_PAIR" U0 WHERE U0."V" < %s ORDER BY U0."V" ASC '
+                       'FETCH FIRST 1 ROWS ONLY)', sql )
+
+class LargeInTests( TableTestCase ):
+    models = ( Item, )
+
+    def setUp( self ):
+        Item.objects.bulk_create( [ Item( name = 'n%03d' % index, qty = index % 4 ) for index in range( 300 ) ] )
+        self.tuned = connections['tuned']
+        self.pks = sorted( Item.objects.values_list( 'pk', flat = True ) )
+
+    def tearDown( self ):
+        self.tuned.settings_dict['OPTIONS']['IN_LIST_STRATEGY'] = 'temp_table'
+        super( LargeInTests, self ).tearDown()
+
+    def test_markers_below_the_threshold( self ):
+        sql, params, notes = compiled( Item.objects.using( 'tuned' ).filter( pk__in = self.pks[:50] ) )
+        self.assertEqual( notes, () )
+        self.assertEqual( len( params ), 50 )
+
+    def test_temp_table( self ):
+        queryset = Item.objects.using( 'tuned' ).filter( pk__in = self.pks[::2] + [ None ] )
+        sql, params, notes = compiled( queryset )
+        self.assertEqual( notes, ( ( 'in_list', 'temp_table' ), ) )
+        self.assertIn( 'IN (SELECT V1 FROM %s)', sql )
+        self.assertEqual( queryset.count(), 150 )
+        self.assertEqual( queryset.exclude( qty = 0 ).count(), 75 )
+
+    def test_string_values( self ):
+        names = [ 'n%03d' % index for index in range( 0, 300, 3 ) ] + [ 'missing' ]
+        self.assertEqual( Item.objects.using( 'tuned' ).filter( name__in = names ).count(), 100 )
+
+    def test_compiling_runs_no_statement( self ):
+        queryset = Item.objects.using( 'tuned' ).filter( pk__in = self.pks )
+        with CaptureQueriesContext( self.tuned ) as queries:
+            str( queryset.query )
+            queryset.query.sql_with_params()
+        self.assertEqual( statements( queries ), [] )
+
+    # The rows of a query still being read are not replaced by a query run
+    # in the meantime.
+    def test_nested_queries_keep_their_rows( self ):
+        evens = Item.objects.using( 'tuned' ).filter( pk__in = self.pks[0::2] )
+        odds = self.pks[1::2]
+        read = 0
+        for item in evens.iterator( chunk_size = 10 ):
+            self.assertIn( item.pk, self.pks[0::2] )
+            read += 1
+            if read % 50 == 0:
+                self.assertEqual( Item.objects.using( 'tuned' ).filter( pk__in = odds ).count(), 150 )
+        self.assertEqual( read, 150 )
+        self.assertEqual( self.tuned.connection.staged_tables, {} )
+
+    # SQL of the statements run on the connection, the staging included.
+    def count_statements( self, queryset ):
+        original = pybase.DB2CursorWrapper._run_statement
+        with mock.patch.object( pybase.DB2CursorWrapper, '_run_statement', autospec = True,
+                                side_effect = original ) as run_statement:
+            count = queryset.count()
+        return count, [ call[0][1] for call in run_statement.call_args_list ]
+
+    # A staged table declared with the same columns before has its rows
+    # deleted, and the statement cache keeps all its statements.
+    def test_staging_keeps_the_statement_cache( self ):
+        other = Item.objects.using( 'tuned' ).filter( qty = 1 )
+        self.assertEqual( self.count_statements( Item.objects.using( 'tuned' ).filter( pk__in = self.pks[:100] ) )[0], 100 )
+        other.count()
+        cache = self.tuned.connection.statement_cache
+        with mock.patch.object( cache, 'invalidate' ) as invalidate:
+            count, executed = self.count_statements( Item.objects.using( 'tuned' ).filter( pk__in = self.pks[100:160] ) )
+            before = cache.stats()['hits']
+            other.count()
+        self.assertEqual( count, 60 )
+        self.assertEqual( [ sql for sql in executed if sql.startswith( ( 'DECLARE', 'DELETE' ) ) ],
+                          [ 'DELETE FROM SESSION.DJANGO_STAGED_0' ] )
+        invalidate.assert_not_called()
+        self.assertEqual( cache.stats()['hits'] - before, 1 )
+
+    # Declaring a table again with other columns drops the statements on it
+    # from the cache, and only those.
+    def test_new_columns_drop_the_statements_on_the_table( self ):
+        Item.objects.using( 'tuned' ).filter( pk__in = self.pks[:100] ).count()
+        other = Item.objects.using( 'tuned' ).filter( qty = 2 )
+        other.count()
+        cache = self.tuned.connection.statement_cache
+        cached = list( cache._handles )
+        self.assertTrue( any( 'DJANGO_STAGED_0' in sql for sql in cached ) )
+        names = [ 'n%03d' % index for index in range( 0, 300, 3 ) ]
+        count, executed = self.count_statements( Item.objects.using( 'tuned' ).filter( name__in = names ) )
+        self.assertEqual( count, 100 )
+        self.assertTrue( executed[0].startswith( 'DECLARE GLOBAL TEMPORARY TABLE SESSION.DJANGO_STAGED_0 (V1 VARCHAR' ) )
+        self.assertEqual( [ sql for sql in cached if sql in cache._handles and 'DJANGO_STAGED_0' in sql ], [] )
+        before = cache.stats()['hits']
+        other.count()
+        self.assertEqual( cache.stats()['hits'] - before, 1 )
+
+    # A table declared in a unit of work which is rolled back is gone; the
+    # next query staging into it declares it again.
+    def test_declare_rolled_back( self ):
+        days = [ datetime.date( 2024, 1, 1 ) + datetime.timedelta( days = index ) for index in range( 60 ) ]
+        Item.objects.filter( pk__in = self.pks[:3] ).update( day = days[0] )
+        with transaction.atomic( using = 'tuned' ):
+            self.assertEqual( Item.objects.using( 'tuned' ).filter( day__in = days ).count(), 3 )
+            transaction.set_rollback( True, using = 'tuned' )
+        count, executed = self.count_statements( Item.objects.using( 'tuned' ).filter( day__in = days[:55] ) )
+        self.assertEqual( count, 3 )
+        self.assertEqual( [ sql.split( ' (' )[0] for sql in executed if sql.startswith( ( 'DECLARE', 'DELETE' ) ) ],
+                          [ 'DELETE FROM SESSION.DJANGO_STAGED_0', 'DECLARE GLOBAL TEMPORARY TABLE SESSION.DJANGO_STAGED_0' ] )
+
+    def test_update_and_delete( self ):
+        self.assertEqual( Item.objects.using( 'tuned' ).filter( pk__in = self.pks[:100] ).update( qty = 9 ), 100 )
+        self.assertEqual( Item.objects.filter( qty = 9 ).count(), 100 )
+        Item.objects.using( 'tuned' ).filter( pk__in = self.pks[:100] ).delete()
+        self.assertEqual( Item.objects.count(), 200 )
+
+    def test_array( self ):
+        self.tuned.settings_dict['OPTIONS']['IN_LIST_STRATEGY'] = 'array'
+        queryset = Item.objects.using( 'tuned' ).filter( pk__in = self.pks[:120] )
+        sql, params, notes = compiled( queryset )
+        self.assertEqual( notes, ( ( 'in_list', 'array' ), ) )
+        self.assertIn( "IN (SELECT T.V FROM JSON_TABLE(CAST(%s AS CLOB) FORMAT JSON, '$[*]' "
+                       "COLUMNS (V INTEGER PATH '$') ERROR ON ERROR) AS T)", sql )
+        self.assertEqual( json.loads( params[-1] ), self.pks[:120] )
+        self.assertEqual( queryset.count(), 120 )
+
+    def test_array_of_strings( self ):
+        self.tuned.settings_dict['OPTIONS']['IN_LIST_STRATEGY'] = 'array'
+        names = [ 'n%03d' % index for index in range( 0, 300, 3 ) ]
+        sql, params, notes = compiled( Item.objects.using( 'tuned' ).filter( name__in = names ) )
+        self.assertIn( "COLUMNS (V VARCHAR", sql )
+        self.assertEqual( Item.objects.using( 'tuned' ).filter( name__in = names ).count(), 100 )
+
+    # A list no longer than the threshold is neither copied nor deduplicated.
+    def test_short_list_not_copied( self ):
+        with mock.patch( 'ibm_db_django.compiler.OrderedSet' ) as ordered_set:
+            sql, params, notes = compiled( Item.objects.using( 'tuned' ).filter( pk__in = self.pks[:50] ) )
+        ordered_set.assert_not_called()
+        self.assertEqual( notes, () )
+        sql, params, notes = compiled( Item.objects.using( 'tuned' ).filter( pk__in = self.pks[:40] * 2 ) )
+        self.assertEqual( notes, () )
+
+    def test_array_needs_11_5( self ):
+        self.tuned.settings_dict['OPTIONS']['IN_LIST_STRATEGY'] = 'array'
+        with server_version( self.tuned, ( 11, 1, 0 ) ):
+            sql, params, notes = compiled( Item.objects.using( 'tuned' ).filter( pk__in = self.pks[:120] ) )
+        self.assertEqual( notes, ( ( 'in_list', 'temp_table' ), ) )
+
+    def test_markers_on_zos( self ):
+        with server_version( self.tuned, ( 12, 1, 5 ), 'DB2' ):
+            sql, params, notes = compiled( Item.objects.using( 'tuned' ).filter( pk__in = self.pks[:120] ) )
+        self.assertEqual( notes, () )
+        self.assertEqual( len( params ), 120 )
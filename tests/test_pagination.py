@@ -0,0 +1,106 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+"""
+Pagination of SQLCompiler.as_sql: ROW_NUMBER() on servers before Db2 11.1,
+OFFSET/FETCH FIRST on later ones, and keyset pagination on both.
+"""
+
+import threading
+
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+
+from ibm_db_django import compiler
+from ibm_db_django.pagination import KeysetPaginator
+
+from .testapp.models import Item
+from .utils import TableTestCase, server_version
+
+OLD_SERVER = ( 10, 5, 0 )
+NEW_SERVER = ( 11, 5, 0 )
+
+class PaginationTests( TableTestCase ):
+    models = ( Item, )
+
+    def setUp( self ):
+        Item.objects.bulk_create( [ Item( name = 'n%02d' % index, qty = index % 3 ) for index in range( 30 ) ] )
+
+    def page( self, version, start, stop ):
+        with server_version( connection, version ), CaptureQueriesContext( connection ) as queries:
+            names = list( Item.objects.order_by( 'name' ).values_list( 'name', flat = True )[start:stop] )
+        return names, queries.captured_queries[-1]['sql']
+
+    def test_row_number_before_11_1( self ):
+        names, sql = self.page( OLD_SERVER, 5, 9 )
+        self.assertEqual( names, [ 'n05', 'n06', 'n07', 'n08' ] )
+        self.assertIn( 'ROW_NUMBER()', sql )
+        self.assertNotIn( 'OFFSET', sql )
+
+    def test_offset_from_11_1( self ):
+        names, sql = self.page( NEW_SERVER, 5, 9 )
+        self.assertEqual( names, [ 'n05', 'n06', 'n07', 'n08' ] )
+        self.assertIn( 'OFFSET', sql )
+        self.assertNotIn( 'ROW_NUMBER()', sql )
+
+    def test_first_rows_before_11_1( self ):
+        names, sql = self.page( OLD_SERVER, 0, 3 )
+        self.assertEqual( names, [ 'n00', 'n01', 'n02' ] )
+        self.assertIn( 'FETCH FIRST 3 ROWS ONLY', sql )
+
+    # The SQL around a page is cached on the quoted column names, not on the
+    # connection, so the connections of other threads use the same entry.
+    def test_template_is_shared_by_threads( self ):
+        compiler._pagination_template.cache_clear()
+        self.assertEqual( self.page( OLD_SERVER, 5, 9 )[0], [ 'n05', 'n06', 'n07', 'n08' ] )
+        names = []
+        def work():
+            thread_connection = connections['default']
+            try:
+                with server_version( thread_connection, OLD_SERVER ):
+                    names.extend( Item.objects.order_by( 'name' ).values_list( 'name', flat = True )[5:9] )
+            finally:
+                thread_connection.close()
+        thread = threading.Thread( target = work )
+        thread.start()
+        thread.join()
+        self.assertEqual( names, [ 'n05', 'n06', 'n07', 'n08' ] )
+        info = compiler._pagination_template.cache_info()
+        self.assertEqual( info.currsize, 1 )
+        self.assertGreaterEqual( info.hits, 1 )
+
+    def test_open_ended_slice_before_11_1( self ):
+        names, sql = self.page( OLD_SERVER, 27, None )
+        self.assertEqual( names, [ 'n27', 'n28', 'n29' ] )
+
+    def test_filtered_page_before_11_1( self ):
+        with server_version( connection, OLD_SERVER ):
+            names = list( Item.objects.filter( qty = 1 ).order_by( '-name' ).values_list( 'name', flat = True )[2:4] )
+        self.assertEqual( names, [ 'n22', 'n19' ] )
+
+    def test_keyset_pages_before_11_1( self ):
+        with server_version( connection, OLD_SERVER ):
+            paginator = KeysetPaginator( Item.objects.order_by( 'qty' ), 7 )
+            page = paginator.page()
+            seen = list( page )
+            while page.has_next():
+                page = paginator.page( after = page.next_cursor )
+                seen.extend( page )
+            back = paginator.page( before = page.previous_cursor )
+        self.assertEqual( [ ( item.qty, item.pk ) for item in seen ],
+                          sorted( ( item.qty, item.pk ) for item in Item.objects.all() ) )
+        self.assertEqual( list( back ), seen[-len( page ) - 7:-len( page )] )
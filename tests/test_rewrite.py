@@ -0,0 +1,222 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+"""
+Format to qmark rewrite of DB2CursorWrapper.rewrite(). The expected SQL and
+parameters of REGEX_REWRITES are the output of the regex based rewrite
+which RewritePlan replaced, for the statement shapes the ORM builds.
+"""
+
+import datetime
+import unittest
+from decimal import Decimal
+
+from django.db import connection
+
+from ibm_db_django import pybase, sqltokenizer
+
+# ( operation, parameters, SQL, bound parameters )
+REGEX_REWRITES = [
+    ( 'SELECT "T"."ID" FROM "T" WHERE "T"."NAME" = %s AND "T"."QTY" > %s', ( 'abc', 3 ),
+      'SELECT "T"."ID" FROM "T" WHERE "T"."NAME" = ? AND "T"."QTY" > ?', ( 'abc', 3 ) ),
+    ( 'SELECT "T"."ID" FROM "T" WHERE "T"."ID" IN (%s, %s, %s)', ( 1, 2, 3 ),
+      'SELECT "T"."ID" FROM "T" WHERE "T"."ID" IN (?, ?, ?)', ( 1, 2, 3 ) ),
+    ( 'SELECT COUNT(%s) AS "C" FROM "T"', ( 1, ),
+      'SELECT COUNT(1) AS "C" FROM "T"', () ),
+    ( 'SELECT SUM("T"."QTY") AS "S" FROM "T" HAVING SUM("T"."QTY") > %s', ( 10, ),
+      'SELECT SUM("T"."QTY") AS "S" FROM "T" HAVING SUM("T"."QTY") > ?', ( 10, ) ),
+    ( 'SELECT MAX(("T"."QTY" * %s)) AS "M" FROM "T" WHERE "T"."NAME" = %s', ( 2, 'x' ),
+      'SELECT MAX(("T"."QTY" * 2)) AS "M" FROM "T" WHERE "T"."NAME" = ?', ( 'x', ) ),
+    ( 'SELECT AVG("T"."QTY") AS "A", MIN("T"."QTY") AS "B" FROM "T" WHERE "T"."NAME" = %s', ( 'z', ),
+      'SELECT AVG("T"."QTY") AS "A", MIN("T"."QTY") AS "B" FROM "T" WHERE "T"."NAME" = ?', ( 'z', ) ),
+    ( 'SELECT COALESCE("T"."NAME", %s) AS "N" FROM "T"', ( 'none', ),
+      'SELECT COALESCE("T"."NAME", \'none\') AS "N" FROM "T"', () ),
+    ( 'SELECT ("T"."QTY" + %s) AS "Q" FROM "T" WHERE "T"."ID" = %s', ( 5, 7 ),
+      'SELECT ("T"."QTY" + 5) AS "Q" FROM "T" WHERE "T"."ID" = ?', ( 7, ) ),
+    ( 'SELECT ("T"."QTY" - %s) AS "Q" FROM "T"', ( 1, ),
+      'SELECT ("T"."QTY" - 1) AS "Q" FROM "T"', () ),
+    ( 'SELECT %s AS "ONE" FROM "T"', ( 1, ),
+      'SELECT 1 AS "ONE" FROM "T"', () ),
+    ( 'SELECT CASE WHEN "T"."QTY" > %s THEN %s ELSE %s END AS "K" FROM "T"', ( 3, 'big', 'small' ),
+      'SELECT CASE WHEN "T"."QTY" > ? THEN \'big\' ELSE \'small\' END AS "K" FROM "T"', ( 3, ) ),
+    ( 'UPDATE "T" SET "PRICE" = %s WHERE "T"."ID" = %s', ( Decimal( '9.99' ), 4 ),
+      'UPDATE "T" SET "PRICE" = 9.99 WHERE "T"."ID" = ?', ( 4, ) ),
+    ( 'UPDATE "T" SET "QTY" = ("T"."QTY" + %s) WHERE "T"."ID" = %s', ( 1, 9 ),
+      'UPDATE "T" SET "QTY" = ("T"."QTY" + 1) WHERE "T"."ID" = ?', ( 9, ) ),
+    ( 'SELECT "T"."ID" FROM "T" WHERE "T"."PRICE" = %s', ( Decimal( '1.50' ), ),
+      'SELECT "T"."ID" FROM "T" WHERE "T"."PRICE" = 1.50', () ),
+    ( 'INSERT INTO "T" ("NAME", "PRICE") VALUES (%s, %s)', ( 'a', Decimal( '1.25' ) ),
+      'INSERT INTO "T" ("NAME", "PRICE") VALUES (?, ?)', ( 'a', Decimal( '1.25' ) ) ),
+    ( 'INSERT INTO "T" ("NAME", "QTY", "NOTE") VALUES (%s, %s, %s)', ( 'a', 'DEFAULT', 'DEFAULT' ),
+      'INSERT INTO "T" ("NAME", "QTY", "NOTE") VALUES (?, DEFAULT, DEFAULT)', ( 'a', ) ),
+    ( 'SELECT "T"."ID" FROM "T" WHERE "T"."NAME" LIKE %s ESCAPE \'\\\' AND "T"."P" = \'100%%\'', ( 'a%', ),
+      'SELECT "T"."ID" FROM "T" WHERE "T"."NAME" LIKE ? ESCAPE \'\\\' AND "T"."P" = \'100%\'', ( 'a%', ) ),
+    ( 'SELECT "T"."ID" FROM "T" WHERE "T"."DAY" = %s', ( datetime.date( 2024, 5, 1 ), ),
+      'SELECT "T"."ID" FROM "T" WHERE "T"."DAY" = ?', ( datetime.date( 2024, 5, 1 ), ) ),
+    ( 'SELECT "T"."ID" FROM "T" WHERE "T"."AT" < %s', ( datetime.datetime( 2024, 5, 1, 12, 30 ), ),
+      'SELECT "T"."ID" FROM "T" WHERE "T"."AT" < ?', ( datetime.datetime( 2024, 5, 1, 12, 30 ), ) ),
+    ( 'SELECT "T"."ID" FROM "T" WHERE "T"."FLAG" = %s AND "T"."X" IS NULL', ( True, ),
+      'SELECT "T"."ID" FROM "T" WHERE "T"."FLAG" = ? AND "T"."X" IS NULL', ( True, ) ),
+    ( 'DELETE FROM "T" WHERE "T"."ID" IN (%s, %s)', ( 1, 2 ),
+      'DELETE FROM "T" WHERE "T"."ID" IN (?, ?)', ( 1, 2 ) ),
+]
+
+class RewritePlanTests( unittest.TestCase ):
+
+    def setUp( self ):
+        pybase.rewrite_cache.clear()
+        self.cursor = connection.cursor()
+        self.rewrite = self.cursor.cursor.rewrite
+
+    def tearDown( self ):
+        self.cursor.close()
+
+    def test_same_output_as_regex_rewrite( self ):
+        for operation, parameters, sql, bound in REGEX_REWRITES:
+            with self.subTest( operation = operation ):
+                result = self.rewrite( operation, parameters )
+                self.assertEqual( ( result[0], tuple( result[1] ) ), ( sql, bound ) )
+
+    def test_cached_plan_gives_the_same_output( self ):
+        for operation, parameters, sql, bound in REGEX_REWRITES:
+            with self.subTest( operation = operation ):
+                first = self.rewrite( operation, parameters )
+                second = self.rewrite( operation, parameters )
+                self.assertEqual( ( second[0], tuple( second[1] ) ), ( first[0], tuple( first[1] ) ) )
+        self.assertGreater( pybase.rewrite_cache.stats()['hits'], 0 )
+
+    # The regex rewrite left the quotes of an inlined string as they were.
+    def test_inlined_quotes_are_doubled( self ):
+        sql, bound = self.rewrite( 'SELECT COALESCE("T"."NAME", %s) AS "N" FROM "T"', ( "it's", ) )
+        self.assertEqual( sql, 'SELECT COALESCE("T"."NAME", \'it\'\'s\') AS "N" FROM "T"' )
+
+    def test_markers_scale_with_the_statement( self ):
+        for count in ( 10, 100, 1000, 10000 ):
+            operation = 'SELECT "T"."ID" FROM "T" WHERE "T"."ID" IN (%s)' % ', '.join( [ '%s' ] * count )
+            sql, bound = self.rewrite( operation, tuple( range( count ) ) )
+            self.assertEqual( sql.count( '?' ), count )
+            self.assertEqual( tuple( bound ), tuple( range( count ) ) )
+
+# ( value, SQL, bound value )
+TYPED_MARKERS = [
+    ( None, 'NULL', pybase._UNBOUND ),
+    ( True, 'CAST(? AS SMALLINT)', 1 ),
+    ( 7, 'CAST(? AS BIGINT)', 7 ),
+    ( 1.5, 'CAST(? AS DOUBLE)', 1.5 ),
+    ( Decimal( '1.25' ), 'CAST(? AS DECIMAL(31, 2))', Decimal( '1.25' ) ),
+    ( Decimal( 'NaN' ), 'CAST(? AS DECFLOAT(34))', 'NaN' ),
+    ( 'abc', 'CAST(? AS VARCHAR(32672))', 'abc' ),
+    ( "DATE('2024-01-02')", 'CAST(? AS DATE)', '2024-01-02' ),
+    ( "TIMESTAMP('2024-01-02 03:04:05')", 'CAST(? AS TIMESTAMP)', '2024-01-02 03:04:05' ),
+    ( 'DATES', 'CAST(? AS VARCHAR(32672))', 'DATES' ),
+    ( "DATE('2024-01-02') OR 1=1", 'CAST(? AS VARCHAR(32672))', "DATE('2024-01-02') OR 1=1" ),
+    ( "DATE('x') || '')", 'CAST(? AS VARCHAR(32672))', "DATE('x') || '')" ),
+    ( "TIMESTAMP(CURRENT TIMESTAMP)", 'CAST(? AS VARCHAR(32672))', "TIMESTAMP(CURRENT TIMESTAMP)" ),
+    ( datetime.date( 2024, 1, 2 ), 'CAST(? AS DATE)', datetime.date( 2024, 1, 2 ) ),
+    ( datetime.time( 3, 4 ), 'CAST(? AS TIME)', datetime.time( 3, 4 ) ),
+    ( b'ab', 'CAST(? AS VARBINARY(32672))', b'ab' ),
+]
+
+class TypedMarkerTests( unittest.TestCase ):
+
+    def test_typed_markers( self ):
+        for value, sql, bound in TYPED_MARKERS:
+            with self.subTest( value = value ):
+                self.assertEqual( pybase._typed_marker( value ), ( sql, bound ) )
+
+    # Only the exact DATE('...')/TIMESTAMP('...') forms lose their quotes, a
+    # user string starting with DATE is bound and never inlined.
+    def test_user_strings_are_bound( self ):
+        operation = 'SELECT COALESCE("T"."NAME", %s) AS "N" FROM "T"'
+        plan = pybase.RewritePlan( sqltokenizer.tokenize( operation ), ( str, ) )
+        parameters = ( "DATE('2024-01-02') OR 1=1", )
+        sql, bound = plan.apply( parameters, typed = True )
+        self.assertEqual( sql, 'SELECT COALESCE("T"."NAME", CAST(? AS VARCHAR(32672))) AS "N" FROM "T"' )
+        self.assertEqual( tuple( bound ), parameters )
+
+class StatementTextCounterTests( unittest.TestCase ):
+
+    def test_distinct_texts( self ):
+        counter = pybase.StatementTextCounter()
+        for sql in ( 'SELECT 1', 'SELECT 2', 'SELECT 1' ):
+            counter.add( sql )
+        self.assertEqual( counter.stats(), { 'distinct': 2, 'executions': 3, 'saturated': False } )
+        counter.clear()
+        self.assertEqual( counter.stats(), { 'distinct': 0, 'executions': 0, 'saturated': False } )
+
+    def test_saturation( self ):
+        counter = pybase.StatementTextCounter( limit = 2 )
+        for number in range( 5 ):
+            counter.add( 'SELECT %d' % number )
+        self.assertEqual( counter.stats(), { 'distinct': 2, 'executions': 5, 'saturated': True } )
+
+class RewriteCacheTests( unittest.TestCase ):
+
+    def key( self, number, length = 40 ):
+        return ( ( 'SELECT %d' % number ).ljust( length ), ( int, ) )
+
+    def test_hits_and_misses( self ):
+        cache = pybase.SQLRewriteCache( 4 )
+        self.assertIsNone( cache.get( self.key( 1 ) ) )
+        cache.put( self.key( 1 ), 'plan' )
+        self.assertEqual( cache.get( self.key( 1 ) ), 'plan' )
+        self.assertEqual( ( cache.stats()['hits'], cache.stats()['misses'] ), ( 1, 1 ) )
+
+    def test_least_recently_used_is_evicted( self ):
+        cache = pybase.SQLRewriteCache( 2 )
+        cache.put( self.key( 1 ), 1 )
+        cache.put( self.key( 2 ), 2 )
+        cache.get( self.key( 1 ) )
+        cache.put( self.key( 3 ), 3 )
+        self.assertIsNone( cache.get( self.key( 2 ) ) )
+        self.assertEqual( cache.get( self.key( 1 ) ), 1 )
+        self.assertEqual( cache.stats()['evictions'], 1 )
+
+    def test_resize( self ):
+        cache = pybase.SQLRewriteCache( 4 )
+        for number in range( 4 ):
+            cache.put( self.key( number ), number )
+        cache.resize( 1 )
+        self.assertEqual( ( cache.stats()['size'], cache.stats()['evictions'] ), ( 1, 3 ) )
+        self.assertEqual( cache.get( self.key( 3 ) ), 3 )
+        cache.resize( 0 )
+        cache.put( self.key( 5 ), 5 )
+        self.assertEqual( cache.stats()['size'], 0 )
+
+    def test_long_statements_are_not_cached( self ):
+        cache = pybase.SQLRewriteCache( 4, max_chars = 6400 )
+        cache.put( self.key( 1, 101 ), 1 )
+        self.assertEqual( ( cache.stats()['size'], cache.stats()['oversized'] ), ( 0, 1 ) )
+        cache.put( self.key( 2, 100 ), 2 )
+        self.assertEqual( cache.stats()['size'], 1 )
+
+    def test_characters_are_bounded( self ):
+        cache = pybase.SQLRewriteCache( 100, max_chars = 6400 )
+        for number in range( 100 ):
+            cache.put( self.key( number, 100 ), number )
+        stats = cache.stats()
+        self.assertLessEqual( stats['chars'], 6400 )
+        self.assertEqual( stats['size'], 64 )
+        self.assertEqual( cache.get( self.key( 99, 100 ) ), 99 )
+
+    def test_cursor_rewrite_counts( self ):
+        pybase.rewrite_cache.clear()
+        with connection.cursor() as cursor:
+            for _ in range( 3 ):
+                cursor.cursor.rewrite( 'SELECT "T"."ID" FROM "T" WHERE "T"."ID" = %s', ( 1, ) )
+        stats = pybase.rewrite_cache.stats()
+        self.assertEqual( ( stats['size'], stats['hits'], stats['misses'] ), ( 1, 2, 1 ) )
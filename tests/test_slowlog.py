@@ -0,0 +1,78 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+"""
+ibm_db_django.slowlog: the caller stack of a slow statement is the one of
+the code which ran it, taken while it runs and not when the record is handed
+over at the next execute or close of the cursor.
+"""
+
+import unittest
+
+from django.db import connections
+
+from ibm_db_django import instrumentation, slowlog
+
+def run_statement( cursor ):
+    cursor.execute( 'SELECT 1 FROM SYSIBM.SYSDUMMY1 WHERE 1 = %s', [ 1 ] )
+    return cursor.fetchall()
+
+class SlowQueryLogTests( unittest.TestCase ):
+
+    def setUp( self ):
+        self.connection = connections['instrumented']
+        self.connection.ensure_connection()
+        self.log = slowlog.logs['instrumented']
+        self.log.clear()
+
+    def test_stack_is_the_one_which_ran_the_statement( self ):
+        cursor = self.connection.cursor()
+        self.assertEqual( run_statement( cursor ), [ ( 1, ) ] )
+        cursor.close()
+        entries = [ entry for entry in self.log.entries() if 'WHERE 1 = ?' in entry['sql'] ]
+        self.assertEqual( len( entries ), 1 )
+        stack = entries[0]['stack']
+        self.assertTrue( stack[-1].endswith( ' in run_statement' ) )
+        self.assertTrue( stack[-1].startswith( __file__ ) )
+        self.assertTrue( stack[-2].endswith( ' in test_stack_is_the_one_which_ran_the_statement' ) )
+
+    # A statement which gets past the threshold while its rows are fetched is
+    # given the stack of that fetch.
+    def test_stack_is_taken_when_the_threshold_is_crossed( self ):
+        log = slowlog.SlowQueryLog( 'instrumented', threshold = 1.0, stack_depth = 2 )
+        record = instrumentation.StatementRecord( 'SELECT 1' )
+        record.execute = 0.5
+        log.capture( record )
+        self.assertIsNone( record.stack )
+        record.fetch = 0.6
+        log.capture( record )
+        self.assertEqual( len( record.stack ), 2 )
+        self.assertTrue( record.stack[-1].endswith( ' in test_stack_is_taken_when_the_threshold_is_crossed' ) )
+        taken = record.stack
+        log.capture( record )
+        self.assertIs( record.stack, taken )
+        log.record( record )
+        self.assertEqual( log.entries()[0]['stack'], taken )
+
+    def test_fast_statement_is_not_logged( self ):
+        log = slowlog.SlowQueryLog( 'instrumented', threshold = 1.0 )
+        record = instrumentation.StatementRecord( 'SELECT 1' )
+        record.execute = 0.1
+        log.capture( record )
+        log.record( record )
+        self.assertIsNone( record.stack )
+        self.assertEqual( log.entries(), [] )
@@ -0,0 +1,29 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+from django.db import models
+
+class Item( models.Model ):
+    name = models.CharField( max_length = 20, unique = True )
+    qty = models.IntegerField( default = 0 )
+    day = models.DateField( null = True )
+
+class Pair( models.Model ):
+    pk = models.CompositePrimaryKey( 'a', 'b' )
+    a = models.IntegerField()
+    b = models.CharField( max_length = 10 )
+    v = models.IntegerField( default = 0 )
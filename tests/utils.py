@@ -0,0 +1,64 @@
+# +--------------------------------------------------------------------------+
+# |  Licensed Materials - Property of IBM                                    |
+# |                                                                          |
+# | (C) Copyright IBM Corporation 2009-2026.                                 |
+# +--------------------------------------------------------------------------+
+# | Licensed under the Apache License, Version 2.0 (the "License");          |
+# | you may not use this file except in compliance with the License.         |
+# | You may obtain a copy of the License at                                  |
+# | http://www.apache.org/licenses/LICENSE-2.0 Unless required by applicable |
+# | law or agreed to in writing, software distributed under the License is   |
+# | distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY |
+# | KIND, either express or implied. See the License for the specific        |
+# | language governing permissions and limitations under the License.        |
+# +--------------------------------------------------------------------------+
+# | Authors: IBM Application Development Team                                |
+# +--------------------------------------------------------------------------+
+
+import contextlib
+import unittest
+
+from django.db import connection
+
+from ibm_db_django import dialect
+
+class TableTestCase( unittest.TestCase ):
+    """
+    Creates the tables of models before the tests of the class and drops them
+    after. The rows the tests add are deleted after each test.
+    """
+    models = ()
+
+    @classmethod
+    def setUpClass( cls ):
+        super( TableTestCase, cls ).setUpClass()
+        with connection.schema_editor() as editor:
+            for model in cls.models:
+                editor.create_model( model )
+
+    @classmethod
+    def tearDownClass( cls ):
+        with connection.schema_editor() as editor:
+            for model in reversed( cls.models ):
+                editor.delete_model( model )
+        super( TableTestCase, cls ).tearDownClass()
+
+    def tearDown( self ):
+        for model in self.models:
+            model.objects.all().delete()
+
+# Compiles as if the server were dbms_name at version.
+@contextlib.contextmanager
+def server_version( connection, version, dbms_name = 'DB2/LINUXX8664' ):
+    connection.ensure_connection()
+    saved = connection.dialect
+    connection.dialect = dialect.DialectProfile.build( dbms_name, version )
+    try:
+        yield
+    finally:
+        connection.dialect = saved
+
+# SQL of the statements captured by a CaptureQueriesContext, without the
+# BEGIN and COMMIT Django records for atomic blocks.
+def statements( queries ):
+    return [ query['sql'] for query in queries.captured_queries if query['sql'] not in ( 'BEGIN', 'COMMIT' ) ]